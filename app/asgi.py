@@ -1,7 +1,12 @@
-import os
-
-from django.core.asgi import get_asgi_application
-
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'app.settings')
-
-application = get_asgi_application()
+import os
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'app.settings')
+os.environ.setdefault('ASYNC_VIEWS', '1')
+
+django.setup(set_prefix=False)
+
+from classroom.async_views import StreamingASGIHandler  # noqa: E402
+
+application = StreamingASGIHandler()
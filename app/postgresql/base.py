@@ -0,0 +1,36 @@
+from django.db.backends.postgresql import base
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.health_check_enabled = self.settings_dict.get('CONN_HEALTH_CHECKS', False)
+        self.health_check_done = False
+
+    def connect(self):
+        super().connect()
+        self.health_check_done = True
+
+    def init_connection_state(self):
+        super().init_connection_state()
+        timeout = self.settings_dict.get('STATEMENT_TIMEOUT')
+        if timeout and not self.settings_dict.get('PGBOUNCER'):
+            with self.connection.cursor() as cursor:
+                cursor.execute('SET statement_timeout = %s', [timeout])
+            if not self.get_autocommit():
+                self.connection.commit()
+
+    def close_if_health_check_failed(self):
+        if self.connection is None or not self.health_check_enabled or self.health_check_done:
+            return
+        if not self.in_atomic_block and not self.is_usable():
+            self.close()
+        self.health_check_done = True
+
+    def close_if_unusable_or_obsolete(self):
+        super().close_if_unusable_or_obsolete()
+        self.health_check_done = False
+
+    def _cursor(self, name=None):
+        self.close_if_health_check_failed()
+        return super()._cursor(name)
@@ -1,114 +1,187 @@
-import os
-from pathlib import Path
-
-BASE_DIR = Path(__file__).resolve().parent.parent
-
-
-SECRET_KEY = os.environ.get("SECRET_KEY", "tHi$_is My!VVery$eCr&tKeY")
-
-DEBUG = int(os.environ.get("DEBUG", default=0))
-
-ALLOWED_HOSTS = os.environ.get("DJANGO_ALLOWED_HOSTS", "*").split(" ")
-
-INSTALLED_APPS = [
-    'django.contrib.admin',
-    'django.contrib.auth',
-    'django.contrib.contenttypes',
-    'django.contrib.sessions',
-    'django.contrib.messages',
-    'django.contrib.staticfiles',
-    'classroom.apps.ClassroomConfig',
-    'drf_spectacular',
-    'rest_framework.authtoken',
-    'rest_framework',
-]
-
-MIDDLEWARE = [
-    'django.middleware.security.SecurityMiddleware',
-    'django.contrib.sessions.middleware.SessionMiddleware',
-    'django.middleware.common.CommonMiddleware',
-    'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
-    'django.contrib.messages.middleware.MessageMiddleware',
-    'django.middleware.clickjacking.XFrameOptionsMiddleware',
-]
-
-ROOT_URLCONF = 'app.urls'
-
-REST_FRAMEWORK = {
-    'DEFAULT_PERMISSION_CLASSES': (
-        'rest_framework.permissions.IsAuthenticated',
-    ),
-    'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
-    ],
-    'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
-}
-
-TEMPLATES = [
-    {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
-        'DIRS': [],
-        'APP_DIRS': True,
-        'OPTIONS': {
-            'context_processors': [
-                'django.template.context_processors.debug',
-                'django.template.context_processors.request',
-                'django.contrib.auth.context_processors.auth',
-                'django.contrib.messages.context_processors.messages',
-            ],
-        },
-    },
-]
-
-WSGI_APPLICATION = 'app.wsgi.application'
-
-DATABASES = {
-
-    'default': {
-        "ENGINE": os.environ.get("SQL_ENGINE", "django.db.backends.sqlite3"),
-        "NAME": os.environ.get("SQL_DATABASE", BASE_DIR / "db.sqlite3"),
-        "USER": os.environ.get("SQL_USER", "user"),
-        "PASSWORD": os.environ.get("SQL_PASSWORD", "password"),
-        "HOST": os.environ.get("SQL_HOST", "localhost"),
-        "PORT": os.environ.get("SQL_PORT", "5432"),
-    }
-
-}
-
-AUTH_PASSWORD_VALIDATORS = [
-    {
-        'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
-    },
-    {
-        'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator',
-    },
-    {
-        'NAME': 'django.contrib.auth.password_validation.CommonPasswordValidator',
-    },
-    {
-        'NAME': 'django.contrib.auth.password_validation.NumericPasswordValidator',
-    },
-]
-
-LANGUAGE_CODE = 'en-us'
-
-TIME_ZONE = 'UTC'
-
-USE_I18N = True
-
-USE_TZ = True
-
-STATIC_URL = 'staticfiles/'
-
-DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
-
-AUTH_USER_MODEL = 'classroom.User'
-
-MEDIA_URL = '/resources/'
-
-SPECTACULAR_SETTINGS = {
-    'TITLE': 'LeverX Task API',
-    'DESCRIPTION': 'API Classroom',
-    'VERSION': '1.0.0',
-}
+import os
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+
+SECRET_KEY = os.environ.get("SECRET_KEY", "tHi$_is My!VVery$eCr&tKeY")
+
+DEBUG = int(os.environ.get("DEBUG", default=0))
+
+ALLOWED_HOSTS = os.environ.get("DJANGO_ALLOWED_HOSTS", "*").split(" ")
+
+INSTALLED_APPS = [
+    'django.contrib.admin',
+    'django.contrib.auth',
+    'django.contrib.contenttypes',
+    'django.contrib.sessions',
+    'django.contrib.messages',
+    'django.contrib.staticfiles',
+    'classroom.apps.ClassroomConfig',
+    'drf_spectacular',
+    'rest_framework',
+]
+
+MIDDLEWARE = [
+    'django.middleware.security.SecurityMiddleware',
+    'classroom.routers.ReplicaRoutingMiddleware',
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.middleware.common.CommonMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+]
+
+ROOT_URLCONF = 'app.urls'
+
+REST_FRAMEWORK = {
+    'DEFAULT_PERMISSION_CLASSES': (
+        'rest_framework.permissions.IsAuthenticated',
+    ),
+    'DEFAULT_AUTHENTICATION_CLASSES': [
+        'classroom.authentication.CachedTokenAuthentication',
+    ],
+    'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
+    'DEFAULT_PAGINATION_CLASS': 'classroom.pagination.ModelOrderingCursorPagination',
+    'PAGE_SIZE': int(os.environ.get("PAGE_SIZE", 50)),
+}
+
+TEMPLATES = [
+    {
+        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'DIRS': [],
+        'APP_DIRS': True,
+        'OPTIONS': {
+            'context_processors': [
+                'django.template.context_processors.debug',
+                'django.template.context_processors.request',
+                'django.contrib.auth.context_processors.auth',
+                'django.contrib.messages.context_processors.messages',
+            ],
+        },
+    },
+]
+
+WSGI_APPLICATION = 'app.wsgi.application'
+
+DATABASES = {
+
+    'default': {
+        "ENGINE": os.environ.get("SQL_ENGINE", "django.db.backends.sqlite3"),
+        "NAME": os.environ.get("SQL_DATABASE", BASE_DIR / "db.sqlite3"),
+        "USER": os.environ.get("SQL_USER", "user"),
+        "PASSWORD": os.environ.get("SQL_PASSWORD", "password"),
+        "HOST": os.environ.get("SQL_HOST", "localhost"),
+        "PORT": os.environ.get("SQL_PORT", "5432"),
+        "CONN_MAX_AGE": int(os.environ.get("SQL_CONN_MAX_AGE", 60)),
+        "CONN_HEALTH_CHECKS": bool(int(os.environ.get("SQL_CONN_HEALTH_CHECKS", 1))),
+        "PGBOUNCER": bool(int(os.environ.get("SQL_PGBOUNCER", 0))),
+        "DISABLE_SERVER_SIDE_CURSORS": bool(int(os.environ.get("SQL_PGBOUNCER", 0))),
+        "STATEMENT_TIMEOUT": int(os.environ.get("SQL_STATEMENT_TIMEOUT", 0)),
+    }
+
+}
+
+DATABASE_REPLICAS = []
+
+for number, replica_host in enumerate(os.environ.get("SQL_REPLICA_HOSTS", "").split(), start=1):
+    replica_host, _, replica_port = replica_host.partition(":")
+    DATABASES["replica{}".format(number)] = dict(DATABASES["default"], HOST=replica_host,
+                                                PORT=replica_port or DATABASES["default"]["PORT"],
+                                                TEST={"MIRROR": "default"})
+    DATABASE_REPLICAS.append("replica{}".format(number))
+
+DATABASE_ROUTERS = ['classroom.routers.ReplicaRouter']
+
+REPLICA_PIN_SECONDS = int(os.environ.get("REPLICA_PIN_SECONDS", 5))
+
+REPLICA_PIN_CACHE = os.environ.get("REPLICA_PIN_CACHE", "default")
+
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get("CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"),
+        'LOCATION': os.environ.get("CACHE_LOCATION", ""),
+    }
+}
+
+# Course roles, dashboards and responses are dropped on change only in the cache they were written to. The default
+# LocMemCache lives inside one process, so with several workers (or both `web` and `web-asgi`) set CACHE_BACKEND to
+# a shared cache, e.g. memcached or redis, or other processes keep serving stale roles until the timeout.
+COURSE_ROLE_CACHE = os.environ.get("COURSE_ROLE_CACHE", "default")
+
+COURSE_ROLE_CACHE_TIMEOUT = int(os.environ.get("COURSE_ROLE_CACHE_TIMEOUT", 300))
+
+DASHBOARD_CACHE = os.environ.get("DASHBOARD_CACHE", "default")
+
+DASHBOARD_CACHE_TIMEOUT = int(os.environ.get("DASHBOARD_CACHE_TIMEOUT", 300))
+
+RESPONSE_CACHE = os.environ.get("RESPONSE_CACHE", "default")
+
+RESPONSE_CACHE_TIMEOUT = int(os.environ.get("RESPONSE_CACHE_TIMEOUT", 300))
+
+PASSWORD_HASHING_WORKERS = int(os.environ.get("PASSWORD_HASHING_WORKERS", os.cpu_count() or 2))
+
+PASSWORD_HASHING_QUEUE = int(os.environ.get("PASSWORD_HASHING_QUEUE", 64))
+
+USER_IMPORT_MAX_ROWS = int(os.environ.get("USER_IMPORT_MAX_ROWS", 200))
+
+ASYNC_VIEWS = int(os.environ.get("ASYNC_VIEWS", 0))
+
+AUTH_TOKEN_TTL = int(os.environ.get("AUTH_TOKEN_TTL", 7 * 24 * 60 * 60))
+
+# Authenticated tokens are kept in a per-process LRU (TOKEN_CACHE_SIZE entries) for up to TOKEN_CACHE_TTL seconds,
+# in front of the optional shared TOKEN_CACHE. Logout, purge_tokens and user changes clear the shared cache and the
+# LRU of the process that ran them only, so other workers accept a revoked token for up to TOKEN_CACHE_TTL seconds.
+TOKEN_CACHE = os.environ.get("TOKEN_CACHE", "")
+
+TOKEN_CACHE_SIZE = int(os.environ.get("TOKEN_CACHE_SIZE", 10000))
+
+TOKEN_CACHE_TTL = int(os.environ.get("TOKEN_CACHE_TTL", 60))
+
+AUTH_PASSWORD_VALIDATORS = [
+    {
+        'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.CommonPasswordValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.NumericPasswordValidator',
+    },
+]
+
+LANGUAGE_CODE = 'en-us'
+
+TIME_ZONE = 'UTC'
+
+USE_I18N = True
+
+USE_TZ = True
+
+STATIC_URL = 'staticfiles/'
+
+DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+AUTH_USER_MODEL = 'classroom.User'
+
+MEDIA_URL = '/resources/'
+
+MEDIA_ROOT = os.environ.get("MEDIA_ROOT", BASE_DIR / "media")
+
+PRESENTATION_MAX_SIZE = int(os.environ.get("PRESENTATION_MAX_SIZE", 512 * 1024 * 1024))
+
+PRESENTATION_CHUNK_MAX_SIZE = int(os.environ.get("PRESENTATION_CHUNK_MAX_SIZE", 16 * 1024 * 1024))
+
+PRESENTATION_SENDFILE = os.environ.get("PRESENTATION_SENDFILE", "")
+
+PRESENTATION_ACCEL_PREFIX = os.environ.get("PRESENTATION_ACCEL_PREFIX", "/protected/")
+
+SPECTACULAR_SETTINGS = {
+    'TITLE': 'LeverX Task API',
+    'DESCRIPTION': 'API Classroom',
+    'VERSION': '1.0.0',
+}
@@ -0,0 +1,4 @@
+from app.settings import *  # noqa: F401,F403
+from app.settings import DATABASES
+
+DATABASES["replica"] = dict(DATABASES["default"], NAME="{}_replica".format(DATABASES["default"]["NAME"]))
@@ -1,2 +1,2 @@
-from django.contrib import admin
-
+from django.contrib import admin
+
@@ -1,6 +1,9 @@
-from django.apps import AppConfig
-
-
-class ClassroomConfig(AppConfig):
-    default_auto_field = 'django.db.models.BigAutoField'
-    name = 'classroom'
+from django.apps import AppConfig
+
+
+class ClassroomConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'classroom'
+
+    def ready(self):
+        from . import signals  # noqa: F401
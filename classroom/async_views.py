@@ -0,0 +1,99 @@
+import json
+from functools import wraps
+from itertools import islice
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.handlers.asgi import ASGIHandler
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse, HttpResponseNotAllowed
+from .hashing import password_pool, PasswordPoolBusy
+from .models import AuthToken
+
+User = get_user_model()
+
+
+async def login_view(request):
+    if request.method != 'POST':
+        return HttpResponseNotAllowed(['POST'])
+    try:
+        data = json.loads(request.body) if request.content_type == 'application/json' else request.POST
+    except ValueError:
+        return JsonResponse({'detail': 'JSON parse error.'}, status=400)
+    if not isinstance(data, dict):
+        return JsonResponse({'non_field_errors': ['Expected an object with username and password.']}, status=400)
+    errors = {field: ['This field is required.'] for field in ('username', 'password') if not data.get(field)}
+    errors.update({field: ['Not a valid string.'] for field in ('username', 'password')
+                   if field not in errors and not isinstance(data[field], str)})
+    if errors:
+        return JsonResponse(errors, status=400)
+    device = str(data.get('device', ''))[:64]
+    user = await sync_to_async(User.objects.filter(username=data['username']).first)()
+    try:
+        valid = await password_pool.check_password(data['password'], user.password if user else None)
+    except PasswordPoolBusy:
+        response = JsonResponse({'detail': 'Too many concurrent logins, try again.'}, status=503)
+        response['Retry-After'] = '1'
+        return response
+    if not valid or not user.is_active:
+        return JsonResponse({'non_field_errors': ['Unable to log in with provided credentials.']}, status=400)
+    key, token = await sync_to_async(AuthToken.login)(user, device)
+    return JsonResponse(
+        {'token': key, 'user_id': user.pk, 'username': user.username, 'expires': token.expires},
+        encoder=DjangoJSONEncoder,
+    )
+
+
+login_view.csrf_exempt = True
+
+
+def render_view(view, request, *args, **kwargs):
+    response = view(request, *args, **kwargs)
+    if hasattr(response, 'render'):
+        response.render()
+    return response
+
+
+def next_parts(iterator, count):
+    return list(islice(iterator, count))
+
+
+class StreamingASGIHandler(ASGIHandler):
+    parts_per_read = 256
+
+    async def send_response(self, response, send):
+        if not response.streaming:
+            return await super().send_response(response, send)
+        headers = [(header.encode('ascii'), value.encode('latin1')) for header, value in response.items()]
+        headers += [(b'Set-Cookie', cookie.output(header='').encode('ascii').strip())
+                    for cookie in response.cookies.values()]
+        try:
+            await send({'type': 'http.response.start', 'status': response.status_code, 'headers': headers})
+            iterator = iter(response)
+            read = sync_to_async(next_parts)
+            parts = await read(iterator, self.parts_per_read)
+            while parts:
+                for part in parts:
+                    for chunk, _ in self.chunk_bytes(part):
+                        await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+                parts = await read(iterator, self.parts_per_read)
+            await send({'type': 'http.response.body'})
+        finally:
+            await sync_to_async(response.close, thread_sensitive=True)()
+
+
+def async_read_view(view_class, **initkwargs):
+    view = view_class.as_view(**initkwargs)
+    run = sync_to_async(render_view)
+
+    @wraps(view)
+    async def async_view(request, *args, **kwargs):
+        return await run(view, request, *args, **kwargs)
+
+    return async_view
+
+
+def read_view(view_class, **initkwargs):
+    if settings.ASYNC_VIEWS:
+        return async_read_view(view_class, **initkwargs)
+    return view_class.as_view(**initkwargs)
@@ -0,0 +1,103 @@
+import time
+from collections import OrderedDict
+from threading import Lock
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.utils import timezone
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+from .models import AuthToken
+
+TOKEN_CACHE_KEY = 'classroom:token:{}'
+
+
+class LRUCache:
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if not self.maxsize or ttl <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+token_cache = LRUCache(settings.TOKEN_CACHE_SIZE, settings.TOKEN_CACHE_TTL)
+
+
+def shared_token_cache():
+    return caches[settings.TOKEN_CACHE] if settings.TOKEN_CACHE else None
+
+
+def cache_user(digest, user, expires):
+    ttl = min(settings.TOKEN_CACHE_TTL, (expires - timezone.now()).total_seconds())
+    state = {field.attname: getattr(user, field.attname) for field in user._meta.concrete_fields
+             if field.attname != 'password'}
+    token_cache.set(digest, state, ttl)
+    shared = shared_token_cache()
+    if shared is not None and ttl > 0:
+        shared.set(TOKEN_CACHE_KEY.format(digest), (time.time() + ttl, state), ttl)
+
+
+def cached_user(digest):
+    state = token_cache.get(digest)
+    if state is None:
+        shared = shared_token_cache()
+        entry = shared.get(TOKEN_CACHE_KEY.format(digest)) if shared is not None else None
+        if entry is None:
+            return None
+        expires, state = entry
+        token_cache.set(digest, state, expires - time.time())
+    return get_user_model().from_db(None, list(state), list(state.values()))
+
+
+def invalidate_tokens(digests):
+    digests = list(digests)
+    for digest in digests:
+        token_cache.delete(digest)
+    shared = shared_token_cache()
+    if shared is not None:
+        shared.delete_many([TOKEN_CACHE_KEY.format(digest) for digest in digests])
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    model = AuthToken
+
+    def authenticate_credentials(self, key):
+        digest = AuthToken.hash_key(key)
+        user = cached_user(digest)
+        if user is None:
+            token = AuthToken.objects.select_related('user').filter(digest=digest, expires__gt=timezone.now()).first()
+            if token is None:
+                raise exceptions.AuthenticationFailed('Invalid token.')
+            user = token.user
+            cache_user(digest, token.user, token.expires)
+        return user, digest
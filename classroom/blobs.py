@@ -0,0 +1,80 @@
+import os
+import time
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F
+from .models import Lecture, PresentationBlob
+from .storage import blob_digest
+
+
+def lecture_storage():
+    return Lecture._meta.get_field('presentation').storage
+
+
+def add_reference(storage, name):
+    if PresentationBlob.objects.filter(name=name).update(references=F('references') + 1):
+        return
+    try:
+        with transaction.atomic():
+            PresentationBlob.objects.create(name=name, digest=blob_digest(name), size=storage.size(name), references=1)
+    except IntegrityError:
+        PresentationBlob.objects.filter(name=name).update(references=F('references') + 1)
+
+
+def delete_if_unreferenced(storage, name):
+    if not PresentationBlob.objects.filter(name=name).exists():
+        storage.delete(name)
+
+
+def drop_reference(storage, name):
+    with transaction.atomic():
+        blob = PresentationBlob.objects.select_for_update().filter(name=name).first()
+        if blob is None:
+            return
+        if blob.references > 1:
+            PresentationBlob.objects.filter(pk=blob.pk).update(references=F('references') - 1)
+            return
+        blob.delete()
+    transaction.on_commit(lambda: delete_if_unreferenced(storage, name))
+
+
+def find_reusable_blob(user, digest, size):
+    return PresentationBlob.objects.filter(
+        digest=digest, size=size, references__gt=0,
+        name__in=Lecture.objects.filter(course__teacher=user).values('presentation'),
+    ).first()
+
+
+def attach_blob(lecture_id, blob):
+    lecture = Lecture.objects.get(pk=lecture_id)
+    lecture.presentation = blob.name
+    lecture.save(update_fields=['presentation', 'updated_at'])
+    return lecture
+
+
+def collect_garbage(directory='presentation', grace=3600):
+    storage = lecture_storage()
+    counts = dict(Lecture.objects.exclude(presentation__isnull=True).exclude(presentation='').order_by()
+                  .values_list('presentation').annotate(references=Count('id')))
+    with transaction.atomic():
+        blobs = {blob.name: blob for blob in PresentationBlob.objects.select_for_update()}
+        stale = [blob for name, blob in blobs.items() if blob.references != counts.get(name, 0)]
+        for blob in stale:
+            blob.references = counts.get(blob.name, 0)
+        PresentationBlob.objects.bulk_update(stale, ['references'])
+        PresentationBlob.objects.bulk_create(
+            PresentationBlob(name=name, digest=blob_digest(name), size=storage.size(name), references=references)
+            for name, references in counts.items() if name not in blobs and storage.exists(name))
+        orphans = PresentationBlob.objects.filter(references=0)
+        orphan_names = list(orphans.values_list('name', flat=True))
+        orphans.delete()
+    removed = 0
+    root = storage.path(directory)
+    for path, _, files in os.walk(root):
+        for filename in files:
+            full_path = os.path.join(path, filename)
+            name = os.path.relpath(full_path, storage.location).replace(os.sep, '/')
+            if name in counts or (name not in orphan_names and time.time() - os.path.getmtime(full_path) < grace):
+                continue
+            os.remove(full_path)
+            removed += 1
+    return {'recounted': len(stale), 'orphans': len(orphan_names), 'removed': removed}
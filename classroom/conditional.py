@@ -0,0 +1,51 @@
+import hashlib
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from rest_framework import status
+
+
+def touch(model, *pks):
+    pks = [pk for pk in pks if pk is not None]
+    if pks:
+        model.objects.filter(pk__in=pks).update(updated_at=timezone.now())
+
+
+def latest_update(queryset, *fields):
+    row = queryset.order_by().values_list(*fields).first()
+    if row is None or None in row:
+        return None
+    return max(row)
+
+
+def version_etag(request, last_modified):
+    state = '{}:{}:{}'.format(request.get_full_path(), request.user.pk, last_modified.isoformat())
+    return 'W/"{}"'.format(hashlib.sha1(state.encode()).hexdigest())
+
+
+class ConditionalGetMixin:
+    def get_last_modified(self):
+        return None
+
+    def get(self, request, *args, **kwargs):
+        last_modified = self.get_last_modified()
+        if last_modified is None:
+            return super().get(request, *args, **kwargs)
+        etag = version_etag(request, last_modified)
+        response = get_conditional_response(request, etag=etag, last_modified=int(last_modified.timestamp()))
+        if response is None:
+            response = super().get(request, *args, **kwargs)
+        if response.status_code in (status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED):
+            response['ETag'] = etag
+            response['Last-Modified'] = http_date(last_modified.timestamp())
+        return response
+
+
+class ConditionalObjectMixin(ConditionalGetMixin):
+    def get_object(self):
+        if getattr(self, 'conditional_object', None) is None:
+            self.conditional_object = super().get_object()
+        return self.conditional_object
+
+    def get_last_modified(self):
+        return self.get_object().updated_at
@@ -0,0 +1,176 @@
+from collections import Counter
+from django.db import IntegrityError, transaction
+from django.db.models import Case, Count, F, OuterRef, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce
+from .models import (Course, CourseStatistics, Lecture, Hometask, HometaskStatistics, MarkDistribution,
+                     CompletedHomework, Mark)
+
+
+def grouped_counts(queryset, field):
+    return dict(queryset.values(field).annotate(total=Count('*')).order_by().values_list(field, 'total'))
+
+
+def rebuild_statistics(course_ids=None):
+    with transaction.atomic():
+        return replace_statistics(course_ids)
+
+
+def replace_statistics(course_ids):
+    courses = Course.objects.select_for_update()
+    hometasks = Hometask.objects.all()
+    submissions = CompletedHomework.objects.filter(hometask__isnull=False)
+    marks = Mark.objects.filter(completed_homework__hometask__isnull=False)
+    students = Course.student.through.objects.all()
+    teachers = Course.teacher.through.objects.all()
+    lectures = Lecture.objects.all()
+    if course_ids is not None:
+        courses = courses.filter(id__in=course_ids)
+        hometasks = hometasks.filter(lecture__course__in=course_ids)
+        submissions = submissions.filter(hometask__lecture__course__in=course_ids)
+        marks = marks.filter(completed_homework__hometask__lecture__course__in=course_ids)
+        students = students.filter(course_id__in=course_ids)
+        teachers = teachers.filter(course_id__in=course_ids)
+        lectures = lectures.filter(course__in=course_ids)
+    scope = {} if course_ids is None else {'course__in': course_ids}
+    course_ids = list(courses.order_by('id').values_list('id', flat=True))
+    hometask_courses = dict(hometasks.values_list('id', 'lecture__course_id'))
+    student_counts = grouped_counts(students, 'course_id')
+    teacher_counts = grouped_counts(teachers, 'course_id')
+    lecture_counts = grouped_counts(lectures, 'course_id')
+    hometask_counts = grouped_counts(hometasks, 'lecture__course_id')
+    submission_counts = grouped_counts(submissions, 'hometask_id')
+    mark_totals = {row['completed_homework__hometask_id']: (row['total'], row['mark_sum']) for row in marks.values(
+        'completed_homework__hometask_id').annotate(total=Count('*'), mark_sum=Sum('mark')).order_by()}
+    distribution = marks.values('completed_homework__hometask_id', 'mark').annotate(total=Count('*')).order_by()
+    CourseStatistics.objects.filter(**scope).delete()
+    HometaskStatistics.objects.filter(**scope).delete()
+    MarkDistribution.objects.filter(**scope).delete()
+    CourseStatistics.objects.bulk_create((CourseStatistics(
+        course_id=course_id, students=student_counts.get(course_id, 0),
+        teachers=teacher_counts.get(course_id, 0), lectures=lecture_counts.get(course_id, 0),
+        hometasks=hometask_counts.get(course_id, 0),
+    ) for course_id in course_ids), ignore_conflicts=True)
+    HometaskStatistics.objects.bulk_create((HometaskStatistics(
+        hometask_id=hometask_id, course_id=course_id, submissions=submission_counts.get(hometask_id, 0),
+        marks=mark_totals.get(hometask_id, (0, 0))[0], mark_sum=mark_totals.get(hometask_id, (0, 0))[1],
+    ) for hometask_id, course_id in hometask_courses.items()), ignore_conflicts=True)
+    MarkDistribution.objects.bulk_create((MarkDistribution(
+        hometask_id=row['completed_homework__hometask_id'], mark=row['mark'], count=row['total'],
+        course_id=hometask_courses[row['completed_homework__hometask_id']],
+    ) for row in distribution.iterator()), ignore_conflicts=True)
+    return {'courses': len(course_ids), 'hometasks': len(hometask_courses)}
+
+
+def hometask_course_id(hometask_id):
+    return Hometask.objects.filter(pk=hometask_id).values_list('lecture__course_id', flat=True).first()
+
+
+def update_course_statistics(course_id, **deltas):
+    updated = CourseStatistics.objects.filter(course=course_id).update(
+        **{field: F(field) + delta for field, delta in deltas.items()})
+    if not updated and any(delta > 0 for delta in deltas.values()):
+        rebuild_statistics([course_id])
+
+
+def member_count(through):
+    members = through.objects.filter(course_id=OuterRef('course_id')).values('course_id').annotate(total=Count('*'))
+    return Coalesce(Subquery(members.values('total')), 0)
+
+
+def recount_members(course_ids):
+    course_ids = set(course_ids)
+    if not course_ids:
+        return
+    updated = CourseStatistics.objects.filter(course__in=course_ids).update(
+        students=member_count(Course.student.through), teachers=member_count(Course.teacher.through))
+    if updated < len(course_ids):
+        rebuild_statistics(course_ids - set(CourseStatistics.objects.filter(course__in=course_ids)
+                                            .values_list('course_id', flat=True)))
+
+
+def add_hometask(hometask_id, course_id):
+    HometaskStatistics.objects.get_or_create(hometask_id=hometask_id, defaults={'course_id': course_id})
+    update_course_statistics(course_id, hometasks=1)
+
+
+def update_hometask_statistics(hometask_id, **deltas):
+    updated = HometaskStatistics.objects.filter(hometask=hometask_id).update(
+        **{field: F(field) + delta for field, delta in deltas.items()})
+    if not updated and any(delta > 0 for delta in deltas.values()):
+        course_id = hometask_course_id(hometask_id)
+        if course_id is not None:
+            rebuild_statistics([course_id])
+        return False
+    return bool(updated)
+
+
+def record_submissions(hometask_id, delta):
+    if hometask_id is not None and delta:
+        update_hometask_statistics(hometask_id, submissions=delta)
+
+
+def record_marks(hometask_id, added=(), removed=(), course_id=None):
+    changes = Counter(added)
+    changes.subtract(removed)
+    changes = {mark: count for mark, count in changes.items() if count}
+    if hometask_id is None or not changes:
+        return
+    if not update_hometask_statistics(hometask_id, marks=len(added) - len(removed),
+                                      mark_sum=sum(added) - sum(removed)):
+        return
+    distribution = MarkDistribution.objects.filter(hometask=hometask_id)
+    existing = set(distribution.filter(mark__in=changes).values_list('mark', flat=True))
+    if existing:
+        distribution.filter(mark__in=existing).update(count=F('count') + Case(
+            *(When(mark=mark, then=Value(changes[mark])) for mark in existing), default=Value(0)))
+    missing = [mark for mark in changes if mark not in existing]
+    if not missing:
+        return
+    if course_id is None:
+        course_id = hometask_course_id(hometask_id)
+    try:
+        with transaction.atomic():
+            MarkDistribution.objects.bulk_create(MarkDistribution(
+                hometask_id=hometask_id, course_id=course_id, mark=mark, count=changes[mark]) for mark in missing)
+    except IntegrityError:
+        for mark in missing:
+            if not distribution.filter(mark=mark).update(count=F('count') + changes[mark]):
+                MarkDistribution.objects.create(hometask_id=hometask_id, course_id=course_id, mark=mark,
+                                                count=changes[mark])
+
+
+def course_statistics(course_id):
+    statistics = CourseStatistics.objects.filter(course=course_id).first()
+    if statistics is None:
+        rebuild_statistics([course_id])
+        statistics = CourseStatistics.objects.get(course=course_id)
+    hometasks = []
+    submissions = marks = mark_sum = 0
+    rows = HometaskStatistics.objects.filter(course=course_id).order_by('hometask_id').values(
+        'hometask_id', 'hometask__title', 'submissions', 'marks', 'mark_sum')
+    for row in rows:
+        hometasks.append({
+            'id': row['hometask_id'],
+            'title': row['hometask__title'],
+            'submissions': row['submissions'],
+            'submission_rate': row['submissions'] / statistics.students if statistics.students else None,
+            'marks': row['marks'],
+            'average_mark': row['mark_sum'] / row['marks'] if row['marks'] else None,
+        })
+        submissions += row['submissions']
+        marks += row['marks']
+        mark_sum += row['mark_sum']
+    distribution = MarkDistribution.objects.filter(course=course_id).values('mark').annotate(
+        total=Sum('count')).filter(total__gt=0).order_by('mark').values_list('mark', 'total')
+    return {
+        'course': course_id,
+        'students': statistics.students,
+        'teachers': statistics.teachers,
+        'lectures': statistics.lectures,
+        'hometasks': statistics.hometasks,
+        'submissions': submissions,
+        'marks': marks,
+        'average_mark': mark_sum / marks if marks else None,
+        'mark_distribution': {str(mark): total for mark, total in distribution},
+        'hometask_statistics': hometasks,
+    }
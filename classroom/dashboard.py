@@ -0,0 +1,76 @@
+import hashlib
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Exists, OuterRef
+from .generations import get_generations, bump_generations
+from .membership import get_course_roles
+from .models import Course, Hometask, CompletedHomework
+from .routers import primary_reads
+
+DASHBOARD_CACHE_KEY = 'classroom:dashboard:{}'
+USER_GENERATION_KEY = 'classroom:dashboard-user:{}'
+COURSE_GENERATION_KEY = 'classroom:dashboard-course:{}'
+
+
+def dashboard_cache():
+    return caches[settings.DASHBOARD_CACHE]
+
+
+def invalidate_user_dashboards(user_ids):
+    bump_generations(dashboard_cache(), [USER_GENERATION_KEY.format(user_id) for user_id in set(user_ids)
+                                         if user_id is not None])
+
+
+def invalidate_course_dashboards(course_ids):
+    bump_generations(dashboard_cache(), [COURSE_GENERATION_KEY.format(course_id) for course_id in set(course_ids)
+                                         if course_id is not None])
+
+
+def dashboard_key(user_id, roles):
+    course_ids = sorted(roles)
+    keys = [USER_GENERATION_KEY.format(user_id)] + [COURSE_GENERATION_KEY.format(course_id) for course_id in course_ids]
+    generations = get_generations(dashboard_cache(), keys)
+    state = (user_id, [(course_id, tuple(roles[course_id])) for course_id in course_ids], generations)
+    return DASHBOARD_CACHE_KEY.format(hashlib.sha256(repr(state).encode()).hexdigest())
+
+
+def build_dashboard(user_id, roles):
+    studying = [course_id for course_id, (is_teacher, is_student) in roles.items() if is_student]
+    courses, hometasks, submissions = [], [], []
+    if roles:
+        courses = [
+            {'id': course_id, 'title': title, 'is_teacher': roles[course_id][0], 'is_student': roles[course_id][1]}
+            for course_id, title in Course.objects.filter(id__in=roles).values_list('id', 'title')
+        ]
+    if studying:
+        submitted = CompletedHomework.objects.filter(hometask=OuterRef('pk'), creator=user_id)
+        hometasks = [
+            {'id': hometask_id, 'title': title, 'lecture': lecture_id, 'lecture_title': lecture_title,
+             'course': course_id}
+            for hometask_id, title, lecture_id, lecture_title, course_id in Hometask.objects.filter(
+                ~Exists(submitted), lecture__course__in=studying,
+            ).order_by('lecture__course_id', 'lecture_id', 'id').values_list(
+                'id', 'title', 'lecture_id', 'lecture__title', 'lecture__course_id')
+        ]
+        submissions = [
+            {'id': submission_id, 'hometask': hometask_id, 'hometask_title': title, 'course': course_id,
+             'link': link, 'mark': None if mark_id is None else {'id': mark_id, 'mark': mark}}
+            for submission_id, hometask_id, title, course_id, link, mark_id, mark in CompletedHomework.objects.filter(
+                creator=user_id, hometask__lecture__course__in=studying,
+            ).order_by('-id').values_list(
+                'id', 'hometask_id', 'hometask__title', 'hometask__lecture__course_id', 'link', 'mark__id',
+                'mark__mark')
+        ]
+    return {'courses': courses, 'pending_hometasks': hometasks, 'submissions': submissions}
+
+
+def get_dashboard(user_id):
+    roles = get_course_roles(user_id)
+    key = dashboard_key(user_id, roles)
+    cache = dashboard_cache()
+    dashboard = cache.get(key)
+    if dashboard is None:
+        with primary_reads():
+            dashboard = build_dashboard(user_id, roles)
+        cache.set(key, dashboard, settings.DASHBOARD_CACHE_TIMEOUT)
+    return dashboard
@@ -0,0 +1,90 @@
+import hashlib
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_etags
+
+RANGE = re.compile(r'^bytes=(\d*)-(\d*)$')
+READ_SIZE = 64 * 1024
+
+
+def parse_range(header, size):
+    match = RANGE.match(header.strip())
+    if match is None or not any(match.groups()):
+        return None
+    first, last = match.groups()
+    if not first:
+        start, end = max(size - int(last), 0), size - 1
+    else:
+        start, end = int(first), min(int(last), size - 1) if last else size - 1
+    if start > end or start >= size:
+        raise ValueError(header)
+    return start, end
+
+
+def file_etag(name, size, modified):
+    return '"{}"'.format(hashlib.sha1('{}:{}:{}'.format(name, size, modified.timestamp()).encode()).hexdigest())
+
+
+def content_disposition(name):
+    filename = os.path.basename(name)
+    if filename.isascii():
+        return 'inline; filename="{}"'.format(filename.replace('\\', '\\\\').replace('"', '\\"'))
+    return "inline; filename*=utf-8''{}".format(quote(filename))
+
+
+def read_range(stream, start, length):
+    with stream:
+        stream.seek(start)
+        while length:
+            data = stream.read(min(READ_SIZE, length))
+            if not data:
+                break
+            length -= len(data)
+            yield data
+
+
+def sendfile_response(storage, name):
+    response = HttpResponse(content_type=mimetypes.guess_type(name)[0] or 'application/octet-stream')
+    if settings.PRESENTATION_SENDFILE == 'x-accel':
+        response['X-Accel-Redirect'] = quote(settings.PRESENTATION_ACCEL_PREFIX + name)
+    else:
+        response['X-Sendfile'] = storage.path(name)
+    return response
+
+
+def serve_file(request, field_file, filename=None):
+    storage, name = field_file.storage, field_file.name
+    size, modified = storage.size(name), storage.get_modified_time(name)
+    etag = file_etag(name, size, modified)
+    response = get_conditional_response(request, etag=etag, last_modified=int(modified.timestamp()))
+    if response is not None:
+        return response
+    byte_range = None
+    if_range = request.headers.get('If-Range')
+    if request.headers.get('Range') and (if_range is None or etag in parse_etags(if_range)):
+        try:
+            byte_range = parse_range(request.headers['Range'], size)
+        except ValueError:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = 'bytes */{}'.format(size)
+            return response
+    if settings.PRESENTATION_SENDFILE:
+        response = sendfile_response(storage, name)
+    elif byte_range is None:
+        response = FileResponse(storage.open(name, 'rb'))
+    else:
+        start, end = byte_range
+        response = StreamingHttpResponse(read_range(storage.open(name, 'rb'), start, end - start + 1), status=206,
+                                         content_type=mimetypes.guess_type(name)[0] or 'application/octet-stream')
+        response['Content-Range'] = 'bytes {}-{}/{}'.format(start, end, size)
+        response['Content-Length'] = str(end - start + 1)
+    response['Accept-Ranges'] = 'bytes'
+    response['Content-Disposition'] = content_disposition(filename or name)
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(modified.timestamp())
+    return response
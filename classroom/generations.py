@@ -0,0 +1,15 @@
+import uuid
+
+
+def get_generations(cache, keys):
+    generations = cache.get_many(keys)
+    missing = {key: uuid.uuid4().hex for key in keys if key not in generations}
+    if missing:
+        cache.set_many(missing, None)
+        generations.update(missing)
+    return [generations[key] for key in keys]
+
+
+def bump_generations(cache, keys):
+    if keys:
+        cache.set_many({key: uuid.uuid4().hex for key in keys}, None)
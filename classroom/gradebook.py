@@ -0,0 +1,38 @@
+import csv
+import json
+from django.db.models import Count
+from .models import CompletedHomework
+
+GRADEBOOK_COLUMNS = ('submission', 'student', 'lecture', 'hometask', 'link', 'mark', 'comments')
+
+
+class Echo:
+    def write(self, value):
+        return value
+
+
+def gradebook_rows(course_id, chunk_size=2000):
+    return CompletedHomework.objects.filter(hometask__lecture__course=course_id).annotate(
+        comment_count=Count('mark__comments'),
+    ).order_by('hometask__lecture_id', 'hometask_id', 'creator__username').values_list(
+        'id', 'creator__username', 'hometask__lecture__title', 'hometask__title', 'link', 'mark__mark',
+        'comment_count',
+    ).iterator(chunk_size=chunk_size)
+
+
+def stream_csv(rows):
+    writer = csv.writer(Echo())
+    yield writer.writerow(GRADEBOOK_COLUMNS)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def stream_ndjson(rows):
+    for row in rows:
+        yield json.dumps(dict(zip(GRADEBOOK_COLUMNS, row))) + '\n'
+
+
+GRADEBOOK_FORMATS = {
+    'csv': (stream_csv, 'text/csv'),
+    'ndjson': (stream_ndjson, 'application/x-ndjson'),
+}
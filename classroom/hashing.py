@@ -0,0 +1,32 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from threading import BoundedSemaphore
+from django.conf import settings
+from django.contrib.auth.hashers import check_password, make_password
+
+
+class PasswordPoolBusy(Exception):
+    pass
+
+
+class PasswordHashingPool:
+    def __init__(self, workers, queue):
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='password-hashing')
+        self.slots = BoundedSemaphore(workers + queue)
+
+    async def run(self, func, *args):
+        if not self.slots.acquire(blocking=False):
+            raise PasswordPoolBusy()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+        finally:
+            self.slots.release()
+
+    async def check_password(self, password, encoded):
+        if encoded is None:
+            await self.run(make_password, password)
+            return False
+        return await self.run(check_password, password, encoded)
+
+
+password_pool = PasswordHashingPool(settings.PASSWORD_HASHING_WORKERS, settings.PASSWORD_HASHING_QUEUE)
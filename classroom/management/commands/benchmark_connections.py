@@ -0,0 +1,32 @@
+import time
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+
+class Command(BaseCommand):
+    help = 'Compares a query on a fresh database connection with the same query on a persistent one.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=200)
+        parser.add_argument('--database', default='default')
+
+    def query(self, connection):
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+            cursor.fetchone()
+
+    def measure(self, connection, iterations, reconnect):
+        started = time.perf_counter()
+        for _ in range(iterations):
+            if reconnect:
+                connection.close()
+            self.query(connection)
+        return (time.perf_counter() - started) / iterations * 1000
+
+    def handle(self, *args, **options):
+        connection = connections[options['database']]
+        self.query(connection)
+        fresh = self.measure(connection, options['iterations'], reconnect=True)
+        persistent = self.measure(connection, options['iterations'], reconnect=False)
+        self.stdout.write('{}: fresh connection {:.3f} ms, persistent connection {:.3f} ms, overhead {:.3f} ms'.format(
+            connection.vendor, fresh, persistent, fresh - persistent))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from classroom.blobs import collect_garbage
+
+
+class Command(BaseCommand):
+    help = 'Recounts presentation references and deletes presentation files no lecture uses.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--grace-seconds', type=int, default=3600)
+
+    def handle(self, *args, **options):
+        summary = collect_garbage(grace=options['grace_seconds'])
+        self.stdout.write('Recounted {recounted} blobs, dropped {orphans} orphans, removed {removed} files.'.format(
+            **summary))
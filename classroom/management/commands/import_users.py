@@ -0,0 +1,37 @@
+import os
+from django.core.management.base import BaseCommand, CommandError
+from classroom.models import Course
+from classroom.user_import import import_users, read_users, UserImportError
+
+
+class Command(BaseCommand):
+    help = 'Creates users in bulk from a CSV or JSON file and optionally enrolls them into a course.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--format', choices=('csv', 'json'), default=None)
+        parser.add_argument('--course', type=int, default=None)
+        parser.add_argument('--role', choices=('student', 'teacher'), default='student')
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        file_format = options['format'] or ('json' if options['path'].endswith('.json') else 'csv')
+        with open(options['path'], newline='', encoding='utf-8') as stream:
+            rows = read_users(stream, file_format)
+        if not isinstance(rows, list):
+            raise CommandError('Expected a list of users.')
+        course = None
+        if options['course'] is not None:
+            course = Course.objects.filter(pk=options['course']).first()
+            if course is None:
+                raise CommandError('Course {} does not exist.'.format(options['course']))
+        try:
+            summary = import_users(rows, course, options['role'], workers=options['workers'],
+                                   batch_size=options['batch_size'])
+        except UserImportError as error:
+            raise CommandError('\n'.join(
+                'row {}: {}'.format(item['row'], '; '.join(
+                    '{} {}'.format(field, ' '.join(messages)) for field, messages in item['errors'].items()))
+                for item in error.errors))
+        self.stdout.write('Created {created} users, enrolled {enrolled}.'.format(**summary))
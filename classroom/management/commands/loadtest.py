@@ -0,0 +1,75 @@
+import socket
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.error import HTTPError, URLError
+from urllib.parse import urlsplit
+from urllib.request import Request, urlopen
+from django.core.management.base import BaseCommand
+
+
+def percentile(values, fraction):
+    return values[min(len(values) - 1, int(len(values) * fraction))] if values else 0.0
+
+
+def trickle_upload(url, headers, stop, interval):
+    parts = urlsplit(url)
+    try:
+        with socket.create_connection((parts.hostname, parts.port or 80), timeout=30) as connection:
+            head = ['POST {} HTTP/1.1'.format(parts.path or '/'), 'Host: {}'.format(parts.netloc),
+                    'Content-Type: application/octet-stream', 'Content-Length: 1048576']
+            head += ['{}: {}'.format(name, value) for name, value in headers.items()]
+            connection.sendall(('\r\n'.join(head) + '\r\n\r\n').encode())
+            while not stop.wait(interval):
+                connection.sendall(b'0' * 16)
+    except OSError:
+        pass
+
+
+class Command(BaseCommand):
+    help = 'Sends concurrent GET requests to a deployed URL and reports throughput and latency, ' \
+           'optionally while slow clients keep uploads open.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('url')
+        parser.add_argument('--requests', type=int, default=1000)
+        parser.add_argument('--concurrency', type=int, default=50)
+        parser.add_argument('--token', default=None)
+        parser.add_argument('--slow-clients', type=int, default=0)
+        parser.add_argument('--slow-url', default=None)
+        parser.add_argument('--timeout', type=float, default=30.0)
+
+    def handle(self, *args, **options):
+        headers = {'Authorization': 'Token {}'.format(options['token'])} if options['token'] else {}
+        stop = threading.Event()
+        slow_url = options['slow_url'] or options['url']
+        slow = [threading.Thread(target=trickle_upload, args=(slow_url, headers, stop, 1.0), daemon=True)
+                for _ in range(options['slow_clients'])]
+        for thread in slow:
+            thread.start()
+        time.sleep(1 if slow else 0)
+
+        def fetch(_):
+            started = time.perf_counter()
+            try:
+                with urlopen(Request(options['url'], headers=headers), timeout=options['timeout']) as response:
+                    response.read()
+                    ok = response.status < 400
+            except (HTTPError, URLError, OSError):
+                ok = False
+            return ok, time.perf_counter() - started
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as pool:
+            results = list(pool.map(fetch, range(options['requests'])))
+        elapsed = time.perf_counter() - started
+        stop.set()
+
+        latencies = sorted(latency for ok, latency in results if ok)
+        errors = len(results) - len(latencies)
+        self.stdout.write('requests: {}, errors: {}, slow clients: {}'.format(len(results), errors, len(slow)))
+        self.stdout.write('throughput: {:.1f} req/s'.format(len(results) / elapsed if elapsed else 0.0))
+        self.stdout.write('latency ms: mean {:.1f}, p50 {:.1f}, p95 {:.1f}, p99 {:.1f}'.format(
+            statistics.mean(latencies) * 1000 if latencies else 0.0, percentile(latencies, 0.5) * 1000,
+            percentile(latencies, 0.95) * 1000, percentile(latencies, 0.99) * 1000))
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from classroom.models import AuthToken
+
+
+class Command(BaseCommand):
+    help = 'Deletes expired authentication tokens.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=10000)
+
+    def handle(self, *args, **options):
+        deleted = 0
+        while True:
+            expired = list(AuthToken.objects.filter(expires__lte=timezone.now())
+                           .values_list('id', flat=True)[:options['batch_size']])
+            if not expired:
+                break
+            deleted += AuthToken.objects.filter(id__in=expired).delete()[0]
+        self.stdout.write('Deleted {} expired tokens.'.format(deleted))
@@ -0,0 +1,21 @@
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from classroom.models import PresentationUpload
+from classroom.uploads import discard_part
+
+
+class Command(BaseCommand):
+    help = 'Deletes presentation uploads that were not finished in time, with their partial files.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hours', type=int, default=24)
+
+    def handle(self, *args, **options):
+        stale = PresentationUpload.objects.filter(created__lte=timezone.now() - timedelta(hours=options['hours']))
+        deleted = 0
+        for upload in stale.only('id').iterator():
+            discard_part(upload)
+            upload.delete()
+            deleted += 1
+        self.stdout.write('Deleted {} unfinished uploads.'.format(deleted))
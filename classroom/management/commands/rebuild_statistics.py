@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from classroom.course_statistics import rebuild_statistics
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds course and hometask statistics from courses, submissions and marks.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--course', type=int, action='append', dest='courses')
+
+    def handle(self, *args, **options):
+        summary = rebuild_statistics(options['courses'])
+        self.stdout.write('Rebuilt statistics of {courses} courses and {hometasks} hometasks.'.format(**summary))
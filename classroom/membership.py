@@ -0,0 +1,98 @@
+from collections import namedtuple
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Value
+from .models import Course, Lecture, Hometask, CompletedHomework, Mark, Comment
+from .routers import primary_reads
+
+ROLE_CACHE_KEY = 'classroom:course-roles:{}'
+
+
+class CourseRole(namedtuple('CourseRole', ('is_teacher', 'is_student'))):
+    __slots__ = ()
+
+    @property
+    def is_member(self):
+        return self.is_teacher or self.is_student
+
+
+NO_ROLE = CourseRole(False, False)
+
+
+class Ancestry(namedtuple('Ancestry', ('course_id', 'owner_id', 'role'))):
+    __slots__ = ()
+
+    def is_owned_by(self, user):
+        return self.owner_id is not None and self.owner_id == user.id
+
+
+ANCESTRY_PATHS = {
+    Lecture: ('course_id', None),
+    Hometask: ('lecture__course_id', None),
+    CompletedHomework: ('hometask__lecture__course_id', 'creator_id'),
+    Mark: ('completed_homework__hometask__lecture__course_id', 'completed_homework__creator_id'),
+    Comment: ('mark__completed_homework__hometask__lecture__course_id', 'mark__completed_homework__creator_id'),
+}
+
+
+def role_cache():
+    return caches[settings.COURSE_ROLE_CACHE]
+
+
+def fetch_course_roles(user_id):
+    teaching = Course.teacher.through.objects.filter(user_id=user_id).annotate(
+        role=Value('T')).values_list('course_id', 'role')
+    studying = Course.student.through.objects.filter(user_id=user_id).annotate(
+        role=Value('S')).values_list('course_id', 'role')
+    roles = {}
+    for course_id, role in teaching.union(studying, all=True):
+        is_teacher, is_student = roles.get(course_id, NO_ROLE)
+        roles[course_id] = (is_teacher or role == 'T', is_student or role == 'S')
+    return roles
+
+
+def get_course_roles(user_id):
+    key = ROLE_CACHE_KEY.format(user_id)
+    cache = role_cache()
+    roles = cache.get(key)
+    if roles is None:
+        with primary_reads():
+            roles = fetch_course_roles(user_id)
+        cache.set(key, roles, settings.COURSE_ROLE_CACHE_TIMEOUT)
+    return roles
+
+
+def invalidate_course_roles(user_ids):
+    role_cache().delete_many([ROLE_CACHE_KEY.format(user_id) for user_id in user_ids])
+
+
+def get_course_role(request, course_id):
+    if not request.user.is_authenticated:
+        return NO_ROLE
+    roles = getattr(request, '_course_roles', None)
+    if roles is None:
+        roles = get_course_roles(request.user.id)
+        request._course_roles = roles
+    return CourseRole(*roles.get(course_id, NO_ROLE))
+
+
+def fetch_ancestry(model, pk):
+    course_path, owner_path = ANCESTRY_PATHS[model]
+    fields = (course_path, owner_path) if owner_path else (course_path,)
+    for row in model.objects.filter(pk=pk).order_by().values_list(*fields):
+        return row + (None,) * (2 - len(row))
+    return None, None
+
+
+def get_ancestry(request, model, pk):
+    if pk is None:
+        return Ancestry(None, None, NO_ROLE)
+    ancestors = getattr(request, '_ancestors', None)
+    if ancestors is None:
+        ancestors = {}
+        request._ancestors = ancestors
+    key = (model, int(pk))
+    if key not in ancestors:
+        ancestors[key] = fetch_ancestry(model, pk)
+    course_id, owner_id = ancestors[key]
+    return Ancestry(course_id, owner_id, get_course_role(request, course_id))
@@ -1,108 +1,108 @@
-# Generated by Django 4.0 on 2021-12-25 11:23
-
-from django.conf import settings
-import django.contrib.auth.models
-import django.contrib.auth.validators
-from django.db import migrations, models
-import django.db.models.deletion
-
-
-class Migration(migrations.Migration):
-
-    initial = True
-
-    dependencies = [
-    ]
-
-    operations = [
-        migrations.CreateModel(
-            name='User',
-            fields=[
-                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
-                ('password', models.CharField(max_length=128, verbose_name='password')),
-                ('last_login', models.DateTimeField(blank=True, null=True, verbose_name='last login')),
-                ('username', models.CharField(error_messages={'unique': 'A user with that username already exists.'}, help_text='Required. 150 characters or fewer. Letters, digits and @/./+/-/_ only.', max_length=150, unique=True, validators=[django.contrib.auth.validators.UnicodeUsernameValidator()])),
-                ('first_name', models.CharField(max_length=250)),
-                ('last_name', models.CharField(max_length=250)),
-                ('email', models.EmailField(max_length=254, unique=True)),
-                ('registration_role', models.CharField(choices=[('S', 'Student'), ('T', 'Teacher')], default='S', max_length=1)),
-            ],
-            options={
-                'ordering': ['username'],
-            },
-            managers=[
-                ('objects', django.contrib.auth.models.UserManager()),
-            ],
-        ),
-        migrations.CreateModel(
-            name='CompletedHomework',
-            fields=[
-                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
-                ('link', models.URLField(blank=True, null=True)),
-                ('creator', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='completed_homework', to='classroom.user')),
-            ],
-        ),
-        migrations.CreateModel(
-            name='Course',
-            fields=[
-                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
-                ('title', models.CharField(db_index=True, max_length=250, unique=True)),
-                ('description', models.TextField(max_length=256)),
-                ('creator', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='courses', to='classroom.user')),
-                ('student', models.ManyToManyField(blank=True, related_name='students', to=settings.AUTH_USER_MODEL)),
-                ('teacher', models.ManyToManyField(blank=True, related_name='teachers', to=settings.AUTH_USER_MODEL)),
-            ],
-            options={
-                'ordering': ['title'],
-            },
-        ),
-        migrations.CreateModel(
-            name='Mark',
-            fields=[
-                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
-                ('mark', models.IntegerField()),
-                ('completed_homework', models.OneToOneField(blank=True, on_delete=django.db.models.deletion.CASCADE, related_name='mark', to='classroom.completedhomework')),
-                ('creator', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='marks', to='classroom.user')),
-            ],
-        ),
-        migrations.CreateModel(
-            name='Lecture',
-            fields=[
-                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
-                ('title', models.CharField(db_index=True, max_length=64, unique=True)),
-                ('presentation', models.FileField(blank=True, null=True, upload_to='presentation/%Y-%m-%d-')),
-                ('course', models.ForeignKey(blank=True, on_delete=django.db.models.deletion.CASCADE, related_name='course_lectures', to='classroom.course')),
-                ('creator', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='creator', to='classroom.user')),
-            ],
-            options={
-                'ordering': ['-id'],
-            },
-        ),
-        migrations.CreateModel(
-            name='Hometask',
-            fields=[
-                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
-                ('title', models.CharField(db_index=True, max_length=64, unique=True)),
-                ('description', models.TextField(max_length=256)),
-                ('creator', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='teacher', to='classroom.user')),
-                ('lecture', models.ForeignKey(blank=True, on_delete=django.db.models.deletion.CASCADE, related_name='hometask', to='classroom.lecture')),
-            ],
-            options={
-                'ordering': ['title'],
-            },
-        ),
-        migrations.AddField(
-            model_name='completedhomework',
-            name='hometask',
-            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='completed_homework', to='classroom.hometask'),
-        ),
-        migrations.CreateModel(
-            name='Comment',
-            fields=[
-                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
-                ('comment_text', models.TextField(max_length=1024)),
-                ('creator', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='comments', to='classroom.user')),
-                ('mark', models.ForeignKey(blank=True, on_delete=django.db.models.deletion.CASCADE, related_name='comments', to='classroom.mark')),
-            ],
-        ),
-    ]
+# Generated by Django 4.0 on 2021-12-25 11:23
+
+from django.conf import settings
+import django.contrib.auth.models
+import django.contrib.auth.validators
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='User',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('password', models.CharField(max_length=128, verbose_name='password')),
+                ('last_login', models.DateTimeField(blank=True, null=True, verbose_name='last login')),
+                ('username', models.CharField(error_messages={'unique': 'A user with that username already exists.'}, help_text='Required. 150 characters or fewer. Letters, digits and @/./+/-/_ only.', max_length=150, unique=True, validators=[django.contrib.auth.validators.UnicodeUsernameValidator()])),
+                ('first_name', models.CharField(max_length=250)),
+                ('last_name', models.CharField(max_length=250)),
+                ('email', models.EmailField(max_length=254, unique=True)),
+                ('registration_role', models.CharField(choices=[('S', 'Student'), ('T', 'Teacher')], default='S', max_length=1)),
+            ],
+            options={
+                'ordering': ['username'],
+            },
+            managers=[
+                ('objects', django.contrib.auth.models.UserManager()),
+            ],
+        ),
+        migrations.CreateModel(
+            name='CompletedHomework',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('link', models.URLField(blank=True, null=True)),
+                ('creator', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='completed_homework', to='classroom.user')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Course',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(db_index=True, max_length=250, unique=True)),
+                ('description', models.TextField(max_length=256)),
+                ('creator', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='courses', to='classroom.user')),
+                ('student', models.ManyToManyField(blank=True, related_name='students', to=settings.AUTH_USER_MODEL)),
+                ('teacher', models.ManyToManyField(blank=True, related_name='teachers', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['title'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Mark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('mark', models.IntegerField()),
+                ('completed_homework', models.OneToOneField(blank=True, on_delete=django.db.models.deletion.CASCADE, related_name='mark', to='classroom.completedhomework')),
+                ('creator', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='marks', to='classroom.user')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Lecture',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(db_index=True, max_length=64, unique=True)),
+                ('presentation', models.FileField(blank=True, null=True, upload_to='presentation/%Y-%m-%d-')),
+                ('course', models.ForeignKey(blank=True, on_delete=django.db.models.deletion.CASCADE, related_name='course_lectures', to='classroom.course')),
+                ('creator', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='creator', to='classroom.user')),
+            ],
+            options={
+                'ordering': ['-id'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Hometask',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(db_index=True, max_length=64, unique=True)),
+                ('description', models.TextField(max_length=256)),
+                ('creator', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='teacher', to='classroom.user')),
+                ('lecture', models.ForeignKey(blank=True, on_delete=django.db.models.deletion.CASCADE, related_name='hometask', to='classroom.lecture')),
+            ],
+            options={
+                'ordering': ['title'],
+            },
+        ),
+        migrations.AddField(
+            model_name='completedhomework',
+            name='hometask',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='completed_homework', to='classroom.hometask'),
+        ),
+        migrations.CreateModel(
+            name='Comment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('comment_text', models.TextField(max_length=1024)),
+                ('creator', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='comments', to='classroom.user')),
+                ('mark', models.ForeignKey(blank=True, on_delete=django.db.models.deletion.CASCADE, related_name='comments', to='classroom.mark')),
+            ],
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 4.0 on 2026-10-18 16:47
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('classroom', '0002_authtoken'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PresentationUpload',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('filename', models.CharField(max_length=100)),
+                ('size', models.PositiveBigIntegerField()),
+                ('offset', models.PositiveBigIntegerField(default=0)),
+                ('created', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('creator', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='presentation_uploads', to='classroom.user')),
+                ('lecture', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='presentation_uploads', to='classroom.lecture')),
+            ],
+        ),
+    ]
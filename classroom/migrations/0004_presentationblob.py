@@ -0,0 +1,29 @@
+# Generated by Django 4.0 on 2026-10-18 16:52
+
+import classroom.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('classroom', '0003_presentationupload'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PresentationBlob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('digest', models.CharField(blank=True, db_index=True, max_length=64)),
+                ('size', models.PositiveBigIntegerField()),
+                ('references', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='lecture',
+            name='presentation',
+            field=models.FileField(blank=True, db_index=True, null=True, storage=classroom.storage.presentation_storage, upload_to='presentation'),
+        ),
+    ]
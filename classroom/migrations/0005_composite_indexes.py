@@ -0,0 +1,83 @@
+# Generated by Django 4.0 on 2026-10-18 17:03
+
+from django.db import migrations, models
+from django.db.models import Count
+import django.db.models.deletion
+
+
+def remove_duplicate_submissions(apps, schema_editor):
+    CompletedHomework = apps.get_model('classroom', 'CompletedHomework')
+    duplicates = (CompletedHomework.objects.filter(hometask__isnull=False).values('hometask_id', 'creator_id')
+                  .annotate(submissions=Count('id')).filter(submissions__gt=1).order_by())
+    stale = []
+    for duplicate in duplicates.iterator():
+        stale += CompletedHomework.objects.filter(
+            hometask_id=duplicate['hometask_id'], creator_id=duplicate['creator_id'],
+        ).order_by('-id').values_list('id', flat=True)[1:]
+    graded = sorted(CompletedHomework.objects.filter(id__in=stale, mark__isnull=False).values_list('id', flat=True))
+    if graded:
+        raise RuntimeError(
+            'Completed homework {} duplicate newer submissions of the same student and are graded. Move or delete '
+            'their marks, then run the migration again.'.format(', '.join(map(str, graded))))
+    CompletedHomework.objects.filter(id__in=stale).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('classroom', '0004_presentationblob'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['mark', '-id'], name='comment_mark_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='completedhomework',
+            index=models.Index(fields=['hometask', '-id'], name='completed_hometask_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='hometask',
+            index=models.Index(fields=['lecture', 'title'], name='hometask_lecture_title_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='lecture',
+            index=models.Index(fields=['course', '-id'], name='lecture_course_id_idx'),
+        ),
+        migrations.RunSQL(
+            sql=[
+                'CREATE INDEX course_student_user_course_idx ON classroom_course_student (user_id, course_id)',
+                'CREATE INDEX course_teacher_user_course_idx ON classroom_course_teacher (user_id, course_id)',
+            ],
+            reverse_sql=[
+                'DROP INDEX course_student_user_course_idx',
+                'DROP INDEX course_teacher_user_course_idx',
+            ],
+        ),
+        migrations.AlterField(
+            model_name='comment',
+            name='mark',
+            field=models.ForeignKey(blank=True, db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='comments', to='classroom.mark'),
+        ),
+        migrations.AlterField(
+            model_name='completedhomework',
+            name='hometask',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='completed_homework', to='classroom.hometask'),
+        ),
+        migrations.AlterField(
+            model_name='hometask',
+            name='lecture',
+            field=models.ForeignKey(blank=True, db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='hometask', to='classroom.lecture'),
+        ),
+        migrations.AlterField(
+            model_name='lecture',
+            name='course',
+            field=models.ForeignKey(blank=True, db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='course_lectures', to='classroom.course'),
+        ),
+        migrations.RunPython(remove_duplicate_submissions, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='completedhomework',
+            constraint=models.UniqueConstraint(fields=('hometask', 'creator'), name='unique_submission_per_student'),
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 4.0 on 2026-10-18 17:08
+
+from datetime import timedelta
+from django.db import migrations, models
+import django.utils.timezone
+
+
+def mark_graded_submissions(apps, schema_editor):
+    CompletedHomework = apps.get_model('classroom', 'CompletedHomework')
+    CompletedHomework.objects.filter(mark__isnull=False).update(is_graded=True)
+
+
+def spread_submission_times(apps, schema_editor):
+    CompletedHomework = apps.get_model('classroom', 'CompletedHomework')
+    ids = list(CompletedHomework.objects.order_by('id').values_list('id', flat=True))
+    started = django.utils.timezone.now() - timedelta(microseconds=len(ids))
+    CompletedHomework.objects.bulk_update([
+        CompletedHomework(id=pk, submitted_at=started + timedelta(microseconds=index)) for index, pk in enumerate(ids)
+    ], ['submitted_at'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('classroom', '0005_composite_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='completedhomework',
+            name='is_graded',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.AddField(
+            model_name='completedhomework',
+            name='submitted_at',
+            field=models.DateTimeField(auto_now_add=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.RunPython(mark_graded_submissions, migrations.RunPython.noop),
+        migrations.RunPython(spread_submission_times, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='completedhomework',
+            index=models.Index(condition=models.Q(('is_graded', False)), fields=['submitted_at', 'id'], name='completed_ungraded_idx'),
+        ),
+    ]
@@ -0,0 +1,85 @@
+# Generated by Django 4.0 on 2026-10-18 17:10
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def grouped_counts(queryset, field):
+    return dict(queryset.values(field).annotate(total=models.Count('*')).order_by().values_list(field, 'total'))
+
+
+def fill_statistics(apps, schema_editor):
+    Course = apps.get_model('classroom', 'Course')
+    Hometask = apps.get_model('classroom', 'Hometask')
+    CompletedHomework = apps.get_model('classroom', 'CompletedHomework')
+    Mark = apps.get_model('classroom', 'Mark')
+    CourseStatistics = apps.get_model('classroom', 'CourseStatistics')
+    HometaskStatistics = apps.get_model('classroom', 'HometaskStatistics')
+    MarkDistribution = apps.get_model('classroom', 'MarkDistribution')
+    students = grouped_counts(Course.student.through.objects.all(), 'course_id')
+    teachers = grouped_counts(Course.teacher.through.objects.all(), 'course_id')
+    lectures = grouped_counts(apps.get_model('classroom', 'Lecture').objects.all(), 'course_id')
+    hometasks = grouped_counts(Hometask.objects.all(), 'lecture__course_id')
+    CourseStatistics.objects.bulk_create(CourseStatistics(
+        course_id=course_id, students=students.get(course_id, 0), teachers=teachers.get(course_id, 0),
+        lectures=lectures.get(course_id, 0), hometasks=hometasks.get(course_id, 0),
+    ) for course_id in Course.objects.values_list('id', flat=True).iterator())
+    submissions = grouped_counts(CompletedHomework.objects.filter(hometask__isnull=False), 'hometask_id')
+    marks = Mark.objects.filter(completed_homework__hometask__isnull=False)
+    mark_totals = {row['completed_homework__hometask_id']: (row['total'], row['mark_sum']) for row in marks.values(
+        'completed_homework__hometask_id').annotate(total=models.Count('*'), mark_sum=models.Sum('mark')).order_by()}
+    hometask_courses = dict(Hometask.objects.values_list('id', 'lecture__course_id'))
+    HometaskStatistics.objects.bulk_create(HometaskStatistics(
+        hometask_id=hometask_id, course_id=course_id, submissions=submissions.get(hometask_id, 0),
+        marks=mark_totals.get(hometask_id, (0, 0))[0], mark_sum=mark_totals.get(hometask_id, (0, 0))[1],
+    ) for hometask_id, course_id in hometask_courses.items())
+    MarkDistribution.objects.bulk_create(MarkDistribution(
+        hometask_id=row['completed_homework__hometask_id'], mark=row['mark'], count=row['total'],
+        course_id=hometask_courses[row['completed_homework__hometask_id']],
+    ) for row in marks.values('completed_homework__hometask_id', 'mark').annotate(
+        total=models.Count('*')).order_by().iterator())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('classroom', '0006_grading_queue'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CourseStatistics',
+            fields=[
+                ('course', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='statistics', serialize=False, to='classroom.course')),
+                ('students', models.IntegerField(default=0)),
+                ('teachers', models.IntegerField(default=0)),
+                ('lectures', models.IntegerField(default=0)),
+                ('hometasks', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='MarkDistribution',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('mark', models.IntegerField()),
+                ('count', models.IntegerField(default=0)),
+                ('course', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='mark_distribution', to='classroom.course')),
+                ('hometask', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='mark_distribution', to='classroom.hometask')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='HometaskStatistics',
+            fields=[
+                ('hometask', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='statistics', serialize=False, to='classroom.hometask')),
+                ('submissions', models.IntegerField(default=0)),
+                ('marks', models.IntegerField(default=0)),
+                ('mark_sum', models.BigIntegerField(default=0)),
+                ('course', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='hometask_statistics', to='classroom.course')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='markdistribution',
+            constraint=models.UniqueConstraint(fields=('hometask', 'mark'), name='unique_mark_per_hometask'),
+        ),
+        migrations.RunPython(fill_statistics, migrations.RunPython.noop),
+    ]
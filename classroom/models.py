@@ -1,105 +1,233 @@
-from django.contrib.auth.validators import UnicodeUsernameValidator
-from django.db import models
-from django.contrib.auth.models import AbstractBaseUser
-from django.contrib.auth.models import UserManager
-
-
-class User(AbstractBaseUser):
-    username_validator = UnicodeUsernameValidator()
-    ROLE_CHOICES = (
-        ('S', 'Student'),
-        ('T', 'Teacher'),
-    )
-    username = models.CharField(max_length=150, unique=True,
-                                help_text='Required. No more than 150 characters.',
-                                validators=[username_validator],
-                                error_messages={
-                                    'unique': "A user with that username already exists.",
-                                },
-                                )
-    first_name = models.CharField(max_length=250, blank=False)
-    last_name = models.CharField(max_length=250, blank=False)
-    email = models.EmailField(unique=True, blank=False)
-    registration_role = models.CharField(max_length=1, choices=ROLE_CHOICES, default='S',)
-
-    def __str__(self):
-        return '{} {}'.format(self.first_name, self.last_name)
-
-    EMAIL_FIELD = 'email'
-    USERNAME_FIELD = 'username'
-    REQUIRED_FIELDS = ['email']
-
-    class Meta:
-        ordering = ['username']
-
-    objects = UserManager()
-
-
-class Course(models.Model):
-    title = models.CharField(db_index=True, unique=True, max_length=250)
-    description = models.TextField(max_length=256)
-    creator = models.ForeignKey(User, on_delete=models.CASCADE, related_name='courses')
-    student = models.ManyToManyField(User, blank=True, related_name='students')
-    teacher = models.ManyToManyField(User, blank=True, related_name='teachers')
-
-    def __str__(self):
-        return '{}, created by: {}'.format(self.title, self.creator)
-
-    class Meta:
-        ordering = ['title']
-
-
-class Lecture(models.Model):
-    title = models.CharField(db_index=True, unique=True, max_length=64)
-    course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='course_lectures', blank=True)
-    creator = models.ForeignKey(User, on_delete=models.CASCADE, related_name='creator')
-    presentation = models.FileField(upload_to='presentation/%Y-%m-%d-', blank=True, null=True)
-
-    def __str__(self):
-        return '{}, from {}'.format(self.title, self.course.title)
-
-    class Meta:
-        ordering = ['-id']
-
-
-class Hometask(models.Model):
-    title = models.CharField(db_index=True, unique=True, max_length=64)
-    description = models.TextField(max_length=256)
-    creator = models.ForeignKey(User, on_delete=models.CASCADE, related_name='teacher')
-    lecture = models.ForeignKey(Lecture, on_delete=models.CASCADE, related_name='hometask', blank=True)
-
-    def __str__(self):
-        return '{}'.format(self.title)
-
-    class Meta:
-        ordering = ['title']
-
-
-
-class CompletedHomework(models.Model):
-    creator = models.ForeignKey(User, on_delete=models.CASCADE, related_name='completed_homework')
-    link = models.URLField(max_length=200, blank=True, null=True)
-    hometask = models.ForeignKey(Hometask, on_delete=models.SET_NULL, blank=True, null=True,
-                                 related_name='completed_homework')
-
-    def __str__(self):
-        return '{} {}: link {}'.format(self.creator.first_name, self.creator.last_name, self.link)
-
-
-class Mark(models.Model):
-    creator = models.ForeignKey(User, on_delete=models.CASCADE, related_name='marks')
-    completed_homework = models.OneToOneField(CompletedHomework, on_delete=models.CASCADE, related_name='mark',
-                                              blank=True)
-    mark = models.IntegerField()
-
-    def __str__(self):
-        return 'Evaluated: {} by {} {}'.format(self.mark, self.creator.first_name, self.creator.last_name)
-
-
-class Comment(models.Model):
-    mark = models.ForeignKey(Mark, on_delete=models.CASCADE, related_name='comments', blank=True)
-    creator = models.ForeignKey(User, on_delete=models.CASCADE, related_name='comments')
-    comment_text = models.TextField(max_length=1024)
-
-    def __str__(self):
-        return '{} {} commented: {}'.format(self.creator.first_name, self.creator.last_name, self.comment_text)
+import hashlib
+import secrets
+from datetime import timedelta
+from django.conf import settings
+from django.contrib.auth.validators import UnicodeUsernameValidator
+from django.db import models
+from django.utils import timezone
+from django.contrib.auth.models import AbstractBaseUser
+from django.contrib.auth.models import UserManager
+from .storage import presentation_storage
+
+
+class User(AbstractBaseUser):
+    username_validator = UnicodeUsernameValidator()
+    ROLE_CHOICES = (
+        ('S', 'Student'),
+        ('T', 'Teacher'),
+    )
+    username = models.CharField(max_length=150, unique=True,
+                                help_text='Required. No more than 150 characters.',
+                                validators=[username_validator],
+                                error_messages={
+                                    'unique': "A user with that username already exists.",
+                                },
+                                )
+    first_name = models.CharField(max_length=250, blank=False)
+    last_name = models.CharField(max_length=250, blank=False)
+    email = models.EmailField(unique=True, blank=False)
+    registration_role = models.CharField(max_length=1, choices=ROLE_CHOICES, default='S',)
+
+    def __str__(self):
+        return '{} {}'.format(self.first_name, self.last_name)
+
+    EMAIL_FIELD = 'email'
+    USERNAME_FIELD = 'username'
+    REQUIRED_FIELDS = ['email']
+
+    class Meta:
+        ordering = ['username']
+
+    objects = UserManager()
+
+
+class AuthToken(models.Model):
+    digest = models.CharField(max_length=64, unique=True)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='auth_tokens')
+    device = models.CharField(max_length=64, blank=True)
+    created = models.DateTimeField(auto_now_add=True)
+    expires = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return '{} token of {}, expires {}'.format(self.device or 'default', self.user, self.expires)
+
+    @staticmethod
+    def hash_key(key):
+        return hashlib.sha256(key.encode()).hexdigest()
+
+    @classmethod
+    def issue(cls, user, device=''):
+        key = secrets.token_urlsafe(32)
+        token = cls.objects.create(digest=cls.hash_key(key), user=user, device=device,
+                                   expires=timezone.now() + timedelta(seconds=settings.AUTH_TOKEN_TTL))
+        return key, token
+
+    @classmethod
+    def login(cls, user, device=''):
+        cls.objects.filter(models.Q(device=device) | models.Q(expires__lte=timezone.now()), user=user).delete()
+        return cls.issue(user, device)
+
+
+class Course(models.Model):
+    title = models.CharField(db_index=True, unique=True, max_length=250)
+    description = models.TextField(max_length=256)
+    creator = models.ForeignKey(User, on_delete=models.CASCADE, related_name='courses')
+    student = models.ManyToManyField(User, blank=True, related_name='students')
+    teacher = models.ManyToManyField(User, blank=True, related_name='teachers')
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return '{}, created by: {}'.format(self.title, self.creator)
+
+    class Meta:
+        ordering = ['title']
+
+
+class CourseStatistics(models.Model):
+    course = models.OneToOneField(Course, on_delete=models.CASCADE, primary_key=True, related_name='statistics')
+    students = models.IntegerField(default=0)
+    teachers = models.IntegerField(default=0)
+    lectures = models.IntegerField(default=0)
+    hometasks = models.IntegerField(default=0)
+
+    def __str__(self):
+        return 'Statistics of {}'.format(self.course.title)
+
+
+class Lecture(models.Model):
+    title = models.CharField(db_index=True, unique=True, max_length=64)
+    course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='course_lectures', blank=True,
+                               db_index=False)
+    creator = models.ForeignKey(User, on_delete=models.CASCADE, related_name='creator')
+    presentation = models.FileField(upload_to='presentation', storage=presentation_storage, blank=True,
+                                    null=True, db_index=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return '{}, from {}'.format(self.title, self.course.title)
+
+    class Meta:
+        ordering = ['-id']
+        indexes = [
+            models.Index(fields=['course', '-id'], name='lecture_course_id_idx'),
+        ]
+
+
+class PresentationBlob(models.Model):
+    name = models.CharField(max_length=100, unique=True)
+    digest = models.CharField(max_length=64, db_index=True, blank=True)
+    size = models.PositiveBigIntegerField()
+    references = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return '{}, {} references'.format(self.name, self.references)
+
+
+class PresentationUpload(models.Model):
+    lecture = models.ForeignKey(Lecture, on_delete=models.CASCADE, related_name='presentation_uploads')
+    creator = models.ForeignKey(User, on_delete=models.CASCADE, related_name='presentation_uploads')
+    filename = models.CharField(max_length=100)
+    size = models.PositiveBigIntegerField()
+    offset = models.PositiveBigIntegerField(default=0)
+    created = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return '{} for {}, {} of {} bytes'.format(self.filename, self.lecture.title, self.offset, self.size)
+
+    @property
+    def complete(self):
+        return self.offset == self.size
+
+
+class Hometask(models.Model):
+    title = models.CharField(db_index=True, unique=True, max_length=64)
+    description = models.TextField(max_length=256)
+    creator = models.ForeignKey(User, on_delete=models.CASCADE, related_name='teacher')
+    lecture = models.ForeignKey(Lecture, on_delete=models.CASCADE, related_name='hometask', blank=True,
+                                db_index=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return '{}'.format(self.title)
+
+    class Meta:
+        ordering = ['title']
+        indexes = [
+            models.Index(fields=['lecture', 'title'], name='hometask_lecture_title_idx'),
+        ]
+
+
+class HometaskStatistics(models.Model):
+    hometask = models.OneToOneField(Hometask, on_delete=models.CASCADE, primary_key=True, related_name='statistics')
+    course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='hometask_statistics')
+    submissions = models.IntegerField(default=0)
+    marks = models.IntegerField(default=0)
+    mark_sum = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return 'Statistics of {}'.format(self.hometask.title)
+
+
+class MarkDistribution(models.Model):
+    hometask = models.ForeignKey(Hometask, on_delete=models.CASCADE, related_name='mark_distribution',
+                                 db_index=False)
+    course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='mark_distribution')
+    mark = models.IntegerField()
+    count = models.IntegerField(default=0)
+
+    def __str__(self):
+        return '{} times {} for {}'.format(self.count, self.mark, self.hometask.title)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['hometask', 'mark'], name='unique_mark_per_hometask'),
+        ]
+
+
+class CompletedHomework(models.Model):
+    creator = models.ForeignKey(User, on_delete=models.CASCADE, related_name='completed_homework')
+    link = models.URLField(max_length=200, blank=True, null=True)
+    hometask = models.ForeignKey(Hometask, on_delete=models.SET_NULL, blank=True, null=True,
+                                 related_name='completed_homework', db_index=False)
+    submitted_at = models.DateTimeField(auto_now_add=True)
+    is_graded = models.BooleanField(default=False, editable=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return '{} {}: link {}'.format(self.creator.first_name, self.creator.last_name, self.link)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['hometask', '-id'], name='completed_hometask_id_idx'),
+            models.Index(fields=['submitted_at', 'id'], condition=models.Q(is_graded=False),
+                         name='completed_ungraded_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['hometask', 'creator'], name='unique_submission_per_student'),
+        ]
+
+
+class Mark(models.Model):
+    creator = models.ForeignKey(User, on_delete=models.CASCADE, related_name='marks')
+    completed_homework = models.OneToOneField(CompletedHomework, on_delete=models.CASCADE, related_name='mark',
+                                              blank=True)
+    mark = models.IntegerField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return 'Evaluated: {} by {} {}'.format(self.mark, self.creator.first_name, self.creator.last_name)
+
+
+class Comment(models.Model):
+    mark = models.ForeignKey(Mark, on_delete=models.CASCADE, related_name='comments', blank=True, db_index=False)
+    creator = models.ForeignKey(User, on_delete=models.CASCADE, related_name='comments')
+    comment_text = models.TextField(max_length=1024)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return '{} {} commented: {}'.format(self.creator.first_name, self.creator.last_name, self.comment_text)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['mark', '-id'], name='comment_mark_id_idx'),
+        ]
@@ -0,0 +1,13 @@
+from rest_framework.pagination import CursorPagination
+
+
+class ModelOrderingCursorPagination(CursorPagination):
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+    ordering = '-id'
+
+    def get_ordering(self, request, queryset, view):
+        ordering = queryset.query.order_by or queryset.model._meta.ordering
+        if not ordering:
+            return (self.ordering,)
+        return tuple(ordering)
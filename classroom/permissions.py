@@ -1,94 +1,103 @@
-from rest_framework import permissions
-from .models import Course, CompletedHomework
-
-
-class IsTeacherOrReadOnly(permissions.BasePermission):
-    def has_permission(self, request, view):
-        if request.method in permissions.SAFE_METHODS:
-            return True
-        return request.user.registration_role == 'T'
-
-
-class IsCourseTeacherOrIsEnrolledReadOnly(permissions.BasePermission):
-    def has_object_permission(self, request, view, obj):
-        if request.method in permissions.SAFE_METHODS:
-            return request.user in obj.student.all() or request.user in obj.teacher.all()
-        return request.user in obj.teacher.all()
-
-
-class IsAbleToAddLecturesOrReadOnly(permissions.BasePermission):
-    def check(self, request, course):
-        if request.method in permissions.SAFE_METHODS:
-            return request.user in course.student.all() or request.user in course.teacher.all()
-        return request.user in course.teacher.all()
-
-    def has_permission(self, request, view):
-        parent_course = Course.objects.get(id=view.kwargs['course_pk'])
-        return self.check(request, parent_course)
-
-    def has_object_permission(self, request, view, obj):
-        parent_course = Course.objects.get(id=obj.course.id)
-        return self.check(request, parent_course)
-
-
-class IsAbleToAddHomeworkOrReadOnly(permissions.BasePermission):
-
-    def check(self, request, course):
-        if request.method in permissions.SAFE_METHODS:
-            return request.user in course.student.all() or request.user in course.teacher.all()
-        return request.user in course.teacher.all()
-
-    def has_permission(self, request, view):
-        parent_course = Course.objects.get(course_lectures=view.kwargs['lecture_pk'])
-        return self.check(request, parent_course)
-
-    def has_object_permission(self, request, view, obj):
-        parent_course = Course.objects.get(id=obj.lecture.course.id)
-        return self.check(request, parent_course)
-
-
-class IsAbleToUploadSolutionOrReadOnly(permissions.BasePermission):
-    def check(self, request, course):
-        if request.method in permissions.SAFE_METHODS:
-            return request.user in course.teacher.all() or request.user in course.student.all()
-        return request.user in course.student.all()
-
-    def has_permission(self, request, view):
-        parent_course = Course.objects.get(course_lectures__hometask=view.kwargs['hometasks_pk'])
-        return self.check(request, parent_course)
-
-    def has_object_permission(self, request, view, obj):
-        parent_course = Course.objects.get(id=obj.hometask.lecture.course.id)
-        return self.check(request, parent_course)
-
-
-class IsAbleToEvaluateOrEvaluatedReadOnly(IsAbleToAddHomeworkOrReadOnly):
-    def check(self, request, course, task):
-        if request.method in permissions.SAFE_METHODS:
-            return request.user in course.teacher.all() or request.user == task.creator
-        return request.user in course.teacher.all()
-
-    def has_permission(self, request, view):
-        parent_course = Course.objects.get(course_lectures__hometask__completed_homework=view.kwargs['pk'])
-        parent_completed_task = CompletedHomework.objects.get(id=view.kwargs['pk'])
-        return self.check(request, parent_course, parent_completed_task)
-
-    def has_object_permission(self, request, view, obj):
-        parent_course = Course.objects.get(id=obj.completed_homework.hometask.lecture.course.id)
-        parent_completed_task = CompletedHomework.objects.get(id=obj.completed_homework.id)
-        return self.check(request, parent_course, parent_completed_task)
-
-
-class IsAbleToCommentOrOwnerReadOnly(IsAbleToAddHomeworkOrReadOnly):
-    def check(self, request, course, task):
-        return request.user in course.teacher.all() or request.user == task.creator
-
-    def has_permission(self, request, view):
-        parent_course = Course.objects.get(course_lectures__hometask__completed_homework=view.kwargs['mark_pk'])
-        parent_completed_task = CompletedHomework.objects.get(id=view.kwargs['mark_pk'])
-        return self.check(request, parent_course, parent_completed_task)
-
-    def has_object_permission(self, request, view, obj):
-        parent_course = Course.objects.get(id=obj.mark.completed_homework.hometask.lecture.course.id)
-        parent_completed_task = CompletedHomework.objects.get(id=obj.mark.completed_homework.id)
-        return self.check(request, parent_course, parent_completed_task)
+from rest_framework import permissions
+from .membership import get_course_role, get_ancestry
+from .models import Lecture, Hometask, CompletedHomework, Mark
+
+
+class IsTeacherOrReadOnly(permissions.BasePermission):
+    def has_permission(self, request, view):
+        if request.method in permissions.SAFE_METHODS:
+            return True
+        return request.user.registration_role == 'T'
+
+
+class IsCourseTeacherOrIsEnrolledReadOnly(permissions.BasePermission):
+    def has_object_permission(self, request, view, obj):
+        role = get_course_role(request, obj.id)
+        if request.method in permissions.SAFE_METHODS:
+            return role.is_member
+        return role.is_teacher
+
+
+class IsCourseTeacher(permissions.BasePermission):
+    def has_permission(self, request, view):
+        return get_course_role(request, view.kwargs['pk']).is_teacher
+
+
+class IsAbleToAddLecturesOrReadOnly(permissions.BasePermission):
+    def check(self, request, role):
+        if request.method in permissions.SAFE_METHODS:
+            return role.is_member
+        return role.is_teacher
+
+    def has_permission(self, request, view):
+        return self.check(request, get_course_role(request, view.kwargs['course_pk']))
+
+    def has_object_permission(self, request, view, obj):
+        return self.check(request, get_course_role(request, obj.course_id))
+
+
+class IsAbleToAddHomeworkOrReadOnly(permissions.BasePermission):
+
+    def check(self, request, role):
+        if request.method in permissions.SAFE_METHODS:
+            return role.is_member
+        return role.is_teacher
+
+    def has_permission(self, request, view):
+        return self.check(request, get_ancestry(request, Lecture, view.kwargs['lecture_pk']).role)
+
+    def has_object_permission(self, request, view, obj):
+        return self.check(request, get_ancestry(request, Lecture, obj.lecture_id).role)
+
+
+class IsAbleToUploadSolutionOrReadOnly(permissions.BasePermission):
+    def check(self, request, role):
+        if request.method in permissions.SAFE_METHODS:
+            return role.is_member
+        return role.is_student
+
+    def has_permission(self, request, view):
+        return self.check(request, get_ancestry(request, Hometask, view.kwargs['hometasks_pk']).role)
+
+    def has_object_permission(self, request, view, obj):
+        return self.check(request, get_ancestry(request, Hometask, obj.hometask_id).role)
+
+
+class IsAbleToGradeHometask(permissions.BasePermission):
+    def has_permission(self, request, view):
+        return get_ancestry(request, Hometask, view.kwargs['hometasks_pk']).role.is_teacher
+
+
+class IsAbleToEvaluateOrEvaluatedReadOnly(permissions.BasePermission):
+    def check(self, request, ancestry):
+        if request.method in permissions.SAFE_METHODS:
+            return ancestry.role.is_teacher or ancestry.is_owned_by(request.user)
+        return ancestry.role.is_teacher
+
+    def has_permission(self, request, view):
+        model = getattr(view, 'pk_model', CompletedHomework)
+        return self.check(request, get_ancestry(request, model, view.kwargs['pk']))
+
+    def has_object_permission(self, request, view, obj):
+        return self.check(request, get_ancestry(request, Mark, obj.id))
+
+
+class IsAbleToCommentOrOwnerReadOnly(permissions.BasePermission):
+    def check(self, request, ancestry):
+        return ancestry.role.is_teacher or ancestry.is_owned_by(request.user)
+
+    def has_permission(self, request, view):
+        return self.check(request, get_ancestry(request, Mark, view.kwargs['mark_pk']))
+
+    def has_object_permission(self, request, view, obj):
+        return self.check(request, get_ancestry(request, Mark, obj.mark_id))
+
+
+class IsAbleToUploadPresentation(permissions.BasePermission):
+    def has_permission(self, request, view):
+        if 'lecture_pk' not in view.kwargs:
+            return True
+        return get_ancestry(request, Lecture, view.kwargs['lecture_pk']).role.is_teacher
+
+    def has_object_permission(self, request, view, obj):
+        return obj.creator_id == request.user.id
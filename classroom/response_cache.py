@@ -0,0 +1,105 @@
+import hashlib
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from rest_framework import status
+from rest_framework.response import Response
+from .generations import get_generations, bump_generations
+from .membership import get_course_role
+from .routers import primary_reads
+
+RESPONSE_CACHE_KEY = 'classroom:response:{}'
+COURSE_LIST_GENERATION_KEY = 'classroom:response-courses'
+COURSE_GENERATION_KEY = 'classroom:response-course:{}'
+HOMETASK_GENERATION_KEY = 'classroom:response-hometask:{}'
+
+
+def response_cache():
+    return caches[settings.RESPONSE_CACHE]
+
+
+def invalidate_course_list():
+    bump_generations(response_cache(), [COURSE_LIST_GENERATION_KEY])
+
+
+def invalidate_course_responses(course_ids):
+    bump_generations(response_cache(), [COURSE_GENERATION_KEY.format(course_id) for course_id in set(course_ids)
+                                        if course_id is not None])
+
+
+def invalidate_hometask_responses(hometask_ids):
+    bump_generations(response_cache(), [HOMETASK_GENERATION_KEY.format(hometask_id)
+                                        for hometask_id in set(hometask_ids) if hometask_id is not None])
+
+
+def response_etag(content):
+    return '"{}"'.format(hashlib.sha1(content).hexdigest())
+
+
+def cached_response(request, content, content_type, etag, last_modified=None):
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        response = HttpResponse(content, content_type=content_type)
+    response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified)
+    return response
+
+
+class CachedResponseMixin:
+    course_scoped = True
+
+    def get_cache_course_id(self):
+        return None
+
+    def get_last_modified(self):
+        return None
+
+    def get_cache_generation_keys(self, course_id):
+        if not self.course_scoped:
+            return [COURSE_LIST_GENERATION_KEY]
+        return [COURSE_GENERATION_KEY.format(course_id)]
+
+    def get_response_cache_key(self, request):
+        if request.accepted_renderer.format != 'json':
+            return None
+        course_id = self.get_cache_course_id()
+        if not self.course_scoped:
+            role = 'any'
+        else:
+            course_role = get_course_role(request, course_id)
+            if course_id is None or not course_role.is_member:
+                return None
+            role = 'teacher' if course_role.is_teacher else 'student'
+        generations = get_generations(response_cache(), self.get_cache_generation_keys(course_id))
+        state = (type(self).__name__, request.build_absolute_uri(), role, generations)
+        return RESPONSE_CACHE_KEY.format(hashlib.sha256(repr(state).encode()).hexdigest())
+
+    def get(self, request, *args, **kwargs):
+        self.response_cache_key = self.get_response_cache_key(request)
+        if self.response_cache_key is not None:
+            cached = response_cache().get(self.response_cache_key)
+            if cached is not None:
+                return cached_response(request, *cached)
+            with primary_reads():
+                last_modified = self.get_last_modified()
+                self.response_last_modified = None if last_modified is None else int(last_modified.timestamp())
+                return super().get(request, *args, **kwargs)
+        return super().get(request, *args, **kwargs)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if (getattr(self, 'response_cache_key', None) is None or not isinstance(response, Response)
+                or response.status_code != status.HTTP_200_OK):
+            return response
+        response.render()
+        response['ETag'] = response_etag(response.content)
+        if self.response_last_modified is not None:
+            response['Last-Modified'] = http_date(self.response_last_modified)
+        response_cache().set(self.response_cache_key, (
+            response.content, response['Content-Type'], response['ETag'], self.response_last_modified,
+        ), settings.RESPONSE_CACHE_TIMEOUT)
+        return get_conditional_response(request, etag=response['ETag'], last_modified=self.response_last_modified,
+                                        response=response)
@@ -0,0 +1,92 @@
+import hashlib
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, connections
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+PIN_CACHE_KEY = 'classroom:pin-primary:{}'
+PRIMARY_MODELS = {'classroom.authtoken', 'classroom.user'}
+
+
+class Route:
+    def __init__(self, database):
+        self.database = database
+        self.wrote = False
+        primary = connections[DEFAULT_DB_ALIAS]
+        self.in_atomic_block = primary.in_atomic_block
+        self.savepoints = len(primary.savepoint_ids)
+
+    def in_transaction(self):
+        primary = connections[DEFAULT_DB_ALIAS]
+        if primary.in_atomic_block and not self.in_atomic_block:
+            return True
+        return len(primary.savepoint_ids) > self.savepoints
+
+
+current_route = ContextVar('classroom_route', default=None)
+
+
+@contextmanager
+def primary_reads():
+    route = current_route.get()
+    database = None if route is None else route.database
+    if database is not None:
+        route.database = None
+    try:
+        yield
+    finally:
+        if database is not None and not route.wrote:
+            route.database = database
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        route = current_route.get()
+        if route is None or route.database is None or model._meta.label_lower in PRIMARY_MODELS:
+            return DEFAULT_DB_ALIAS
+        if route.in_transaction():
+            return DEFAULT_DB_ALIAS
+        return route.database
+
+    def db_for_write(self, model, **hints):
+        route = current_route.get()
+        if route is not None:
+            route.database = None
+            route.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db not in settings.DATABASE_REPLICAS
+
+
+def pin_key(request):
+    client = request.headers.get('Authorization') or request.META.get('REMOTE_ADDR', '')
+    return PIN_CACHE_KEY.format(hashlib.sha256(client.encode()).hexdigest())
+
+
+class ReplicaRoutingMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        replicas = settings.DATABASE_REPLICAS
+        if not replicas:
+            return self.get_response(request)
+        cache = caches[settings.REPLICA_PIN_CACHE]
+        key = pin_key(request)
+        use_replica = request.method in SAFE_METHODS and not cache.get(key)
+        route = Route(random.choice(replicas) if use_replica else None)
+        token = current_route.set(route)
+        try:
+            response = self.get_response(request)
+        finally:
+            current_route.reset(token)
+        if route.wrote or request.method not in SAFE_METHODS:
+            cache.set(key, True, settings.REPLICA_PIN_SECONDS)
+        return response
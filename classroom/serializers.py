@@ -1,166 +1,379 @@
-from django.contrib.auth import get_user_model
-from rest_framework import serializers
-from rest_framework.validators import UniqueValidator
-from .models import Course, Lecture, Hometask, CompletedHomework, Mark, Comment
-
-
-UserModel = get_user_model()
-
-
-class UserSerializer(serializers.ModelSerializer):
-    class Meta:
-        model = UserModel
-        fields = ('username', 'email', 'first_name', 'last_name', 'registration_role')
-
-
-class UserRegisterSerializer(serializers.ModelSerializer):
-    UserUniqueValidator = UniqueValidator(queryset=UserModel.objects.all(),
-                                          message='Username already exists.')
-    EmailUniqueValidator = UniqueValidator(queryset=UserModel.objects.all(),
-                                           message='Email already exists.')
-
-    username = serializers.CharField(min_length=5, max_length=15,
-                                     validators=[UserUniqueValidator])
-    password = serializers.CharField(min_length=5, max_length=25, write_only=True,
-                                     required=True, style={'input_type': 'password'})
-    email = serializers.EmailField(max_length=50, validators=[EmailUniqueValidator])
-
-    class Meta:
-        model = UserModel
-        fields = ('username', 'password', 'email', 'first_name', 'last_name', 'registration_role',)
-
-    def create(self, validated_data):
-        password = validated_data.get('password')
-        user = UserModel.objects.create(
-            username=validated_data.get('username'),
-            registration_role=validated_data.get('registration_role', 'S'),
-            first_name=validated_data.get('first_name'),
-            last_name=validated_data.get('last_name'),
-            email=validated_data.get('email'),
-        )
-        user.set_password(password)
-        user.save()
-        return user
-
-
-class CourseSerializer(serializers.ModelSerializer):
-    creator = serializers.HiddenField(default=serializers.CurrentUserDefault())
-
-    class Meta:
-        model = Course
-        exclude = ('student', 'teacher',)
-
-
-class CourseDetailSerializer(serializers.ModelSerializer):
-    course_lectures = serializers.StringRelatedField(read_only=True, many=True)
-    creator = serializers.StringRelatedField(read_only=True)
-
-    class Meta:
-        model = Course
-        fields = ('id', 'title', 'description', 'creator', 'student', 'teacher', 'course_lectures',)
-
-    def update(self, instance, validated_data):
-        instance.title = validated_data.get('title', instance.title)
-        instance.description = validated_data.get('description', instance.description)
-        students = validated_data.get('student')
-        teachers = validated_data.get('teacher')
-        if students:
-            for person in students:
-                instance.student.add(person)
-        if teachers:
-            for person in teachers:
-                instance.teacher.add(person)
-        instance.save()
-        return instance
-
-
-class LectureSerializer(serializers.ModelSerializer):
-    creator = serializers.HiddenField(default=serializers.CurrentUserDefault())
-
-    class Meta:
-        model = Lecture
-        exclude = ('course',)
-
-
-class HometaskSerializer(serializers.ModelSerializer):
-    creator = serializers.HiddenField(default=serializers.CurrentUserDefault())
-
-    class Meta:
-        model = Hometask
-        exclude = ('lecture',)
-
-
-class HometaskDetailSerializer(serializers.ModelSerializer):
-    completed_homework = serializers.StringRelatedField(read_only=True, many=True)
-    creator = serializers.StringRelatedField(read_only=True)
-
-    class Meta:
-        model = Hometask
-        exclude = ('lecture',)
-        read_only_fields = ('lecture', 'creator',)
-
-
-class LectureDetailSerializer(serializers.ModelSerializer):
-    hometask = serializers.StringRelatedField(read_only=True, many=True)
-    creator = serializers.StringRelatedField(read_only=True)
-    course = serializers.StringRelatedField(read_only=True)
-
-    class Meta:
-        model = Lecture
-        fields = ('id', 'title', 'course', 'creator', 'presentation', 'hometask')
-        read_only_fields = ('course', 'creator',)
-
-
-class CompletedHomeworkSerializer(serializers.ModelSerializer):
-    creator = serializers.HiddenField(default=serializers.CurrentUserDefault())
-
-    class Meta:
-        model = CompletedHomework
-        exclude = ('hometask',)
-
-
-class CompletedHomeworkDetailSerializer(serializers.ModelSerializer):
-    mark = serializers.StringRelatedField(read_only=True)
-    creator = serializers.StringRelatedField(read_only=True)
-
-    class Meta:
-        model = CompletedHomework
-        fields = ('id', 'creator', 'link', 'hometask', 'mark',)
-        read_only_fields = ('hometask', 'creator',)
-
-
-class MarkSerializer(serializers.ModelSerializer):
-    creator = serializers.HiddenField(default=serializers.CurrentUserDefault())
-    completed_homework = serializers.SlugRelatedField(read_only=True, slug_field='link')
-
-    class Meta:
-        model = Mark
-        fields = ('id', 'creator', 'completed_homework', 'mark',)
-
-
-class CommentSerializer(serializers.ModelSerializer):
-    creator = serializers.HiddenField(default=serializers.CurrentUserDefault())
-
-    class Meta:
-        model = Comment
-        exclude = ('mark', )
-
-
-class CommentDetailSerializer(serializers.ModelSerializer):
-    creator = serializers.StringRelatedField(read_only=True)
-
-    class Meta:
-        model = Comment
-        exclude = ('mark', )
-        read_only_fields = ('mark', 'creator',)
-
-
-class MarkDetailSerializer(serializers.ModelSerializer):
-    comments = CommentDetailSerializer(read_only=True, many=True)
-    creator = serializers.StringRelatedField(read_only=True)
-    completed_homework = serializers.SlugRelatedField(read_only=True, slug_field='link')
-
-    class Meta:
-        model = Mark
-        fields = ('id', 'creator', 'completed_homework', 'mark', 'comments',)
-        read_only_fields = ('completed_homework', 'creator',)
+import os
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.db.models import Prefetch, Q
+from django.utils import timezone
+from rest_framework import serializers
+from rest_framework.authtoken.serializers import AuthTokenSerializer
+from rest_framework.validators import UniqueValidator
+from .course_statistics import record_marks
+from .dashboard import invalidate_user_dashboards
+from .models import Course, Lecture, PresentationUpload, Hometask, CompletedHomework, Mark, Comment
+
+
+UserModel = get_user_model()
+
+
+class EagerLoadingMixin:
+    select_related_fields = ()
+    prefetch_related_fields = ()
+
+    @classmethod
+    def setup_eager_loading(cls, queryset):
+        if cls.select_related_fields:
+            queryset = queryset.select_related(*cls.select_related_fields)
+        if cls.prefetch_related_fields:
+            queryset = queryset.prefetch_related(*cls.prefetch_related_fields)
+        return queryset
+
+
+class UserSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = UserModel
+        fields = ('username', 'email', 'first_name', 'last_name', 'registration_role')
+
+
+class UserRegisterSerializer(serializers.ModelSerializer):
+    UserUniqueValidator = UniqueValidator(queryset=UserModel.objects.all(),
+                                          message='Username already exists.')
+    EmailUniqueValidator = UniqueValidator(queryset=UserModel.objects.all(),
+                                           message='Email already exists.')
+
+    username = serializers.CharField(min_length=5, max_length=15,
+                                     validators=[UserUniqueValidator])
+    password = serializers.CharField(min_length=5, max_length=25, write_only=True,
+                                     required=True, style={'input_type': 'password'})
+    email = serializers.EmailField(max_length=50, validators=[EmailUniqueValidator])
+
+    class Meta:
+        model = UserModel
+        fields = ('username', 'password', 'email', 'first_name', 'last_name', 'registration_role',)
+
+    def create(self, validated_data):
+        return UserModel.objects.create(
+            username=validated_data.get('username'),
+            password=make_password(validated_data.get('password')),
+            registration_role=validated_data.get('registration_role', 'S'),
+            first_name=validated_data.get('first_name'),
+            last_name=validated_data.get('last_name'),
+            email=validated_data.get('email'),
+        )
+
+
+class UserImportSerializer(UserRegisterSerializer):
+    username = serializers.CharField(min_length=5, max_length=15)
+    email = serializers.EmailField(max_length=50)
+
+
+class UserImportRequestSerializer(serializers.Serializer):
+    users = serializers.ListField(child=serializers.DictField(), allow_empty=False)
+    course = serializers.PrimaryKeyRelatedField(queryset=Course.objects.all(), required=False, allow_null=True)
+    role = serializers.ChoiceField(choices=('student', 'teacher'), default='student')
+
+    def validate_users(self, value):
+        if len(value) > settings.USER_IMPORT_MAX_ROWS:
+            raise serializers.ValidationError(
+                'Import at most {} users per request, use the import_users command for more.'.format(
+                    settings.USER_IMPORT_MAX_ROWS))
+        return value
+
+
+class LoginSerializer(AuthTokenSerializer):
+    device = serializers.CharField(max_length=64, required=False, allow_blank=True, default='')
+
+
+class CourseSerializer(serializers.ModelSerializer):
+    creator = serializers.HiddenField(default=serializers.CurrentUserDefault())
+
+    class Meta:
+        model = Course
+        exclude = ('student', 'teacher', 'updated_at',)
+
+
+class CourseDetailSerializer(EagerLoadingMixin, serializers.ModelSerializer):
+    select_related_fields = ('creator',)
+    prefetch_related_fields = (
+        'course_lectures',
+        Prefetch('student', queryset=UserModel.objects.only('id')),
+        Prefetch('teacher', queryset=UserModel.objects.only('id')),
+    )
+    course_lectures = serializers.StringRelatedField(read_only=True, many=True)
+    creator = serializers.StringRelatedField(read_only=True)
+
+    class Meta:
+        model = Course
+        fields = ('id', 'title', 'description', 'creator', 'student', 'teacher', 'course_lectures',)
+
+    def update(self, instance, validated_data):
+        instance.title = validated_data.get('title', instance.title)
+        instance.description = validated_data.get('description', instance.description)
+        students = validated_data.get('student')
+        teachers = validated_data.get('teacher')
+        if students:
+            instance.student.add(*students)
+        if teachers:
+            instance.teacher.add(*teachers)
+        instance.save()
+        return instance
+
+
+class UserIdentifierField(serializers.Field):
+    default_error_messages = {
+        'invalid': 'Expected a user id or a username.',
+    }
+
+    def to_internal_value(self, data):
+        if isinstance(data, int) and not isinstance(data, bool):
+            return data
+        if isinstance(data, str) and data:
+            return data
+        self.fail('invalid')
+
+
+class EnrollmentSerializer(serializers.Serializer):
+    role = serializers.ChoiceField(choices=('student', 'teacher'), default='student')
+    add = serializers.ListField(child=UserIdentifierField(), default=list, max_length=10000)
+    remove = serializers.ListField(child=UserIdentifierField(), default=list, max_length=10000)
+
+    def validate(self, attrs):
+        identifiers = set(attrs['add']) | set(attrs['remove'])
+        ids = {identifier for identifier in identifiers if isinstance(identifier, int)}
+        usernames = identifiers - ids
+        resolved = {}
+        for user_id, username in UserModel.objects.filter(Q(id__in=ids) | Q(username__in=usernames)) \
+                .order_by().values_list('id', 'username'):
+            resolved[user_id] = user_id
+            resolved[username] = user_id
+        unknown = [identifier for identifier in identifiers if identifier not in resolved]
+        if unknown:
+            raise serializers.ValidationError({'unknown': sorted(unknown, key=str)})
+        attrs['add'] = {resolved[identifier] for identifier in attrs['add']}
+        attrs['remove'] = {resolved[identifier] for identifier in attrs['remove']}
+        if attrs['add'] & attrs['remove']:
+            raise serializers.ValidationError('The same user cannot be added and removed.')
+        return attrs
+
+    def apply(self, course):
+        manager = getattr(course, self.validated_data['role'])
+        to_add, to_remove = self.validated_data['add'], self.validated_data['remove']
+        with transaction.atomic():
+            enrolled = set(manager.through.objects.filter(course_id=course.id, user_id__in=to_add | to_remove)
+                           .values_list('user_id', flat=True))
+            added, removed = to_add - enrolled, to_remove & enrolled
+            if added:
+                manager.add(*added)
+            if removed:
+                manager.remove(*removed)
+        return {
+            'role': self.validated_data['role'],
+            'added': len(added),
+            'removed': len(removed),
+            'unchanged': len(to_add | to_remove) - len(added) - len(removed),
+        }
+
+
+class LectureSerializer(serializers.ModelSerializer):
+    creator = serializers.HiddenField(default=serializers.CurrentUserDefault())
+
+    class Meta:
+        model = Lecture
+        exclude = ('course', 'updated_at',)
+
+
+class PresentationUploadSerializer(serializers.ModelSerializer):
+    complete = serializers.ReadOnlyField()
+    sha256 = serializers.RegexField(r'^[0-9a-f]{64}$', write_only=True, required=False)
+
+    class Meta:
+        model = PresentationUpload
+        fields = ('id', 'lecture', 'filename', 'size', 'offset', 'complete', 'created', 'sha256')
+        read_only_fields = ('lecture', 'offset', 'created')
+
+    def validate_filename(self, value):
+        value = os.path.basename(value)
+        if not value:
+            raise serializers.ValidationError('Filename is required.')
+        return value
+
+    def validate_size(self, value):
+        if not 0 < value <= settings.PRESENTATION_MAX_SIZE:
+            raise serializers.ValidationError(
+                'Presentation size must be between 1 and {} bytes.'.format(settings.PRESENTATION_MAX_SIZE))
+        return value
+
+
+class HometaskSerializer(serializers.ModelSerializer):
+    creator = serializers.HiddenField(default=serializers.CurrentUserDefault())
+
+    class Meta:
+        model = Hometask
+        exclude = ('lecture', 'updated_at',)
+
+
+class HometaskDetailSerializer(EagerLoadingMixin, serializers.ModelSerializer):
+    select_related_fields = ('creator',)
+    prefetch_related_fields = (
+        Prefetch('completed_homework', queryset=CompletedHomework.objects.select_related('creator')),
+    )
+    completed_homework = serializers.StringRelatedField(read_only=True, many=True)
+    creator = serializers.StringRelatedField(read_only=True)
+
+    class Meta:
+        model = Hometask
+        exclude = ('lecture', 'updated_at',)
+        read_only_fields = ('lecture', 'creator',)
+
+
+class LectureDetailSerializer(EagerLoadingMixin, serializers.ModelSerializer):
+    select_related_fields = ('creator', 'course__creator',)
+    prefetch_related_fields = ('hometask',)
+    hometask = serializers.StringRelatedField(read_only=True, many=True)
+    creator = serializers.StringRelatedField(read_only=True)
+    course = serializers.StringRelatedField(read_only=True)
+
+    class Meta:
+        model = Lecture
+        fields = ('id', 'title', 'course', 'creator', 'presentation', 'hometask')
+        read_only_fields = ('course', 'creator',)
+
+
+class CompletedHomeworkSerializer(serializers.ModelSerializer):
+    creator = serializers.HiddenField(default=serializers.CurrentUserDefault())
+
+    class Meta:
+        model = CompletedHomework
+        exclude = ('hometask', 'updated_at',)
+
+
+class CompletedHomeworkDetailSerializer(EagerLoadingMixin, serializers.ModelSerializer):
+    select_related_fields = ('creator', 'mark__creator',)
+    mark = serializers.StringRelatedField(read_only=True)
+    creator = serializers.StringRelatedField(read_only=True)
+
+    class Meta:
+        model = CompletedHomework
+        fields = ('id', 'creator', 'link', 'hometask', 'mark',)
+        read_only_fields = ('hometask', 'creator',)
+
+
+class GradingQueueSerializer(EagerLoadingMixin, serializers.ModelSerializer):
+    select_related_fields = ('creator', 'hometask__lecture',)
+    creator = serializers.StringRelatedField(read_only=True)
+    hometask_title = serializers.CharField(source='hometask.title', read_only=True)
+    lecture = serializers.IntegerField(source='hometask.lecture_id', read_only=True)
+    course = serializers.IntegerField(source='hometask.lecture.course_id', read_only=True)
+
+    class Meta:
+        model = CompletedHomework
+        fields = ('id', 'creator', 'link', 'hometask', 'hometask_title', 'lecture', 'course', 'submitted_at',)
+        read_only_fields = fields
+
+
+class MarkSerializer(EagerLoadingMixin, serializers.ModelSerializer):
+    select_related_fields = ('completed_homework',)
+    creator = serializers.HiddenField(default=serializers.CurrentUserDefault())
+    completed_homework = serializers.SlugRelatedField(read_only=True, slug_field='link')
+
+    class Meta:
+        model = Mark
+        fields = ('id', 'creator', 'completed_homework', 'mark',)
+
+
+class BulkMarkListSerializer(serializers.ListSerializer):
+    def to_internal_value(self, data):
+        items = super(BulkMarkListSerializer, self).to_internal_value(data)
+        submitted = dict(CompletedHomework.objects.filter(
+            hometask=self.context['hometask'], id__in=[item['completed_homework_id'] for item in items],
+        ).values_list('id', 'creator_id'))
+        errors, seen = [], set()
+        for item in items:
+            completed_homework_id = item['completed_homework_id']
+            if completed_homework_id not in submitted:
+                errors.append({'completed_homework': ['No such completed homework for this hometask.']})
+            elif completed_homework_id in seen:
+                errors.append({'completed_homework': ['Completed homework is graded twice.']})
+            else:
+                errors.append({})
+            seen.add(completed_homework_id)
+        if any(errors):
+            raise serializers.ValidationError(errors)
+        self.submitters = submitted
+        return items
+
+    def create(self, validated_data):
+        creator = self.context['request'].user
+        ids = [item['completed_homework_id'] for item in validated_data]
+        marks = {mark.completed_homework_id: mark for mark in Mark.objects.filter(completed_homework_id__in=ids)}
+        created, updated, removed = [], [], []
+        now = timezone.now()
+        for item in validated_data:
+            mark = marks.get(item['completed_homework_id'])
+            if mark is None:
+                created.append(Mark(completed_homework_id=item['completed_homework_id'], creator=creator,
+                                    mark=item['mark']))
+            else:
+                removed.append(mark.mark)
+                mark.mark = item['mark']
+                mark.updated_at = now
+                updated.append(mark)
+        with transaction.atomic():
+            Mark.objects.bulk_create(created)
+            Mark.objects.bulk_update(updated, ['mark', 'updated_at'])
+            CompletedHomework.objects.filter(id__in=ids).update(is_graded=True, updated_at=now)
+            Hometask.objects.filter(pk=self.context['hometask']).update(updated_at=now)
+            if created:
+                graded = [mark.completed_homework_id for mark in created]
+                marks.update((mark.completed_homework_id, mark) for mark in Mark.objects.filter(
+                    completed_homework_id__in=graded))
+            Comment.objects.bulk_create(
+                Comment(mark=marks[item['completed_homework_id']], creator=creator, comment_text=item['comment'])
+                for item in validated_data if item.get('comment'))
+            record_marks(self.context['hometask'], added=[mark.mark for mark in created + updated], removed=removed,
+                         course_id=self.context.get('course'))
+        invalidate_user_dashboards(self.submitters[completed_homework_id] for completed_homework_id in ids)
+        return [marks[completed_homework_id] for completed_homework_id in ids]
+
+
+class BulkMarkSerializer(serializers.Serializer):
+    id = serializers.IntegerField(read_only=True)
+    completed_homework = serializers.IntegerField(source='completed_homework_id')
+    mark = serializers.IntegerField()
+    comment = serializers.CharField(max_length=1024, write_only=True, required=False)
+
+    class Meta:
+        list_serializer_class = BulkMarkListSerializer
+
+
+class CommentSerializer(serializers.ModelSerializer):
+    creator = serializers.HiddenField(default=serializers.CurrentUserDefault())
+
+    class Meta:
+        model = Comment
+        exclude = ('mark', 'updated_at',)
+
+
+class CommentDetailSerializer(EagerLoadingMixin, serializers.ModelSerializer):
+    select_related_fields = ('creator',)
+    creator = serializers.StringRelatedField(read_only=True)
+
+    class Meta:
+        model = Comment
+        exclude = ('mark', 'updated_at',)
+        read_only_fields = ('mark', 'creator',)
+
+
+class MarkDetailSerializer(EagerLoadingMixin, serializers.ModelSerializer):
+    select_related_fields = ('creator', 'completed_homework',)
+    prefetch_related_fields = (
+        Prefetch('comments', queryset=Comment.objects.select_related('creator')),
+    )
+    comments = CommentDetailSerializer(read_only=True, many=True)
+    creator = serializers.StringRelatedField(read_only=True)
+    completed_homework = serializers.SlugRelatedField(read_only=True, slug_field='link')
+
+    class Meta:
+        model = Mark
+        fields = ('id', 'creator', 'completed_homework', 'mark', 'comments',)
+        read_only_fields = ('completed_homework', 'creator',)
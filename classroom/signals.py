@@ -0,0 +1,219 @@
+from django.db.models.signals import m2m_changed, pre_delete, post_delete, post_init, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+from .authentication import invalidate_tokens
+from .blobs import add_reference, drop_reference
+from .conditional import touch
+from .course_statistics import (update_course_statistics, recount_members, add_hometask, record_submissions,
+                                record_marks)
+from .dashboard import invalidate_user_dashboards, invalidate_course_dashboards
+from .membership import invalidate_course_roles
+from .response_cache import invalidate_course_list, invalidate_course_responses, invalidate_hometask_responses
+from .models import User, AuthToken, Course, CourseStatistics, Lecture, Hometask, CompletedHomework, Mark, Comment
+
+
+@receiver(m2m_changed, sender=Course.student.through)
+@receiver(m2m_changed, sender=Course.teacher.through)
+def course_membership_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == 'pre_clear':
+        if reverse:
+            instance._cleared_user_ids = [instance.pk]
+            instance._cleared_course_ids = list(sender.objects.filter(user_id=instance.pk)
+                                                .values_list('course_id', flat=True))
+        else:
+            instance._cleared_user_ids = list(sender.objects.filter(course_id=instance.pk)
+                                              .values_list('user_id', flat=True))
+            instance._cleared_course_ids = [instance.pk]
+    elif action == 'post_clear':
+        course_ids = instance.__dict__.pop('_cleared_course_ids', ())
+        invalidate_course_roles(instance.__dict__.pop('_cleared_user_ids', ()))
+        recount_members(course_ids)
+        touch(Course, *course_ids)
+        invalidate_course_responses(course_ids)
+    elif action in ('post_add', 'post_remove'):
+        course_ids = pk_set if reverse else [instance.pk]
+        invalidate_course_roles([instance.pk] if reverse else pk_set)
+        recount_members(course_ids)
+        touch(Course, *course_ids)
+        invalidate_course_responses(course_ids)
+
+
+@receiver(pre_delete, sender=Course)
+def course_pre_delete(sender, instance, **kwargs):
+    instance._member_ids = set(Course.teacher.through.objects.filter(course_id=instance.pk)
+                               .values_list('user_id', flat=True))
+    instance._member_ids.update(Course.student.through.objects.filter(course_id=instance.pk)
+                                .values_list('user_id', flat=True))
+
+
+@receiver(post_delete, sender=Course)
+def course_post_delete(sender, instance, **kwargs):
+    invalidate_course_roles(instance.__dict__.pop('_member_ids', ()))
+    invalidate_course_dashboards([instance.pk])
+    invalidate_course_responses([instance.pk])
+    invalidate_course_list()
+
+
+@receiver(post_save, sender=AuthToken)
+@receiver(post_delete, sender=AuthToken)
+def token_changed(sender, instance, **kwargs):
+    invalidate_tokens([instance.digest])
+
+
+@receiver(post_save, sender=User)
+def user_changed(sender, instance, created, **kwargs):
+    if not created:
+        invalidate_tokens(AuthToken.objects.filter(user_id=instance.pk).values_list('digest', flat=True))
+
+
+def stored_presentation(instance):
+    value = instance.__dict__.get('presentation')
+    return getattr(value, 'name', value) or ''
+
+
+@receiver(post_init, sender=Lecture)
+def lecture_loaded(sender, instance, **kwargs):
+    if 'presentation' not in instance.__dict__:
+        instance._stored_presentation = None
+    else:
+        instance._stored_presentation = stored_presentation(instance)
+
+
+@receiver(post_save, sender=Lecture)
+def lecture_saved(sender, instance, created, update_fields=None, **kwargs):
+    if update_fields is not None and 'presentation' not in update_fields:
+        return
+    previous = '' if created else instance.__dict__.get('_stored_presentation')
+    current = stored_presentation(instance)
+    if previous == current:
+        return
+    storage = Lecture._meta.get_field('presentation').storage
+    if current:
+        add_reference(storage, current)
+    if previous:
+        drop_reference(storage, previous)
+    instance._stored_presentation = current
+
+
+@receiver(post_delete, sender=Lecture)
+def lecture_deleted(sender, instance, **kwargs):
+    name = stored_presentation(instance)
+    if name:
+        drop_reference(Lecture._meta.get_field('presentation').storage, name)
+
+
+@receiver(post_save, sender=Course)
+def course_saved(sender, instance, created, **kwargs):
+    if created:
+        CourseStatistics.objects.get_or_create(course=instance)
+    invalidate_course_dashboards([instance.pk])
+    invalidate_course_responses([instance.pk])
+    invalidate_course_list()
+
+
+@receiver(post_save, sender=Lecture)
+def lecture_changed(sender, instance, created, **kwargs):
+    if created:
+        update_course_statistics(instance.course_id, lectures=1)
+    touch(Course, instance.course_id)
+    invalidate_course_dashboards([instance.course_id])
+    invalidate_course_responses([instance.course_id])
+
+
+@receiver(post_delete, sender=Lecture)
+def lecture_removed(sender, instance, **kwargs):
+    update_course_statistics(instance.course_id, lectures=-1)
+    touch(Course, instance.course_id)
+    invalidate_course_dashboards([instance.course_id])
+    invalidate_course_responses([instance.course_id])
+
+
+def hometask_course_id(hometask):
+    if Hometask.lecture.is_cached(hometask):
+        return hometask.lecture.course_id
+    return Lecture.objects.filter(pk=hometask.lecture_id).values_list('course_id', flat=True).first()
+
+
+@receiver(post_save, sender=Hometask)
+def hometask_saved(sender, instance, created, **kwargs):
+    course_id = hometask_course_id(instance)
+    if created:
+        add_hometask(instance.pk, course_id)
+    touch(Lecture, instance.lecture_id)
+    invalidate_course_dashboards([course_id])
+    invalidate_course_responses([course_id])
+
+
+@receiver(pre_delete, sender=Hometask)
+def hometask_pre_delete(sender, instance, **kwargs):
+    instance._course_id = hometask_course_id(instance)
+
+
+@receiver(post_delete, sender=Hometask)
+def hometask_post_delete(sender, instance, **kwargs):
+    course_id = instance.__dict__.pop('_course_id', None)
+    update_course_statistics(course_id, hometasks=-1)
+    touch(Lecture, instance.lecture_id)
+    invalidate_course_dashboards([course_id])
+    invalidate_course_responses([course_id])
+
+
+@receiver(post_save, sender=CompletedHomework)
+def completed_homework_saved(sender, instance, created, **kwargs):
+    if created:
+        record_submissions(instance.hometask_id, 1)
+    touch(Hometask, instance.hometask_id)
+    invalidate_user_dashboards([instance.creator_id])
+    invalidate_hometask_responses([instance.hometask_id])
+
+
+@receiver(post_delete, sender=CompletedHomework)
+def completed_homework_deleted(sender, instance, **kwargs):
+    record_submissions(instance.hometask_id, -1)
+    touch(Hometask, instance.hometask_id)
+    invalidate_user_dashboards([instance.creator_id])
+    invalidate_hometask_responses([instance.hometask_id])
+
+
+def graded_submission(mark):
+    if Mark.completed_homework.is_cached(mark):
+        return mark.completed_homework.creator_id, mark.completed_homework.hometask_id, None
+    submission = CompletedHomework.objects.filter(pk=mark.completed_homework_id)
+    return submission.values_list('creator_id', 'hometask_id', 'hometask__lecture__course_id').first() or (
+        None, None, None)
+
+
+@receiver(post_init, sender=Mark)
+def mark_loaded(sender, instance, **kwargs):
+    instance._stored_mark = instance.__dict__.get('mark')
+
+
+@receiver(post_save, sender=Mark)
+def mark_saved(sender, instance, created, **kwargs):
+    creator_id, hometask_id, course_id = graded_submission(instance)
+    if created:
+        CompletedHomework.objects.filter(pk=instance.completed_homework_id).update(
+            is_graded=True, updated_at=timezone.now())
+        record_marks(hometask_id, added=[instance.mark], course_id=course_id)
+    else:
+        touch(CompletedHomework, instance.completed_homework_id)
+        record_marks(hometask_id, added=[instance.mark], removed=[instance._stored_mark], course_id=course_id)
+    touch(Hometask, hometask_id)
+    instance._stored_mark = instance.mark
+    invalidate_user_dashboards([creator_id])
+
+
+@receiver(post_delete, sender=Mark)
+def mark_deleted(sender, instance, **kwargs):
+    creator_id, hometask_id, course_id = graded_submission(instance)
+    CompletedHomework.objects.filter(pk=instance.completed_homework_id).update(
+        is_graded=False, updated_at=timezone.now())
+    record_marks(hometask_id, removed=[instance._stored_mark], course_id=course_id)
+    touch(Hometask, hometask_id)
+    invalidate_user_dashboards([creator_id])
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def comment_changed(sender, instance, **kwargs):
+    touch(Mark, instance.mark_id)
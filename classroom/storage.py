@@ -0,0 +1,51 @@
+import hashlib
+import os
+import re
+import tempfile
+from django.core.files.move import file_move_safe
+from django.core.files.storage import FileSystemStorage
+
+BLOB_NAME = re.compile(r'(?:^|/)[0-9a-f]{2}/([0-9a-f]{64})(?:\.\w+)?$')
+READ_SIZE = 64 * 1024
+
+
+def blob_digest(name):
+    match = BLOB_NAME.search(name or '')
+    return match.group(1) if match else ''
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    def blob_name(self, directory, digest, ext):
+        return '/'.join(part for part in (directory, digest[:2], digest + ext) if part)
+
+    def _save(self, name, content):
+        directory = os.path.dirname(name)
+        ext = os.path.splitext(name)[1].lower()[:16]
+        digest = hashlib.sha256()
+        if hasattr(content, 'temporary_file_path'):
+            source = content.temporary_file_path()
+            with open(source, 'rb') as stream:
+                for chunk in iter(lambda: stream.read(READ_SIZE), b''):
+                    digest.update(chunk)
+        else:
+            os.makedirs(self.path(directory), exist_ok=True)
+            fd, source = tempfile.mkstemp(dir=self.path(directory), suffix='.part')
+            with os.fdopen(fd, 'wb') as stream:
+                for chunk in content.chunks():
+                    digest.update(chunk)
+                    stream.write(chunk)
+        blob = self.blob_name(directory, digest.hexdigest(), ext)
+        if self.exists(blob):
+            if not hasattr(content, 'temporary_file_path'):
+                os.remove(source)
+            return blob
+        full_path = self.path(blob)
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        file_move_safe(source, full_path, allow_overwrite=True)
+        if self.file_permissions_mode is not None:
+            os.chmod(full_path, self.file_permissions_mode)
+        return blob
+
+
+def presentation_storage():
+    return ContentAddressedStorage()
@@ -1,927 +1,2397 @@
-import json
-from django.core.files.uploadedfile import SimpleUploadedFile
-from django.urls import reverse
-from rest_framework.test import APITestCase, APIRequestFactory, force_authenticate
-from rest_framework import status
-from .models import User, Course, Lecture, Hometask, CompletedHomework, Mark, Comment
-from .views import (UserRegistrationView, UserView, CourseView, SingleCourseView, LectureView, LectureDetailView,
-                    HometaskView, HometaskDetailView, CompletedHomeworkView, CompletedHomeworkDetailView, MarkView,
-                    MarkDetailView, CommentView, CommentDetailView)
-
-TEST_TEACHER_1 = {
-    'username': 'teacher1',
-    'password': 'teacher1',
-    'first_name': 'teacher1',
-    'last_name': 'teacher1',
-    'email': 'teacher1@teacher.com',
-    'registration_role': 'T'
-}
-TEST_TEACHER_2 = {
-    'username': 'teacher2',
-    'password': 'teacher2',
-    'first_name': 'teacher2',
-    'last_name': 'teacher2',
-    'email': 'teacher2@teacher.com',
-    'registration_role': 'T'
-}
-TEST_STUDENT_1 = {
-    'username': 'student1',
-    'password': 'student1',
-    'first_name': 'student1',
-    'last_name': 'student1',
-    'email': 'student1@student.ru',
-    'registration_role': 'S'
-}
-TEST_STUDENT_2 = {
-    'username': 'student2',
-    'password': 'student2',
-    'first_name': 'student2',
-    'last_name': 'student2',
-    'email': 'student2@student.ru',
-    'registration_role': 'S'
-}
-TEST_BAD_USER = {
-    'username': '1',
-    'password': 'test',
-    'first_name': 'S',
-    'last_name': 'W',
-    'email': 'dan@mail.',
-    'registration_role': 'S'
-}
-TEST_USER = {
-    'username': 'testuser',
-    'password': 'testuser',
-    'first_name': 'testuser',
-    'last_name': 'testuser',
-    'email': 'testuser@testuser.ru',
-    'registration_role': 'S'
-}
-TEST_COURSE = {
-    'title': 'Test_course',
-    'description': 'Test_description',
-}
-TEST_LECTURE = {
-    'title': 'Test Lecture',
-    'presentation': SimpleUploadedFile("test.txt", b"these are the file contents!")
-}
-TEST_HOMETASK = {
-    'title': 'Test_hometask',
-    'description': 'Test_hometask',
-}
-
-
-class TestUsers(APITestCase):
-
-    @classmethod
-    def setUpClass(cls):
-        super(TestUsers, cls).setUpClass()
-        cls.test_teacher_1 = TEST_TEACHER_1
-        cls.test_teacher_2 = TEST_TEACHER_2
-        cls.test_student_1 = TEST_STUDENT_1
-        cls.test_student_2 = TEST_STUDENT_2
-        cls.test_bad_user = TEST_BAD_USER
-        cls.test_user = TEST_USER
-
-    def setUp(self):
-        self.factory = APIRequestFactory()
-        self.teacher_user_1 = User.objects._create_user(**self.test_teacher_1)
-        self.student_user_1 = User.objects._create_user(**self.test_student_1)
-        self.teacher_user_2 = User.objects._create_user(**self.test_teacher_2)
-        self.student_user_2 = User.objects._create_user(**self.test_student_2)
-
-    def test_create_account(self):
-        view = UserRegistrationView.as_view()
-        request = self.factory.post(
-            reverse('register'),
-            data=json.dumps(self.test_user),
-            content_type='application/json',
-        )
-        response = view(request)
-        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
-
-    def test_create_account_with_wrong_data(self):
-        view = UserRegistrationView.as_view()
-        request = self.factory.post(
-            reverse('register'),
-            data=json.dumps(self.test_bad_user),
-            content_type='application/json',
-        )
-        response = view(request)
-        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
-
-    def test_create_account_with_wrong_method(self):
-        view = UserRegistrationView.as_view()
-        request = self.factory.get(reverse('register'))
-        response = view(request)
-        self.assertEqual(response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
-
-    def test_unauthorized_usage(self):
-        view = UserView.as_view()
-        request = self.factory.get(reverse('users'))
-        response = view(request)
-        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
-
-    def test_users_view(self):
-        user = User.objects.get(username='teacher1')
-        view = UserView.as_view()
-        request = self.factory.get(reverse('users'))
-        force_authenticate(request, user=user)
-        response = view(request)
-        self.assertEqual(response.status_code, status.HTTP_200_OK)
-
-
-class TestCourseCreate(APITestCase):
-    @classmethod
-    def setUpClass(cls):
-        super(TestCourseCreate, cls).setUpClass()
-        cls.test_teacher_1 = TEST_TEACHER_1
-        cls.test_student_1 = TEST_STUDENT_1
-        cls.teacher_user_1 = User.objects._create_user(**cls.test_teacher_1)
-        cls.student_user_1 = User.objects._create_user(**cls.test_student_1)
-
-    def setUp(self):
-        self.factory = APIRequestFactory()
-
-    def test_course_creation(self):
-        user = User.objects.get(username='teacher1')
-        view = CourseView.as_view()
-        request = self.factory.post(
-            reverse('course'),
-            data=json.dumps({'title': 'Test_course', 'description': 'Test_description'}),
-            content_type='application/json',
-        )
-        force_authenticate(request, user=user)
-        response = view(request)
-        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
-        course_view = SingleCourseView.as_view()
-        request = self.factory.get(reverse('detailed-course', kwargs={'pk': 1}))
-        force_authenticate(request, user=user)
-        response = course_view(request, pk=1)
-        self.assertIn(user.id, json.loads(response.render().content)['teacher'])
-
-    def test_course_creation_forbidden(self):
-        user = User.objects.get(username='student1')
-        view = CourseView.as_view()
-        request = self.factory.post(
-            reverse('course'),
-            data=json.dumps({'title': 'Test_course', 'description': 'Test_description'}),
-            content_type='application/json',
-        )
-        force_authenticate(request, user=user)
-        response = view(request)
-        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
-
-
-class TestCourseView(APITestCase):
-
-    @classmethod
-    def setUpClass(cls):
-        super(TestCourseView, cls).setUpClass()
-        cls.test_teacher_1 = TEST_TEACHER_1
-        cls.test_student_1 = TEST_STUDENT_1
-        cls.test_student_2 = TEST_STUDENT_2
-        cls.teacher_user_1 = User.objects._create_user(**cls.test_teacher_1)
-        cls.student_user_1 = User.objects._create_user(**cls.test_student_1)
-        cls.student_user_2 = User.objects._create_user(**cls.test_student_2)
-        cls.test_course = Course(**TEST_COURSE, creator=cls.teacher_user_1)
-        cls.test_course.save()
-
-    def setUp(self):
-        self.factory = APIRequestFactory()
-
-    def test_course_view(self):
-        user = User.objects.get(username='teacher1')
-        view = CourseView.as_view()
-        request = self.factory.get(reverse('course'))
-        force_authenticate(request, user=user)
-        response = view(request)
-        self.assertEqual(response.status_code, status.HTTP_200_OK)
-
-    def test_course_view_forbidden_method(self):
-        user = User.objects.get(username='teacher1')
-        view = CourseView.as_view()
-        request = self.factory.delete(reverse('course'))
-        force_authenticate(request, user=user)
-        response = view(request)
-        self.assertEqual(response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
-
-    def test_student_can_see_course_details(self):
-        user = User.objects.get(username='student1')
-        course = Course.objects.get(id=1)
-        course.student.add(user)
-        course_view = SingleCourseView.as_view()
-        request = self.factory.get(reverse('detailed-course', kwargs={'pk': 1}))
-        force_authenticate(request, user=user)
-        response = course_view(request, pk=1)
-        self.assertIn(user.id, json.loads(response.render().content)['student'])
-        self.assertEqual(response.status_code, status.HTTP_200_OK)
-
-    def test_foreign_student_cant_see_course_details(self):
-        user = User.objects.get(username='student2')
-        course_view = SingleCourseView.as_view()
-        request = self.factory.get(reverse('detailed-course', kwargs={'pk': 1}))
-        force_authenticate(request, user=user)
-        response = course_view(request, pk=1)
-        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
-
-
-class TestLectureCreate(APITestCase):
-    test_teacher_1 = None
-
-    @classmethod
-    def setUpClass(cls):
-        super(TestLectureCreate, cls).setUpClass()
-        cls.test_teacher_1 = TEST_TEACHER_1
-        cls.test_student_1 = TEST_STUDENT_1
-        cls.test_student_2 = TEST_STUDENT_2
-        cls.teacher_user_1 = User.objects._create_user(**cls.test_teacher_1)
-        cls.student_user_1 = User.objects._create_user(**cls.test_student_1)
-        cls.student_user_2 = User.objects._create_user(**cls.test_student_2)
-        cls.test_course = Course(**TEST_COURSE, creator=cls.teacher_user_1)
-        cls.test_course.save()
-
-    def setUp(self):
-        self.factory = APIRequestFactory()
-
-    def test_lecture_creation(self):
-        user = User.objects.get(username='teacher1')
-        view = LectureView.as_view()
-        course = Course.objects.get(id=1)
-        course.teacher.add(user)
-        request = self.factory.post(
-            reverse('course-lectures', kwargs={'course_pk': 1}),
-            data={
-                'title': 'Test Lecture',
-                'description': 'Test_description',
-                'creator': user,
-                'course': course,
-                'presentation': SimpleUploadedFile("test.txt", b"these are the file contents!"),
-            },
-        )
-        force_authenticate(request, user=user)
-        response = view(request, course_pk=1)
-        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
-
-    def test_lecture_creation_forbidden(self):
-        user = User.objects.get(username='student1')
-        view = LectureView.as_view()
-        course = Course.objects.get(id=1)
-        request = self.factory.post(
-            reverse('course-lectures', kwargs={'course_pk': 1}),
-            data={
-                'title': 'Test Lecture',
-                'description': 'Test_description',
-                'creator': user,
-                'course': course,
-                'presentation': SimpleUploadedFile("test.txt", b"these are the file contents!"),
-            },
-        )
-        force_authenticate(request, user=user)
-        response = view(request, course_pk=1)
-        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
-
-
-class TestLectureView(APITestCase):
-
-    @classmethod
-    def setUpClass(cls):
-        super(TestLectureView, cls).setUpClass()
-        cls.test_teacher_1 = TEST_TEACHER_1
-        cls.test_student_1 = TEST_STUDENT_1
-        cls.test_student_2 = TEST_STUDENT_2
-        cls.teacher_user_1 = User.objects._create_user(**cls.test_teacher_1)
-        cls.student_user_1 = User.objects._create_user(**cls.test_student_1)
-        cls.student_user_2 = User.objects._create_user(**cls.test_student_2)
-        cls.test_course = Course(**TEST_COURSE, creator=cls.teacher_user_1)
-        cls.test_course.save()
-        cls.course = Course.objects.get(id=1)
-        cls.course.teacher.add(cls.teacher_user_1)
-        cls.test_lecture = Lecture(creator=cls.teacher_user_1, course=cls.course, **TEST_LECTURE)
-        cls.test_lecture.save()
-
-    def setUp(self):
-        self.factory = APIRequestFactory()
-
-    def test_lecture_view(self):
-        user = User.objects.get(username='teacher1')
-        view = LectureView.as_view()
-        request = self.factory.get(reverse('course-lectures', kwargs={'course_pk': 1}))
-        force_authenticate(request, user=user)
-        response = view(request, course_pk=1)
-        self.assertEqual(response.status_code, status.HTTP_200_OK)
-
-    def test_course_view_forbidden_method(self):
-        user = User.objects.get(username='teacher1')
-        view = LectureView.as_view()
-        request = self.factory.delete(reverse('course-lectures', kwargs={'course_pk': 1}))
-        force_authenticate(request, user=user)
-        response = view(request, course_pk=1)
-        self.assertEqual(response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
-
-    def test_student_can_see_lectures_and_its_details(self):
-        user = User.objects.get(username='student1')
-        course = Course.objects.get(id=1)
-        course.student.add(user)
-        lecture_view = LectureView.as_view()
-        request = self.factory.get(reverse('course-lectures', kwargs={'course_pk': 1}))
-        force_authenticate(request, user=user)
-        response = lecture_view(request, course_pk=1)
-        self.assertEqual(response.status_code, status.HTTP_200_OK)
-        lecture_detail_view = LectureDetailView.as_view()
-        request = self.factory.get(reverse('detailed-course-lecture', kwargs={'course_pk': 1, 'pk': 1}))
-        force_authenticate(request, user=user)
-        response = lecture_detail_view(request, course_pk=1, pk=1)
-        self.assertEqual(response.status_code, status.HTTP_200_OK)
-
-    def test_foreign_student_cant_see_lecture_and_its_details(self):
-        user = User.objects.get(username='student2')
-        lecture_view = LectureView.as_view()
-        request = self.factory.get(reverse('course-lectures', kwargs={'course_pk': 1}))
-        force_authenticate(request, user=user)
-        response = lecture_view(request, course_pk=1)
-        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
-        lecture_detail_view = LectureDetailView.as_view()
-        request = self.factory.get(reverse('detailed-course-lecture', kwargs={'course_pk': 1, 'pk': 1}))
-        force_authenticate(request, user=user)
-        response = lecture_detail_view(request, course_pk=1, pk=1)
-        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
-
-
-class TestHometaskCreate(APITestCase):
-
-    @classmethod
-    def setUpClass(cls):
-        super(TestHometaskCreate, cls).setUpClass()
-        cls.test_teacher_1 = TEST_TEACHER_1
-        cls.test_student_1 = TEST_STUDENT_1
-        cls.test_student_2 = TEST_STUDENT_2
-        cls.teacher_user_1 = User.objects._create_user(**cls.test_teacher_1)
-        cls.student_user_1 = User.objects._create_user(**cls.test_student_1)
-        cls.student_user_2 = User.objects._create_user(**cls.test_student_2)
-        cls.test_course = Course(creator=cls.teacher_user_1, **TEST_COURSE)
-        cls.test_course.save()
-        cls.test_lecture = Lecture(creator=cls.teacher_user_1, course=Course.objects.get(id=1), **TEST_LECTURE)
-        cls.test_lecture.save()
-
-    def setUp(self):
-        self.factory = APIRequestFactory()
-
-    def test_hometask_creation(self):
-        user = User.objects.get(username='teacher1')
-        view = HometaskView.as_view()
-        course = Course.objects.get(id=1)
-        course.teacher.add(user)
-        lecture = Lecture.objects.get(id=1)
-        request = self.factory.post(
-            reverse('lecture-hometask', kwargs={'lecture_pk': 1}),
-            data={
-                'title': 'Test Lecture',
-                'description': 'Test_description',
-                'creator': user,
-                'lecture': lecture, },
-        )
-        force_authenticate(request, user=user)
-        response = view(request, lecture_pk=1)
-        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
-
-    def test_hometask_creation_forbidden(self):
-        user = User.objects.get(username='student1')
-        view = HometaskView.as_view()
-        lecture = Lecture.objects.get(id=1)
-        request = self.factory.post(
-            reverse('lecture-hometask', kwargs={'lecture_pk': 1}),
-            data={
-                'title': 'Test Lecture',
-                'description': 'Test_description',
-                'creator': user,
-                'lecture': lecture,
-            },
-        )
-        force_authenticate(request, user=user)
-        response = view(request, lecture_pk=1)
-        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
-
-
-class TestHometaskView(APITestCase):
-
-    @classmethod
-    def setUpClass(cls):
-        super(TestHometaskView, cls).setUpClass()
-        cls.test_teacher_1 = {'username': 'teacher1',
-                              'password': 'teacher1',
-                              'first_name': 'teacher1',
-                              'last_name': 'teacher1',
-                              'email': 'teacher1@teacher.com',
-                              'registration_role': 'T'
-                              }
-        cls.test_student_1 = {'username': 'student1',
-                              'password': 'student1',
-                              'first_name': 'student1',
-                              'last_name': 'student1',
-                              'email': 'student1@student.ru',
-                              'registration_role': 'S'
-                              }
-        cls.test_student_2 = {'username': 'student2',
-                              'password': 'student2',
-                              'first_name': 'student2',
-                              'last_name': 'student2',
-                              'email': 'student2@student.ru',
-                              'registration_role': 'S'
-                              }
-        cls.teacher_user_1 = User.objects._create_user(**cls.test_teacher_1)
-        cls.student_user_1 = User.objects._create_user(**cls.test_student_1)
-        cls.student_user_2 = User.objects._create_user(**cls.test_student_2)
-        cls.test_course = Course(title='Test_course', description='Test_description', creator=cls.teacher_user_1, )
-        cls.test_course.save()
-        cls.test_lecture = Lecture(
-            title='Test Lecture',
-            creator=cls.teacher_user_1,
-            course=Course.objects.get(id=1),
-            presentation=SimpleUploadedFile("test.txt", b"these are the file contents!"),
-        )
-        cls.test_lecture.save()
-        cls.test_hometask = Hometask(title='Test_hometask', description='Test_hometask', creator=cls.teacher_user_1,
-                                     lecture=Lecture.objects.get(id=1))
-        cls.test_hometask.save()
-
-    def setUp(self):
-        self.factory = APIRequestFactory()
-
-    def test_hometask_view(self):
-        user = User.objects.get(username='teacher1')
-        self.test_course.teacher.add(user)
-        view = HometaskView.as_view()
-        request = self.factory.get(reverse('lecture-hometask', kwargs={'lecture_pk': 1}))
-        force_authenticate(request, user=user)
-        response = view(request, lecture_pk=1)
-        self.assertEqual(response.status_code, status.HTTP_200_OK)
-
-    def test_course_view_forbidden_method(self):
-        user = User.objects.get(username='teacher1')
-        self.test_course.teacher.add(user)
-        view = HometaskView.as_view()
-        request = self.factory.delete(reverse('lecture-hometask', kwargs={'lecture_pk': 1}))
-        force_authenticate(request, user=user)
-        response = view(request, lecture_pk=1)
-        self.assertEqual(response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
-
-    def test_student_can_see_hometask_and_its_details(self):
-        user = User.objects.get(username='student1')
-        course = Course.objects.get(id=1)
-        course.student.add(user)
-        hometask_view = HometaskView.as_view()
-        request = self.factory.get(reverse('lecture-hometask', kwargs={'lecture_pk': 1}))
-        force_authenticate(request, user=user)
-        response = hometask_view(request, lecture_pk=1)
-        self.assertEqual(response.status_code, status.HTTP_200_OK)
-
-        hometask_detail_view = HometaskDetailView.as_view()
-        request = self.factory.get(reverse('detailed-hometask', kwargs={'lecture_pk': 1, 'pk': 1}))
-        force_authenticate(request, user=user)
-        response = hometask_detail_view(request, lecture_pk=1, pk=1)
-        self.assertEqual(response.status_code, status.HTTP_200_OK)
-
-    def test_foreign_student_cant_see_lecture_and_its_details(self):
-        user = User.objects.get(username='student2')
-        hometask_view = HometaskView.as_view()
-        request = self.factory.get(reverse('lecture-hometask', kwargs={'lecture_pk': 1}))
-        force_authenticate(request, user=user)
-        response = hometask_view(request, lecture_pk=1)
-
-        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
-
-        hometask_detail_view = HometaskDetailView.as_view()
-        request = self.factory.get(reverse('detailed-hometask', kwargs={'lecture_pk': 1, 'pk': 1}))
-        force_authenticate(request, user=user)
-        response = hometask_detail_view(request, lecture_pk=1, pk=1)
-        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
-
-
-class TestCompletedHometaskCreate(APITestCase):
-
-    @classmethod
-    def setUpClass(cls):
-        super(TestCompletedHometaskCreate, cls).setUpClass()
-        cls.test_teacher_1 = TEST_TEACHER_1
-        cls.test_student_1 = TEST_STUDENT_1
-        cls.test_student_2 = TEST_STUDENT_2
-        cls.teacher_user_1 = User.objects._create_user(**cls.test_teacher_1)
-        cls.student_user_1 = User.objects._create_user(**cls.test_student_1)
-        cls.student_user_2 = User.objects._create_user(**cls.test_student_2)
-        cls.test_course = Course(creator=cls.teacher_user_1, **TEST_COURSE)
-        cls.test_course.save()
-        cls.test_lecture = Lecture(creator=cls.teacher_user_1, course=Course.objects.get(id=1), **TEST_LECTURE)
-        cls.test_lecture.save()
-        cls.test_hometask = Hometask(creator=cls.teacher_user_1, lecture=Lecture.objects.get(id=1), **TEST_HOMETASK)
-        cls.test_hometask.save()
-
-    def setUp(self):
-        self.factory = APIRequestFactory()
-
-    def test_completed_hometask_creation(self):
-        user = User.objects.get(username='student1')
-        view = CompletedHomeworkView.as_view()
-        course = Course.objects.get(id=1)
-        course.student.add(user)
-        hometask = Hometask.objects.get(id=1)
-        request = self.factory.post(
-            reverse('hometask-completed', kwargs={'hometasks_pk': 1}),
-            data={
-                'link': 'https://www.test.com',
-                'creator': user,
-                'hometask': hometask,
-            },
-        )
-        force_authenticate(request, user=user)
-        response = view(request, hometasks_pk=1)
-        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
-
-    def test_hometask_creation_forbidden_for_teacher(self):
-        user = User.objects.get(username='teacher1')
-        view = CompletedHomeworkView.as_view()
-        course = Course.objects.get(id=1)
-        course.teacher.add(user)
-        hometask = Hometask.objects.get(id=1)
-        request = self.factory.post(
-            reverse('hometask-completed', kwargs={'hometasks_pk': 1}),
-            data={
-                'link': 'https://www.test.com',
-                'creator': user,
-                'hometask': hometask,
-            },
-        )
-        force_authenticate(request, user=user)
-        response = view(request, hometasks_pk=1)
-        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
-
-
-class TestCompletedHometaskView(APITestCase):
-
-    @classmethod
-    def setUpClass(cls):
-        super(TestCompletedHometaskView, cls).setUpClass()
-        cls.test_teacher_1 = TEST_TEACHER_1
-        cls.test_student_1 = TEST_STUDENT_1
-        cls.test_student_2 = TEST_STUDENT_2
-        cls.teacher_user_1 = User.objects._create_user(**cls.test_teacher_1)
-        cls.student_user_1 = User.objects._create_user(**cls.test_student_1)
-        cls.student_user_2 = User.objects._create_user(**cls.test_student_2)
-        cls.test_course = Course(creator=cls.teacher_user_1, **TEST_COURSE)
-        cls.test_course.save()
-        cls.test_lecture = Lecture(creator=cls.teacher_user_1, course=Course.objects.get(id=1), **TEST_LECTURE)
-        cls.test_lecture.save()
-        cls.test_hometask = Hometask(creator=cls.teacher_user_1, lecture=Lecture.objects.get(id=1), **TEST_HOMETASK)
-        cls.test_hometask.save()
-        cls.test_completed_hometask = CompletedHomework(link='https://www.test.com',
-                                                        creator=cls.student_user_1,
-                                                        hometask=Hometask.objects.get(id=1),
-                                                        )
-        cls.test_completed_hometask.save()
-
-    def setUp(self):
-        self.factory = APIRequestFactory()
-
-    def test_completed_hometask_view_for_teacher(self):
-        user = User.objects.get(username='teacher1')
-        test_course = Course.objects.get(id=1)
-        test_course.teacher.add(user)
-        view = CompletedHomeworkView.as_view()
-        request = self.factory.get(reverse('hometask-completed', kwargs={'hometasks_pk': 1}))
-        force_authenticate(request, user=user)
-        response = view(request, hometasks_pk=1)
-        self.assertEqual(response.status_code, status.HTTP_200_OK)
-
-    def test_course_view_forbidden_method(self):
-        user = User.objects.get(username='student1')
-        test_course = Course.objects.get(id=1)
-        test_course.student.add(user)
-        view = CompletedHomeworkView.as_view()
-        request = self.factory.delete(reverse('hometask-completed', kwargs={'hometasks_pk': 1}))
-        force_authenticate(request, user=user)
-        response = view(request, hometasks_pk=1)
-        self.assertEqual(response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
-
-    def test_teacher_can_see_all_completed_homework(self):
-        teacher = User.objects.get(username='teacher1')
-        test_course = Course.objects.get(id=1)
-        test_course.teacher.add(teacher)
-        user = User.objects.get(username='student2')
-        test_other_completed_hometask = CompletedHomework(link='https://www.othertest.com',
-                                                          creator=user,
-                                                          hometask=Hometask.objects.get(id=1),
-                                                          )
-        test_other_completed_hometask.save()
-        view = CompletedHomeworkView.as_view()
-        request = self.factory.get(reverse('hometask-completed', kwargs={'hometasks_pk': 1}))
-        force_authenticate(request, user=teacher)
-        response = view(request, hometasks_pk=1)
-        self.assertEqual(len(json.loads(response.render().content)), 2)
-
-    def test_student_cant_see_completed_homework_and_its_details_if_not_creators(self):
-        user = User.objects.get(username='student2')
-        hometask_view = CompletedHomeworkView.as_view()
-        test_other_completed_hometask = CompletedHomework(link='https://www.othertest.com',
-                                                          creator=user,
-                                                          hometask=Hometask.objects.get(id=1),
-                                                          )
-        test_other_completed_hometask.save()
-        request = self.factory.get(reverse('hometask-completed', kwargs={'hometasks_pk': 1}))
-        force_authenticate(request, user=user)
-        response = hometask_view(request, hometasks_pk=1)
-        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
-        hometask_detail_view = CompletedHomeworkDetailView.as_view()
-        request = self.factory.get(reverse('detailed-hometask-completed', kwargs={'hometasks_pk': 1, 'pk': 1}))
-        force_authenticate(request, user=user)
-        response = hometask_detail_view(request, hometasks_pk=1, pk=1)
-        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
-
-
-class TestMarkCreation(APITestCase):
-
-    @classmethod
-    def setUpClass(cls):
-        super(TestMarkCreation, cls).setUpClass()
-        cls.test_teacher_1 = TEST_TEACHER_1
-        cls.test_student_1 = TEST_STUDENT_1
-        cls.test_student_2 = TEST_STUDENT_2
-        cls.teacher_user_1 = User.objects._create_user(**cls.test_teacher_1)
-        cls.student_user_1 = User.objects._create_user(**cls.test_student_1)
-        cls.student_user_2 = User.objects._create_user(**cls.test_student_2)
-        cls.test_course = Course(creator=cls.teacher_user_1, **TEST_COURSE)
-        cls.test_course.save()
-        cls.test_lecture = Lecture(creator=cls.teacher_user_1, course=Course.objects.get(id=1), **TEST_LECTURE)
-        cls.test_lecture.save()
-        cls.test_hometask = Hometask(creator=cls.teacher_user_1, lecture=Lecture.objects.get(id=1), **TEST_HOMETASK)
-        cls.test_hometask.save()
-        cls.test_completed_hometask = CompletedHomework(link='https://www.test.com',
-                                                        creator=cls.student_user_1,
-                                                        hometask=Hometask.objects.get(id=1),
-                                                        )
-        cls.test_completed_hometask.save()
-
-    def setUp(self):
-        self.factory = APIRequestFactory()
-
-    def test_mark_creation(self):
-        user = User.objects.get(username='teacher1')
-        view = MarkView.as_view()
-        course = Course.objects.get(id=1)
-        course.teacher.add(user)
-        completed_hometask = CompletedHomework.objects.get(id=1)
-        request = self.factory.post(
-            reverse('marks', kwargs={'pk': 1}),
-            data={
-                'mark': 100,
-                'creator': user,
-                'completed_homework': completed_hometask,
-            },
-        )
-        force_authenticate(request, user=user)
-        response = view(request, pk=1)
-        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
-
-    def test_mark_creation_forbidden(self):
-        user = User.objects.get(username='student1')
-        view = MarkView.as_view()
-        course = Course.objects.get(id=1)
-        course.student.add(user)
-        completed_hometask = CompletedHomework.objects.get(id=1)
-        request = self.factory.post(
-            reverse('marks', kwargs={'pk': 1}),
-            data={
-                'mark': 100,
-                'creator': user,
-                'completed_homework': completed_hometask,
-            },
-        )
-        force_authenticate(request, user=user)
-        response = view(request, pk=1)
-        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
-
-
-class TestMarkView(APITestCase):
-
-    @classmethod
-    def setUpClass(cls):
-        super(TestMarkView, cls).setUpClass()
-        cls.test_teacher_1 = TEST_TEACHER_1
-        cls.test_student_1 = TEST_STUDENT_1
-        cls.test_student_2 = TEST_STUDENT_2
-        cls.teacher_user_1 = User.objects._create_user(**cls.test_teacher_1)
-        cls.student_user_1 = User.objects._create_user(**cls.test_student_1)
-        cls.student_user_2 = User.objects._create_user(**cls.test_student_2)
-        cls.test_course = Course(creator=cls.teacher_user_1, **TEST_COURSE)
-        cls.test_course.save()
-        cls.test_lecture = Lecture(creator=cls.teacher_user_1, course=Course.objects.get(id=1), **TEST_LECTURE)
-        cls.test_lecture.save()
-        cls.test_hometask = Hometask(creator=cls.teacher_user_1, lecture=Lecture.objects.get(id=1), **TEST_HOMETASK)
-        cls.test_hometask.save()
-        cls.test_completed_hometask = CompletedHomework(link='https://www.test.com',
-                                                        creator=cls.student_user_1,
-                                                        hometask=Hometask.objects.get(id=1),
-                                                        )
-        cls.test_completed_hometask.save()
-        cls.test_mark = Mark(mark=100, creator=cls.teacher_user_1,
-                             completed_homework=CompletedHomework.objects.get(id=1))
-        cls.test_mark.save()
-
-    def setUp(self):
-        self.factory = APIRequestFactory()
-
-    def test_completed_hometask_view_for_student(self):
-        user = User.objects.get(username='student1')
-        test_course = Course.objects.get(id=1)
-        test_course.student.add(user)
-        view = MarkView.as_view()
-        request = self.factory.get(reverse('marks', kwargs={'pk': 1}))
-        force_authenticate(request, user=user)
-        response = view(request, pk=1)
-        self.assertEqual(response.status_code, status.HTTP_200_OK)
-
-    def test_course_view_forbidden_method(self):
-        user = User.objects.get(username='teacher1')
-        view = MarkView.as_view()
-        course = Course.objects.get(id=1)
-        course.teacher.add(user)
-        request = self.factory.delete(reverse('marks', kwargs={'pk': 1}))
-        force_authenticate(request, user=user)
-        response = view(request, pk=1)
-        self.assertEqual(response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
-
-    def test_student_cant_see_mark_and_its_details_if_not_creators(self):
-        user = User.objects.get(username='student2')
-        test_other_completed_hometask = CompletedHomework(link='https://www.othertest.com',
-                                                          creator=user,
-                                                          hometask=Hometask.objects.get(id=1), )
-        test_other_completed_hometask.save()
-        teacher = User.objects.get(username='teacher1')
-        mark_view = MarkView.as_view()
-        test_other_mark = Mark(mark=99, creator=teacher, completed_homework=CompletedHomework.objects.get(id=2))
-        test_other_mark.save()
-        request = self.factory.get(reverse('marks', kwargs={'pk': 1}))
-        force_authenticate(request, user=user)
-        response = mark_view(request, pk=1)
-        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
-
-        mark_detail_view = MarkDetailView.as_view()
-        request = self.factory.get(reverse('detailed-mark', kwargs={'pk': 1}))
-        force_authenticate(request, user=user)
-        response = mark_detail_view(request, hometasks_pk=1, pk=1)
-        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
-
-
-class TestCommentCreation(APITestCase):
-
-    @classmethod
-    def setUpClass(cls):
-        super(TestCommentCreation, cls).setUpClass()
-        cls.test_teacher_1 = TEST_TEACHER_1
-        cls.test_student_1 = TEST_STUDENT_1
-        cls.test_student_2 = TEST_STUDENT_2
-        cls.teacher_user_1 = User.objects._create_user(**cls.test_teacher_1)
-        cls.student_user_1 = User.objects._create_user(**cls.test_student_1)
-        cls.student_user_2 = User.objects._create_user(**cls.test_student_2)
-        cls.test_course = Course(creator=cls.teacher_user_1, **TEST_COURSE)
-        cls.test_course.save()
-        cls.test_lecture = Lecture(creator=cls.teacher_user_1, course=Course.objects.get(id=1), **TEST_LECTURE)
-        cls.test_lecture.save()
-        cls.test_hometask = Hometask(creator=cls.teacher_user_1, lecture=Lecture.objects.get(id=1), **TEST_HOMETASK)
-        cls.test_hometask.save()
-        cls.test_completed_hometask = CompletedHomework(link='https://www.test.com',
-                                                        creator=cls.student_user_1,
-                                                        hometask=Hometask.objects.get(id=1),
-                                                        )
-        cls.test_completed_hometask.save()
-        cls.test_mark = Mark(mark=100, creator=cls.teacher_user_1,
-                             completed_homework=CompletedHomework.objects.get(id=1))
-        cls.test_mark.save()
-
-    def setUp(self):
-        self.factory = APIRequestFactory()
-
-    def test_teacher_comment_creation(self):
-        user = User.objects.get(username='teacher1')
-        view = CommentView.as_view()
-        course = Course.objects.get(id=1)
-        course.teacher.add(user)
-        mark = Mark.objects.get(id=1)
-        request = self.factory.post(
-            reverse('comments', kwargs={'mark_pk': 1}),
-            data={
-                'mark': mark,
-                'creator': user,
-                'comment_text': 'Test comment text',
-            },
-        )
-        force_authenticate(request, user=user)
-        response = view(request, mark_pk=1)
-        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
-
-    def test_student_comment_creation(self):
-        user = User.objects.get(username='student1')
-        view = CommentView.as_view()
-        course = Course.objects.get(id=1)
-        course.student.add(user)
-        mark = Mark.objects.get(id=1)
-        request = self.factory.post(
-            reverse('comments', kwargs={'mark_pk': 1}),
-            data={
-                'mark': mark,
-                'creator': user,
-                'comment_text': 'Another test comment text',
-            },
-        )
-        force_authenticate(request, user=user)
-        response = view(request, mark_pk=1)
-        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
-
-
-class TestCommentView(APITestCase):
-
-    @classmethod
-    def setUpClass(cls):
-        super(TestCommentView, cls).setUpClass()
-        cls.test_teacher_1 = TEST_TEACHER_1
-        cls.test_student_1 = TEST_STUDENT_1
-        cls.test_student_2 = TEST_STUDENT_2
-        cls.teacher_user_1 = User.objects._create_user(**cls.test_teacher_1)
-        cls.student_user_1 = User.objects._create_user(**cls.test_student_1)
-        cls.student_user_2 = User.objects._create_user(**cls.test_student_2)
-        cls.test_course = Course(creator=cls.teacher_user_1, **TEST_COURSE)
-        cls.test_course.save()
-        cls.test_lecture = Lecture(creator=cls.teacher_user_1, course=Course.objects.get(id=1), **TEST_LECTURE)
-        cls.test_lecture.save()
-        cls.test_hometask = Hometask(creator=cls.teacher_user_1, lecture=Lecture.objects.get(id=1), **TEST_HOMETASK)
-        cls.test_hometask.save()
-        cls.test_completed_hometask = CompletedHomework(link='https://www.test.com',
-                                                        creator=cls.student_user_1,
-                                                        hometask=Hometask.objects.get(id=1),
-                                                        )
-        cls.test_completed_hometask.save()
-        cls.test_mark = Mark(mark=100, creator=cls.teacher_user_1,
-                             completed_homework=CompletedHomework.objects.get(id=1))
-        cls.test_mark.save()
-        cls.test_comment_1 = Comment(mark=Mark.objects.get(id=1), creator=cls.teacher_user_1,
-                                     comment_text='Test comment text')
-        cls.test_comment_1.save()
-        cls.test_comment_2 = Comment(mark=Mark.objects.get(id=1), creator=cls.student_user_1,
-                                     comment_text='Another test comment text')
-        cls.test_comment_2.save()
-
-    def setUp(self):
-        self.factory = APIRequestFactory()
-
-    def test_teacher_can_see_all_comments(self):
-        teacher = User.objects.get(username='teacher1')
-        test_course = Course.objects.get(id=1)
-        test_course.teacher.add(teacher)
-        view = CommentView.as_view()
-        request = self.factory.get(reverse('comments', kwargs={'mark_pk': 1}))
-        force_authenticate(request, user=teacher)
-        response = view(request, mark_pk=1)
-        self.assertEqual(len(json.loads(response.render().content)), 2)
-
-    def test_student_can_see_all_comments(self):
-        student = User.objects.get(username='student1')
-        test_course = Course.objects.get(id=1)
-        test_course.student.add(student)
-        view = CommentView.as_view()
-        request = self.factory.get(reverse('comments', kwargs={'mark_pk': 1}))
-        force_authenticate(request, user=student)
-        response = view(request, mark_pk=1)
-        self.assertEqual(len(json.loads(response.render().content)), 2)
-
-    def test_student_cant_see_comments_and_details_if_not_his_completed_homework(self):
-        user = User.objects.get(username='student2')
-        test_course = Course.objects.get(id=1)
-        test_course.student.add(user)
-        comment_view = CommentView.as_view()
-        request = self.factory.get(reverse('comments', kwargs={'mark_pk': 1}))
-        force_authenticate(request, user=user)
-        response = comment_view(request, mark_pk=1)
-        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
-        comment_detail_view = CommentDetailView.as_view()
-        request = self.factory.get(reverse('detailed-comment', kwargs={'mark_pk': 1, 'pk': 1}))
-        force_authenticate(request, user=user)
-        response = comment_detail_view(request, mark_pk=1, pk=1)
-        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
-
-    def test_comment_view_forbidden_method(self):
-        user = User.objects.get(username='teacher1')
-        view = CommentView.as_view()
-        course = Course.objects.get(id=1)
-        course.teacher.add(user)
-        request = self.factory.delete(reverse('comments', kwargs={'mark_pk': 1}))
-        force_authenticate(request, user=user)
-        response = view(request, mark_pk=1)
-        self.assertEqual(response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
-
-    def test_comment_cannot_be_deleted(self):
-        user = User.objects.get(username='teacher1')
-        view = CommentDetailView.as_view()
-        course = Course.objects.get(id=1)
-        course.teacher.add(user)
-        request = self.factory.delete(reverse('detailed-comment', kwargs={'mark_pk': 1, 'pk': 1}))
-        force_authenticate(request, user=user)
-        response = view(request, mark_pk=1, pk=1)
-        self.assertEqual(response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+import asyncio
+import csv
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+from datetime import timedelta
+from importlib import import_module
+from io import BytesIO, StringIO
+from asgiref.sync import async_to_sync
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import caches
+from django.core.management import call_command
+from django.core.signals import request_finished
+from django.db import IntegrityError, close_old_connections, connection, transaction
+from django.http import FileResponse, StreamingHttpResponse
+from django.test.utils import CaptureQueriesContext
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.urls import reverse
+from django.utils import timezone
+from types import SimpleNamespace
+from unittest import mock, skipUnless
+from rest_framework.test import APITestCase, APIRequestFactory, force_authenticate
+from rest_framework import status
+from .async_views import StreamingASGIHandler, async_read_view, read_view
+from .authentication import token_cache, cache_user, cached_user
+from .course_statistics import course_statistics, rebuild_statistics
+from .membership import fetch_course_roles, get_course_role, get_ancestry
+from .uploads import part_path, receive_chunk
+from .urls import urlpatterns
+from .routers import ReplicaRouter, Route, current_route
+from .models import (User, AuthToken, Course, CourseStatistics, Lecture, PresentationBlob, PresentationUpload, Hometask,
+                     HometaskStatistics, MarkDistribution, CompletedHomework, Mark, Comment)
+from .views import (UserRegistrationView, UserView, CourseView, SingleCourseView, GradebookView, LectureView,
+                    LectureDetailView, HometaskView, HometaskDetailView, CompletedHomeworkView,
+                    CompletedHomeworkDetailView, MarkView, MarkDetailView, CommentView, CommentDetailView)
+
+TEST_TEACHER_1 = {
+    'username': 'teacher1',
+    'password': 'teacher1',
+    'first_name': 'teacher1',
+    'last_name': 'teacher1',
+    'email': 'teacher1@teacher.com',
+    'registration_role': 'T'
+}
+TEST_TEACHER_2 = {
+    'username': 'teacher2',
+    'password': 'teacher2',
+    'first_name': 'teacher2',
+    'last_name': 'teacher2',
+    'email': 'teacher2@teacher.com',
+    'registration_role': 'T'
+}
+TEST_STUDENT_1 = {
+    'username': 'student1',
+    'password': 'student1',
+    'first_name': 'student1',
+    'last_name': 'student1',
+    'email': 'student1@student.ru',
+    'registration_role': 'S'
+}
+TEST_STUDENT_2 = {
+    'username': 'student2',
+    'password': 'student2',
+    'first_name': 'student2',
+    'last_name': 'student2',
+    'email': 'student2@student.ru',
+    'registration_role': 'S'
+}
+TEST_BAD_USER = {
+    'username': '1',
+    'password': 'test',
+    'first_name': 'S',
+    'last_name': 'W',
+    'email': 'dan@mail.',
+    'registration_role': 'S'
+}
+TEST_USER = {
+    'username': 'testuser',
+    'password': 'testuser',
+    'first_name': 'testuser',
+    'last_name': 'testuser',
+    'email': 'testuser@testuser.ru',
+    'registration_role': 'S'
+}
+TEST_COURSE = {
+    'title': 'Test_course',
+    'description': 'Test_description',
+}
+TEST_LECTURE = {
+    'title': 'Test Lecture',
+    'presentation': SimpleUploadedFile("test.txt", b"these are the file contents!")
+}
+TEST_HOMETASK = {
+    'title': 'Test_hometask',
+    'description': 'Test_hometask',
+}
+
+
+class ClassroomTestCase(APITestCase):
+    def run(self, result=None):
+        for cache in caches.all():
+            cache.clear()
+        token_cache.clear()
+        return super(ClassroomTestCase, self).run(result)
+
+
+class TestUsers(ClassroomTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super(TestUsers, cls).setUpClass()
+        cls.test_teacher_1 = TEST_TEACHER_1
+        cls.test_teacher_2 = TEST_TEACHER_2
+        cls.test_student_1 = TEST_STUDENT_1
+        cls.test_student_2 = TEST_STUDENT_2
+        cls.test_bad_user = TEST_BAD_USER
+        cls.test_user = TEST_USER
+
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        self.teacher_user_1 = User.objects._create_user(**self.test_teacher_1)
+        self.student_user_1 = User.objects._create_user(**self.test_student_1)
+        self.teacher_user_2 = User.objects._create_user(**self.test_teacher_2)
+        self.student_user_2 = User.objects._create_user(**self.test_student_2)
+
+    def test_create_account(self):
+        view = UserRegistrationView.as_view()
+        request = self.factory.post(
+            reverse('register'),
+            data=json.dumps(self.test_user),
+            content_type='application/json',
+        )
+        response = view(request)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_create_account_with_wrong_data(self):
+        view = UserRegistrationView.as_view()
+        request = self.factory.post(
+            reverse('register'),
+            data=json.dumps(self.test_bad_user),
+            content_type='application/json',
+        )
+        response = view(request)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_create_account_with_wrong_method(self):
+        view = UserRegistrationView.as_view()
+        request = self.factory.get(reverse('register'))
+        response = view(request)
+        self.assertEqual(response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+
+    def test_unauthorized_usage(self):
+        view = UserView.as_view()
+        request = self.factory.get(reverse('users'))
+        response = view(request)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_users_view(self):
+        user = User.objects.get(username='teacher1')
+        view = UserView.as_view()
+        request = self.factory.get(reverse('users'))
+        force_authenticate(request, user=user)
+        response = view(request)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+class TestCourseCreate(ClassroomTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super(TestCourseCreate, cls).setUpClass()
+        cls.test_teacher_1 = TEST_TEACHER_1
+        cls.test_student_1 = TEST_STUDENT_1
+        cls.teacher_user_1 = User.objects._create_user(**cls.test_teacher_1)
+        cls.student_user_1 = User.objects._create_user(**cls.test_student_1)
+
+    def setUp(self):
+        self.factory = APIRequestFactory()
+
+    def test_course_creation(self):
+        user = User.objects.get(username='teacher1')
+        view = CourseView.as_view()
+        request = self.factory.post(
+            reverse('course'),
+            data=json.dumps({'title': 'Test_course', 'description': 'Test_description'}),
+            content_type='application/json',
+        )
+        force_authenticate(request, user=user)
+        response = view(request)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        course_view = SingleCourseView.as_view()
+        request = self.factory.get(reverse('detailed-course', kwargs={'pk': 1}))
+        force_authenticate(request, user=user)
+        response = course_view(request, pk=1)
+        self.assertIn(user.id, json.loads(response.render().content)['teacher'])
+
+    def test_course_creation_forbidden(self):
+        user = User.objects.get(username='student1')
+        view = CourseView.as_view()
+        request = self.factory.post(
+            reverse('course'),
+            data=json.dumps({'title': 'Test_course', 'description': 'Test_description'}),
+            content_type='application/json',
+        )
+        force_authenticate(request, user=user)
+        response = view(request)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class TestCourseView(ClassroomTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super(TestCourseView, cls).setUpClass()
+        cls.test_teacher_1 = TEST_TEACHER_1
+        cls.test_student_1 = TEST_STUDENT_1
+        cls.test_student_2 = TEST_STUDENT_2
+        cls.teacher_user_1 = User.objects._create_user(**cls.test_teacher_1)
+        cls.student_user_1 = User.objects._create_user(**cls.test_student_1)
+        cls.student_user_2 = User.objects._create_user(**cls.test_student_2)
+        cls.test_course = Course(**TEST_COURSE, creator=cls.teacher_user_1)
+        cls.test_course.save()
+
+    def setUp(self):
+        self.factory = APIRequestFactory()
+
+    def test_course_view(self):
+        user = User.objects.get(username='teacher1')
+        view = CourseView.as_view()
+        request = self.factory.get(reverse('course'))
+        force_authenticate(request, user=user)
+        response = view(request)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_course_view_forbidden_method(self):
+        user = User.objects.get(username='teacher1')
+        view = CourseView.as_view()
+        request = self.factory.delete(reverse('course'))
+        force_authenticate(request, user=user)
+        response = view(request)
+        self.assertEqual(response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+
+    def test_student_can_see_course_details(self):
+        user = User.objects.get(username='student1')
+        course = Course.objects.get(id=1)
+        course.student.add(user)
+        course_view = SingleCourseView.as_view()
+        request = self.factory.get(reverse('detailed-course', kwargs={'pk': 1}))
+        force_authenticate(request, user=user)
+        response = course_view(request, pk=1)
+        self.assertIn(user.id, json.loads(response.render().content)['student'])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_foreign_student_cant_see_course_details(self):
+        user = User.objects.get(username='student2')
+        course_view = SingleCourseView.as_view()
+        request = self.factory.get(reverse('detailed-course', kwargs={'pk': 1}))
+        force_authenticate(request, user=user)
+        response = course_view(request, pk=1)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class TestLectureCreate(ClassroomTestCase):
+    test_teacher_1 = None
+
+    @classmethod
+    def setUpClass(cls):
+        super(TestLectureCreate, cls).setUpClass()
+        cls.test_teacher_1 = TEST_TEACHER_1
+        cls.test_student_1 = TEST_STUDENT_1
+        cls.test_student_2 = TEST_STUDENT_2
+        cls.teacher_user_1 = User.objects._create_user(**cls.test_teacher_1)
+        cls.student_user_1 = User.objects._create_user(**cls.test_student_1)
+        cls.student_user_2 = User.objects._create_user(**cls.test_student_2)
+        cls.test_course = Course(**TEST_COURSE, creator=cls.teacher_user_1)
+        cls.test_course.save()
+
+    def setUp(self):
+        self.factory = APIRequestFactory()
+
+    def test_lecture_creation(self):
+        user = User.objects.get(username='teacher1')
+        view = LectureView.as_view()
+        course = Course.objects.get(id=1)
+        course.teacher.add(user)
+        request = self.factory.post(
+            reverse('course-lectures', kwargs={'course_pk': 1}),
+            data={
+                'title': 'Test Lecture',
+                'description': 'Test_description',
+                'creator': user,
+                'course': course,
+                'presentation': SimpleUploadedFile("test.txt", b"these are the file contents!"),
+            },
+        )
+        force_authenticate(request, user=user)
+        response = view(request, course_pk=1)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_lecture_creation_forbidden(self):
+        user = User.objects.get(username='student1')
+        view = LectureView.as_view()
+        course = Course.objects.get(id=1)
+        request = self.factory.post(
+            reverse('course-lectures', kwargs={'course_pk': 1}),
+            data={
+                'title': 'Test Lecture',
+                'description': 'Test_description',
+                'creator': user,
+                'course': course,
+                'presentation': SimpleUploadedFile("test.txt", b"these are the file contents!"),
+            },
+        )
+        force_authenticate(request, user=user)
+        response = view(request, course_pk=1)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class TestLectureView(ClassroomTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super(TestLectureView, cls).setUpClass()
+        cls.test_teacher_1 = TEST_TEACHER_1
+        cls.test_student_1 = TEST_STUDENT_1
+        cls.test_student_2 = TEST_STUDENT_2
+        cls.teacher_user_1 = User.objects._create_user(**cls.test_teacher_1)
+        cls.student_user_1 = User.objects._create_user(**cls.test_student_1)
+        cls.student_user_2 = User.objects._create_user(**cls.test_student_2)
+        cls.test_course = Course(**TEST_COURSE, creator=cls.teacher_user_1)
+        cls.test_course.save()
+        cls.course = Course.objects.get(id=1)
+        cls.course.teacher.add(cls.teacher_user_1)
+        cls.test_lecture = Lecture(creator=cls.teacher_user_1, course=cls.course, **TEST_LECTURE)
+        cls.test_lecture.save()
+
+    def setUp(self):
+        self.factory = APIRequestFactory()
+
+    def test_lecture_view(self):
+        user = User.objects.get(username='teacher1')
+        view = LectureView.as_view()
+        request = self.factory.get(reverse('course-lectures', kwargs={'course_pk': 1}))
+        force_authenticate(request, user=user)
+        response = view(request, course_pk=1)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_course_view_forbidden_method(self):
+        user = User.objects.get(username='teacher1')
+        view = LectureView.as_view()
+        request = self.factory.delete(reverse('course-lectures', kwargs={'course_pk': 1}))
+        force_authenticate(request, user=user)
+        response = view(request, course_pk=1)
+        self.assertEqual(response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+
+    def test_student_can_see_lectures_and_its_details(self):
+        user = User.objects.get(username='student1')
+        course = Course.objects.get(id=1)
+        course.student.add(user)
+        lecture_view = LectureView.as_view()
+        request = self.factory.get(reverse('course-lectures', kwargs={'course_pk': 1}))
+        force_authenticate(request, user=user)
+        response = lecture_view(request, course_pk=1)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        lecture_detail_view = LectureDetailView.as_view()
+        request = self.factory.get(reverse('detailed-course-lecture', kwargs={'course_pk': 1, 'pk': 1}))
+        force_authenticate(request, user=user)
+        response = lecture_detail_view(request, course_pk=1, pk=1)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_foreign_student_cant_see_lecture_and_its_details(self):
+        user = User.objects.get(username='student2')
+        lecture_view = LectureView.as_view()
+        request = self.factory.get(reverse('course-lectures', kwargs={'course_pk': 1}))
+        force_authenticate(request, user=user)
+        response = lecture_view(request, course_pk=1)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        lecture_detail_view = LectureDetailView.as_view()
+        request = self.factory.get(reverse('detailed-course-lecture', kwargs={'course_pk': 1, 'pk': 1}))
+        force_authenticate(request, user=user)
+        response = lecture_detail_view(request, course_pk=1, pk=1)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class TestHometaskCreate(ClassroomTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super(TestHometaskCreate, cls).setUpClass()
+        cls.test_teacher_1 = TEST_TEACHER_1
+        cls.test_student_1 = TEST_STUDENT_1
+        cls.test_student_2 = TEST_STUDENT_2
+        cls.teacher_user_1 = User.objects._create_user(**cls.test_teacher_1)
+        cls.student_user_1 = User.objects._create_user(**cls.test_student_1)
+        cls.student_user_2 = User.objects._create_user(**cls.test_student_2)
+        cls.test_course = Course(creator=cls.teacher_user_1, **TEST_COURSE)
+        cls.test_course.save()
+        cls.test_lecture = Lecture(creator=cls.teacher_user_1, course=Course.objects.get(id=1), **TEST_LECTURE)
+        cls.test_lecture.save()
+
+    def setUp(self):
+        self.factory = APIRequestFactory()
+
+    def test_hometask_creation(self):
+        user = User.objects.get(username='teacher1')
+        view = HometaskView.as_view()
+        course = Course.objects.get(id=1)
+        course.teacher.add(user)
+        lecture = Lecture.objects.get(id=1)
+        request = self.factory.post(
+            reverse('lecture-hometask', kwargs={'lecture_pk': 1}),
+            data={
+                'title': 'Test Lecture',
+                'description': 'Test_description',
+                'creator': user,
+                'lecture': lecture, },
+        )
+        force_authenticate(request, user=user)
+        response = view(request, lecture_pk=1)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_hometask_creation_forbidden(self):
+        user = User.objects.get(username='student1')
+        view = HometaskView.as_view()
+        lecture = Lecture.objects.get(id=1)
+        request = self.factory.post(
+            reverse('lecture-hometask', kwargs={'lecture_pk': 1}),
+            data={
+                'title': 'Test Lecture',
+                'description': 'Test_description',
+                'creator': user,
+                'lecture': lecture,
+            },
+        )
+        force_authenticate(request, user=user)
+        response = view(request, lecture_pk=1)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class TestHometaskView(ClassroomTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super(TestHometaskView, cls).setUpClass()
+        cls.test_teacher_1 = {'username': 'teacher1',
+                              'password': 'teacher1',
+                              'first_name': 'teacher1',
+                              'last_name': 'teacher1',
+                              'email': 'teacher1@teacher.com',
+                              'registration_role': 'T'
+                              }
+        cls.test_student_1 = {'username': 'student1',
+                              'password': 'student1',
+                              'first_name': 'student1',
+                              'last_name': 'student1',
+                              'email': 'student1@student.ru',
+                              'registration_role': 'S'
+                              }
+        cls.test_student_2 = {'username': 'student2',
+                              'password': 'student2',
+                              'first_name': 'student2',
+                              'last_name': 'student2',
+                              'email': 'student2@student.ru',
+                              'registration_role': 'S'
+                              }
+        cls.teacher_user_1 = User.objects._create_user(**cls.test_teacher_1)
+        cls.student_user_1 = User.objects._create_user(**cls.test_student_1)
+        cls.student_user_2 = User.objects._create_user(**cls.test_student_2)
+        cls.test_course = Course(title='Test_course', description='Test_description', creator=cls.teacher_user_1, )
+        cls.test_course.save()
+        cls.test_lecture = Lecture(
+            title='Test Lecture',
+            creator=cls.teacher_user_1,
+            course=Course.objects.get(id=1),
+            presentation=SimpleUploadedFile("test.txt", b"these are the file contents!"),
+        )
+        cls.test_lecture.save()
+        cls.test_hometask = Hometask(title='Test_hometask', description='Test_hometask', creator=cls.teacher_user_1,
+                                     lecture=Lecture.objects.get(id=1))
+        cls.test_hometask.save()
+
+    def setUp(self):
+        self.factory = APIRequestFactory()
+
+    def test_hometask_view(self):
+        user = User.objects.get(username='teacher1')
+        self.test_course.teacher.add(user)
+        view = HometaskView.as_view()
+        request = self.factory.get(reverse('lecture-hometask', kwargs={'lecture_pk': 1}))
+        force_authenticate(request, user=user)
+        response = view(request, lecture_pk=1)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_course_view_forbidden_method(self):
+        user = User.objects.get(username='teacher1')
+        self.test_course.teacher.add(user)
+        view = HometaskView.as_view()
+        request = self.factory.delete(reverse('lecture-hometask', kwargs={'lecture_pk': 1}))
+        force_authenticate(request, user=user)
+        response = view(request, lecture_pk=1)
+        self.assertEqual(response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+
+    def test_student_can_see_hometask_and_its_details(self):
+        user = User.objects.get(username='student1')
+        course = Course.objects.get(id=1)
+        course.student.add(user)
+        hometask_view = HometaskView.as_view()
+        request = self.factory.get(reverse('lecture-hometask', kwargs={'lecture_pk': 1}))
+        force_authenticate(request, user=user)
+        response = hometask_view(request, lecture_pk=1)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        hometask_detail_view = HometaskDetailView.as_view()
+        request = self.factory.get(reverse('detailed-hometask', kwargs={'lecture_pk': 1, 'pk': 1}))
+        force_authenticate(request, user=user)
+        response = hometask_detail_view(request, lecture_pk=1, pk=1)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_foreign_student_cant_see_lecture_and_its_details(self):
+        user = User.objects.get(username='student2')
+        hometask_view = HometaskView.as_view()
+        request = self.factory.get(reverse('lecture-hometask', kwargs={'lecture_pk': 1}))
+        force_authenticate(request, user=user)
+        response = hometask_view(request, lecture_pk=1)
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        hometask_detail_view = HometaskDetailView.as_view()
+        request = self.factory.get(reverse('detailed-hometask', kwargs={'lecture_pk': 1, 'pk': 1}))
+        force_authenticate(request, user=user)
+        response = hometask_detail_view(request, lecture_pk=1, pk=1)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class TestCompletedHometaskCreate(ClassroomTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super(TestCompletedHometaskCreate, cls).setUpClass()
+        cls.test_teacher_1 = TEST_TEACHER_1
+        cls.test_student_1 = TEST_STUDENT_1
+        cls.test_student_2 = TEST_STUDENT_2
+        cls.teacher_user_1 = User.objects._create_user(**cls.test_teacher_1)
+        cls.student_user_1 = User.objects._create_user(**cls.test_student_1)
+        cls.student_user_2 = User.objects._create_user(**cls.test_student_2)
+        cls.test_course = Course(creator=cls.teacher_user_1, **TEST_COURSE)
+        cls.test_course.save()
+        cls.test_lecture = Lecture(creator=cls.teacher_user_1, course=Course.objects.get(id=1), **TEST_LECTURE)
+        cls.test_lecture.save()
+        cls.test_hometask = Hometask(creator=cls.teacher_user_1, lecture=Lecture.objects.get(id=1), **TEST_HOMETASK)
+        cls.test_hometask.save()
+
+    def setUp(self):
+        self.factory = APIRequestFactory()
+
+    def test_completed_hometask_creation(self):
+        user = User.objects.get(username='student1')
+        view = CompletedHomeworkView.as_view()
+        course = Course.objects.get(id=1)
+        course.student.add(user)
+        hometask = Hometask.objects.get(id=1)
+        request = self.factory.post(
+            reverse('hometask-completed', kwargs={'hometasks_pk': 1}),
+            data={
+                'link': 'https://www.test.com',
+                'creator': user,
+                'hometask': hometask,
+            },
+        )
+        force_authenticate(request, user=user)
+        response = view(request, hometasks_pk=1)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_completed_hometask_is_submitted_once(self):
+        user = User.objects.get(username='student1')
+        view = CompletedHomeworkView.as_view()
+        Course.objects.get(id=1).student.add(user)
+        for expected in (status.HTTP_201_CREATED, status.HTTP_400_BAD_REQUEST):
+            request = self.factory.post(reverse('hometask-completed', kwargs={'hometasks_pk': 1}),
+                                        data={'link': 'https://www.test.com'})
+            force_authenticate(request, user=user)
+            response = view(request, hometasks_pk=1)
+            self.assertEqual(response.status_code, expected)
+        self.assertEqual(CompletedHomework.objects.filter(creator=user).count(), 1)
+
+    def test_hometask_creation_forbidden_for_teacher(self):
+        user = User.objects.get(username='teacher1')
+        view = CompletedHomeworkView.as_view()
+        course = Course.objects.get(id=1)
+        course.teacher.add(user)
+        hometask = Hometask.objects.get(id=1)
+        request = self.factory.post(
+            reverse('hometask-completed', kwargs={'hometasks_pk': 1}),
+            data={
+                'link': 'https://www.test.com',
+                'creator': user,
+                'hometask': hometask,
+            },
+        )
+        force_authenticate(request, user=user)
+        response = view(request, hometasks_pk=1)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class TestCompletedHometaskView(ClassroomTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super(TestCompletedHometaskView, cls).setUpClass()
+        cls.test_teacher_1 = TEST_TEACHER_1
+        cls.test_student_1 = TEST_STUDENT_1
+        cls.test_student_2 = TEST_STUDENT_2
+        cls.teacher_user_1 = User.objects._create_user(**cls.test_teacher_1)
+        cls.student_user_1 = User.objects._create_user(**cls.test_student_1)
+        cls.student_user_2 = User.objects._create_user(**cls.test_student_2)
+        cls.test_course = Course(creator=cls.teacher_user_1, **TEST_COURSE)
+        cls.test_course.save()
+        cls.test_lecture = Lecture(creator=cls.teacher_user_1, course=Course.objects.get(id=1), **TEST_LECTURE)
+        cls.test_lecture.save()
+        cls.test_hometask = Hometask(creator=cls.teacher_user_1, lecture=Lecture.objects.get(id=1), **TEST_HOMETASK)
+        cls.test_hometask.save()
+        cls.test_completed_hometask = CompletedHomework(link='https://www.test.com',
+                                                        creator=cls.student_user_1,
+                                                        hometask=Hometask.objects.get(id=1),
+                                                        )
+        cls.test_completed_hometask.save()
+
+    def setUp(self):
+        self.factory = APIRequestFactory()
+
+    def test_completed_hometask_view_for_teacher(self):
+        user = User.objects.get(username='teacher1')
+        test_course = Course.objects.get(id=1)
+        test_course.teacher.add(user)
+        view = CompletedHomeworkView.as_view()
+        request = self.factory.get(reverse('hometask-completed', kwargs={'hometasks_pk': 1}))
+        force_authenticate(request, user=user)
+        response = view(request, hometasks_pk=1)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_course_view_forbidden_method(self):
+        user = User.objects.get(username='student1')
+        test_course = Course.objects.get(id=1)
+        test_course.student.add(user)
+        view = CompletedHomeworkView.as_view()
+        request = self.factory.delete(reverse('hometask-completed', kwargs={'hometasks_pk': 1}))
+        force_authenticate(request, user=user)
+        response = view(request, hometasks_pk=1)
+        self.assertEqual(response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+
+    def test_teacher_can_see_all_completed_homework(self):
+        teacher = User.objects.get(username='teacher1')
+        test_course = Course.objects.get(id=1)
+        test_course.teacher.add(teacher)
+        user = User.objects.get(username='student2')
+        test_other_completed_hometask = CompletedHomework(link='https://www.othertest.com',
+                                                          creator=user,
+                                                          hometask=Hometask.objects.get(id=1),
+                                                          )
+        test_other_completed_hometask.save()
+        view = CompletedHomeworkView.as_view()
+        request = self.factory.get(reverse('hometask-completed', kwargs={'hometasks_pk': 1}))
+        force_authenticate(request, user=teacher)
+        response = view(request, hometasks_pk=1)
+        self.assertEqual(len(json.loads(response.render().content)['results']), 2)
+
+    def test_student_cant_see_completed_homework_and_its_details_if_not_creators(self):
+        user = User.objects.get(username='student2')
+        hometask_view = CompletedHomeworkView.as_view()
+        test_other_completed_hometask = CompletedHomework(link='https://www.othertest.com',
+                                                          creator=user,
+                                                          hometask=Hometask.objects.get(id=1),
+                                                          )
+        test_other_completed_hometask.save()
+        request = self.factory.get(reverse('hometask-completed', kwargs={'hometasks_pk': 1}))
+        force_authenticate(request, user=user)
+        response = hometask_view(request, hometasks_pk=1)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        hometask_detail_view = CompletedHomeworkDetailView.as_view()
+        request = self.factory.get(reverse('detailed-hometask-completed', kwargs={'hometasks_pk': 1, 'pk': 1}))
+        force_authenticate(request, user=user)
+        response = hometask_detail_view(request, hometasks_pk=1, pk=1)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class TestMarkCreation(ClassroomTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super(TestMarkCreation, cls).setUpClass()
+        cls.test_teacher_1 = TEST_TEACHER_1
+        cls.test_student_1 = TEST_STUDENT_1
+        cls.test_student_2 = TEST_STUDENT_2
+        cls.teacher_user_1 = User.objects._create_user(**cls.test_teacher_1)
+        cls.student_user_1 = User.objects._create_user(**cls.test_student_1)
+        cls.student_user_2 = User.objects._create_user(**cls.test_student_2)
+        cls.test_course = Course(creator=cls.teacher_user_1, **TEST_COURSE)
+        cls.test_course.save()
+        cls.test_lecture = Lecture(creator=cls.teacher_user_1, course=Course.objects.get(id=1), **TEST_LECTURE)
+        cls.test_lecture.save()
+        cls.test_hometask = Hometask(creator=cls.teacher_user_1, lecture=Lecture.objects.get(id=1), **TEST_HOMETASK)
+        cls.test_hometask.save()
+        cls.test_completed_hometask = CompletedHomework(link='https://www.test.com',
+                                                        creator=cls.student_user_1,
+                                                        hometask=Hometask.objects.get(id=1),
+                                                        )
+        cls.test_completed_hometask.save()
+
+    def setUp(self):
+        self.factory = APIRequestFactory()
+
+    def test_mark_creation(self):
+        user = User.objects.get(username='teacher1')
+        view = MarkView.as_view()
+        course = Course.objects.get(id=1)
+        course.teacher.add(user)
+        completed_hometask = CompletedHomework.objects.get(id=1)
+        request = self.factory.post(
+            reverse('marks', kwargs={'pk': 1}),
+            data={
+                'mark': 100,
+                'creator': user,
+                'completed_homework': completed_hometask,
+            },
+        )
+        force_authenticate(request, user=user)
+        response = view(request, pk=1)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_mark_creation_forbidden(self):
+        user = User.objects.get(username='student1')
+        view = MarkView.as_view()
+        course = Course.objects.get(id=1)
+        course.student.add(user)
+        completed_hometask = CompletedHomework.objects.get(id=1)
+        request = self.factory.post(
+            reverse('marks', kwargs={'pk': 1}),
+            data={
+                'mark': 100,
+                'creator': user,
+                'completed_homework': completed_hometask,
+            },
+        )
+        force_authenticate(request, user=user)
+        response = view(request, pk=1)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class TestMarkView(ClassroomTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super(TestMarkView, cls).setUpClass()
+        cls.test_teacher_1 = TEST_TEACHER_1
+        cls.test_student_1 = TEST_STUDENT_1
+        cls.test_student_2 = TEST_STUDENT_2
+        cls.teacher_user_1 = User.objects._create_user(**cls.test_teacher_1)
+        cls.student_user_1 = User.objects._create_user(**cls.test_student_1)
+        cls.student_user_2 = User.objects._create_user(**cls.test_student_2)
+        cls.test_course = Course(creator=cls.teacher_user_1, **TEST_COURSE)
+        cls.test_course.save()
+        cls.test_lecture = Lecture(creator=cls.teacher_user_1, course=Course.objects.get(id=1), **TEST_LECTURE)
+        cls.test_lecture.save()
+        cls.test_hometask = Hometask(creator=cls.teacher_user_1, lecture=Lecture.objects.get(id=1), **TEST_HOMETASK)
+        cls.test_hometask.save()
+        cls.test_completed_hometask = CompletedHomework(link='https://www.test.com',
+                                                        creator=cls.student_user_1,
+                                                        hometask=Hometask.objects.get(id=1),
+                                                        )
+        cls.test_completed_hometask.save()
+        cls.test_mark = Mark(mark=100, creator=cls.teacher_user_1,
+                             completed_homework=CompletedHomework.objects.get(id=1))
+        cls.test_mark.save()
+
+    def setUp(self):
+        self.factory = APIRequestFactory()
+
+    def test_completed_hometask_view_for_student(self):
+        user = User.objects.get(username='student1')
+        test_course = Course.objects.get(id=1)
+        test_course.student.add(user)
+        view = MarkView.as_view()
+        request = self.factory.get(reverse('marks', kwargs={'pk': 1}))
+        force_authenticate(request, user=user)
+        response = view(request, pk=1)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_course_view_forbidden_method(self):
+        user = User.objects.get(username='teacher1')
+        view = MarkView.as_view()
+        course = Course.objects.get(id=1)
+        course.teacher.add(user)
+        request = self.factory.delete(reverse('marks', kwargs={'pk': 1}))
+        force_authenticate(request, user=user)
+        response = view(request, pk=1)
+        self.assertEqual(response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+
+    def test_student_cant_see_mark_and_its_details_if_not_creators(self):
+        user = User.objects.get(username='student2')
+        test_other_completed_hometask = CompletedHomework(link='https://www.othertest.com',
+                                                          creator=user,
+                                                          hometask=Hometask.objects.get(id=1), )
+        test_other_completed_hometask.save()
+        teacher = User.objects.get(username='teacher1')
+        mark_view = MarkView.as_view()
+        test_other_mark = Mark(mark=99, creator=teacher, completed_homework=CompletedHomework.objects.get(id=2))
+        test_other_mark.save()
+        request = self.factory.get(reverse('marks', kwargs={'pk': 1}))
+        force_authenticate(request, user=user)
+        response = mark_view(request, pk=1)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        mark_detail_view = MarkDetailView.as_view()
+        request = self.factory.get(reverse('detailed-mark', kwargs={'pk': 1}))
+        force_authenticate(request, user=user)
+        response = mark_detail_view(request, hometasks_pk=1, pk=1)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class TestCommentCreation(ClassroomTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super(TestCommentCreation, cls).setUpClass()
+        cls.test_teacher_1 = TEST_TEACHER_1
+        cls.test_student_1 = TEST_STUDENT_1
+        cls.test_student_2 = TEST_STUDENT_2
+        cls.teacher_user_1 = User.objects._create_user(**cls.test_teacher_1)
+        cls.student_user_1 = User.objects._create_user(**cls.test_student_1)
+        cls.student_user_2 = User.objects._create_user(**cls.test_student_2)
+        cls.test_course = Course(creator=cls.teacher_user_1, **TEST_COURSE)
+        cls.test_course.save()
+        cls.test_lecture = Lecture(creator=cls.teacher_user_1, course=Course.objects.get(id=1), **TEST_LECTURE)
+        cls.test_lecture.save()
+        cls.test_hometask = Hometask(creator=cls.teacher_user_1, lecture=Lecture.objects.get(id=1), **TEST_HOMETASK)
+        cls.test_hometask.save()
+        cls.test_completed_hometask = CompletedHomework(link='https://www.test.com',
+                                                        creator=cls.student_user_1,
+                                                        hometask=Hometask.objects.get(id=1),
+                                                        )
+        cls.test_completed_hometask.save()
+        cls.test_mark = Mark(mark=100, creator=cls.teacher_user_1,
+                             completed_homework=CompletedHomework.objects.get(id=1))
+        cls.test_mark.save()
+
+    def setUp(self):
+        self.factory = APIRequestFactory()
+
+    def test_teacher_comment_creation(self):
+        user = User.objects.get(username='teacher1')
+        view = CommentView.as_view()
+        course = Course.objects.get(id=1)
+        course.teacher.add(user)
+        mark = Mark.objects.get(id=1)
+        request = self.factory.post(
+            reverse('comments', kwargs={'mark_pk': 1}),
+            data={
+                'mark': mark,
+                'creator': user,
+                'comment_text': 'Test comment text',
+            },
+        )
+        force_authenticate(request, user=user)
+        response = view(request, mark_pk=1)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_student_comment_creation(self):
+        user = User.objects.get(username='student1')
+        view = CommentView.as_view()
+        course = Course.objects.get(id=1)
+        course.student.add(user)
+        mark = Mark.objects.get(id=1)
+        request = self.factory.post(
+            reverse('comments', kwargs={'mark_pk': 1}),
+            data={
+                'mark': mark,
+                'creator': user,
+                'comment_text': 'Another test comment text',
+            },
+        )
+        force_authenticate(request, user=user)
+        response = view(request, mark_pk=1)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+
+class TestCommentView(ClassroomTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super(TestCommentView, cls).setUpClass()
+        cls.test_teacher_1 = TEST_TEACHER_1
+        cls.test_student_1 = TEST_STUDENT_1
+        cls.test_student_2 = TEST_STUDENT_2
+        cls.teacher_user_1 = User.objects._create_user(**cls.test_teacher_1)
+        cls.student_user_1 = User.objects._create_user(**cls.test_student_1)
+        cls.student_user_2 = User.objects._create_user(**cls.test_student_2)
+        cls.test_course = Course(creator=cls.teacher_user_1, **TEST_COURSE)
+        cls.test_course.save()
+        cls.test_lecture = Lecture(creator=cls.teacher_user_1, course=Course.objects.get(id=1), **TEST_LECTURE)
+        cls.test_lecture.save()
+        cls.test_hometask = Hometask(creator=cls.teacher_user_1, lecture=Lecture.objects.get(id=1), **TEST_HOMETASK)
+        cls.test_hometask.save()
+        cls.test_completed_hometask = CompletedHomework(link='https://www.test.com',
+                                                        creator=cls.student_user_1,
+                                                        hometask=Hometask.objects.get(id=1),
+                                                        )
+        cls.test_completed_hometask.save()
+        cls.test_mark = Mark(mark=100, creator=cls.teacher_user_1,
+                             completed_homework=CompletedHomework.objects.get(id=1))
+        cls.test_mark.save()
+        cls.test_comment_1 = Comment(mark=Mark.objects.get(id=1), creator=cls.teacher_user_1,
+                                     comment_text='Test comment text')
+        cls.test_comment_1.save()
+        cls.test_comment_2 = Comment(mark=Mark.objects.get(id=1), creator=cls.student_user_1,
+                                     comment_text='Another test comment text')
+        cls.test_comment_2.save()
+
+    def setUp(self):
+        self.factory = APIRequestFactory()
+
+    def test_teacher_can_see_all_comments(self):
+        teacher = User.objects.get(username='teacher1')
+        test_course = Course.objects.get(id=1)
+        test_course.teacher.add(teacher)
+        view = CommentView.as_view()
+        request = self.factory.get(reverse('comments', kwargs={'mark_pk': 1}))
+        force_authenticate(request, user=teacher)
+        response = view(request, mark_pk=1)
+        self.assertEqual(len(json.loads(response.render().content)['results']), 2)
+
+    def test_student_can_see_all_comments(self):
+        student = User.objects.get(username='student1')
+        test_course = Course.objects.get(id=1)
+        test_course.student.add(student)
+        view = CommentView.as_view()
+        request = self.factory.get(reverse('comments', kwargs={'mark_pk': 1}))
+        force_authenticate(request, user=student)
+        response = view(request, mark_pk=1)
+        self.assertEqual(len(json.loads(response.render().content)['results']), 2)
+
+    def test_student_cant_see_comments_and_details_if_not_his_completed_homework(self):
+        user = User.objects.get(username='student2')
+        test_course = Course.objects.get(id=1)
+        test_course.student.add(user)
+        comment_view = CommentView.as_view()
+        request = self.factory.get(reverse('comments', kwargs={'mark_pk': 1}))
+        force_authenticate(request, user=user)
+        response = comment_view(request, mark_pk=1)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        comment_detail_view = CommentDetailView.as_view()
+        request = self.factory.get(reverse('detailed-comment', kwargs={'mark_pk': 1, 'pk': 1}))
+        force_authenticate(request, user=user)
+        response = comment_detail_view(request, mark_pk=1, pk=1)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_comment_view_forbidden_method(self):
+        user = User.objects.get(username='teacher1')
+        view = CommentView.as_view()
+        course = Course.objects.get(id=1)
+        course.teacher.add(user)
+        request = self.factory.delete(reverse('comments', kwargs={'mark_pk': 1}))
+        force_authenticate(request, user=user)
+        response = view(request, mark_pk=1)
+        self.assertEqual(response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+
+    def test_comment_cannot_be_deleted(self):
+        user = User.objects.get(username='teacher1')
+        view = CommentDetailView.as_view()
+        course = Course.objects.get(id=1)
+        course.teacher.add(user)
+        request = self.factory.delete(reverse('detailed-comment', kwargs={'mark_pk': 1, 'pk': 1}))
+        force_authenticate(request, user=user)
+        response = view(request, mark_pk=1, pk=1)
+        self.assertEqual(response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+
+
+class TestCourseMembership(ClassroomTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super(TestCourseMembership, cls).setUpClass()
+        cls.teacher_user_1 = User.objects._create_user(**TEST_TEACHER_1)
+        cls.student_user_1 = User.objects._create_user(**TEST_STUDENT_1)
+        cls.student_user_2 = User.objects._create_user(**TEST_STUDENT_2)
+        cls.test_course = Course.objects.create(**TEST_COURSE, creator=cls.teacher_user_1)
+        cls.test_course.teacher.add(cls.teacher_user_1)
+        cls.test_course.student.add(cls.student_user_1)
+
+    def test_course_role_is_resolved(self):
+        roles = fetch_course_roles(self.teacher_user_1.id)
+        self.assertEqual(roles, {self.test_course.id: (True, False)})
+        roles = fetch_course_roles(self.student_user_1.id)
+        self.assertEqual(roles, {self.test_course.id: (False, True)})
+        self.assertEqual(fetch_course_roles(self.student_user_2.id), {})
+
+    def test_course_role_is_cached(self):
+        request = SimpleNamespace(user=self.student_user_1)
+        with self.assertNumQueries(1):
+            self.assertTrue(get_course_role(request, self.test_course.id).is_student)
+            self.assertFalse(get_course_role(request, self.test_course.id).is_teacher)
+        with self.assertNumQueries(0):
+            self.assertTrue(get_course_role(SimpleNamespace(user=self.student_user_1), self.test_course.id).is_member)
+
+    def test_course_role_cache_is_invalidated_on_enrollment(self):
+        request = SimpleNamespace(user=self.student_user_2)
+        self.assertFalse(get_course_role(request, self.test_course.id).is_member)
+        self.test_course.student.add(self.student_user_2)
+        request = SimpleNamespace(user=self.student_user_2)
+        self.assertTrue(get_course_role(request, self.test_course.id).is_student)
+        self.student_user_2.students.clear()
+        request = SimpleNamespace(user=self.student_user_2)
+        self.assertFalse(get_course_role(request, self.test_course.id).is_member)
+
+    def test_ancestry_is_resolved_in_one_query(self):
+        lecture = Lecture.objects.create(title='Test Lecture', course=self.test_course, creator=self.teacher_user_1)
+        hometask = Hometask.objects.create(**TEST_HOMETASK, lecture=lecture, creator=self.teacher_user_1)
+        completed = CompletedHomework.objects.create(hometask=hometask, creator=self.student_user_1,
+                                                     link='http://example.com')
+        mark = Mark.objects.create(completed_homework=completed, creator=self.teacher_user_1, mark=5)
+        comment = Comment.objects.create(mark=mark, creator=self.teacher_user_1, comment_text='Good')
+        get_course_role(SimpleNamespace(user=self.teacher_user_1), self.test_course.id)
+        request = SimpleNamespace(user=self.teacher_user_1)
+        with self.assertNumQueries(1):
+            ancestry = get_ancestry(request, Comment, comment.id)
+            get_ancestry(request, Comment, comment.id)
+        self.assertEqual(ancestry.course_id, self.test_course.id)
+        self.assertTrue(ancestry.role.is_teacher)
+        self.assertTrue(ancestry.is_owned_by(self.student_user_1))
+        self.assertFalse(get_ancestry(request, Lecture, lecture.id).is_owned_by(self.teacher_user_1))
+
+
+class TestIndexUsage(ClassroomTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super(TestIndexUsage, cls).setUpClass()
+        cls.teacher_user_1 = User.objects._create_user(**TEST_TEACHER_1)
+        cls.student_user_1 = User.objects._create_user(**TEST_STUDENT_1)
+        cls.test_course = Course.objects.create(**TEST_COURSE, creator=cls.teacher_user_1)
+
+    def assertUsesIndex(self, queryset, *index_names):
+        with transaction.atomic():
+            if connection.vendor == 'postgresql':
+                with connection.cursor() as cursor:
+                    cursor.execute('SET LOCAL enable_seqscan = off')
+            plan = queryset.explain()
+        self.assertTrue(any(name in plan for name in index_names), plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+        self.assertNotRegex(plan, r'(^|->\s*)Sort\b')
+
+    def test_nested_lists_use_composite_indexes(self):
+        self.assertUsesIndex(Lecture.objects.filter(course=self.test_course.id)[:50], 'lecture_course_id_idx')
+        self.assertUsesIndex(Hometask.objects.filter(lecture=1)[:50], 'hometask_lecture_title_idx')
+        self.assertUsesIndex(CompletedHomework.objects.filter(hometask=1).order_by('-id')[:50],
+                             'completed_hometask_id_idx')
+        self.assertUsesIndex(Comment.objects.filter(mark=1).order_by('-id')[:50], 'comment_mark_id_idx')
+
+    def test_grading_queue_uses_partial_index(self):
+        self.assertUsesIndex(CompletedHomework.objects.filter(is_graded=False).order_by('submitted_at', 'id')[:50],
+                             'completed_ungraded_idx')
+
+    def test_own_submission_uses_unique_constraint(self):
+        self.assertUsesIndex(CompletedHomework.objects.filter(hometask=1, creator=self.student_user_1),
+                             'unique_submission_per_student', 'sqlite_autoindex_classroom_completedhomework')
+
+    def test_duplicate_submission_is_rejected_by_the_database(self):
+        lecture = Lecture.objects.create(title='Test Lecture', course=self.test_course, creator=self.teacher_user_1)
+        hometask = Hometask.objects.create(**TEST_HOMETASK, lecture=lecture, creator=self.teacher_user_1)
+        CompletedHomework.objects.create(hometask=hometask, creator=self.student_user_1)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            CompletedHomework.objects.create(hometask=hometask, creator=self.student_user_1)
+
+
+class TestDetailQueryCount(ClassroomTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super(TestDetailQueryCount, cls).setUpClass()
+        cls.teacher_user_1 = User.objects._create_user(**TEST_TEACHER_1)
+        cls.test_course = Course.objects.create(**TEST_COURSE, creator=cls.teacher_user_1)
+        cls.test_course.teacher.add(cls.teacher_user_1)
+        cls.test_course.student.add(*User.objects.bulk_create(
+            User(username='student{}'.format(i), email='student{}@student.ru'.format(i)) for i in range(50)))
+        cls.test_lecture = Lecture.objects.create(title='Lecture', course=cls.test_course, creator=cls.teacher_user_1)
+        Lecture.objects.bulk_create(
+            Lecture(title='Lecture {}'.format(i), course=cls.test_course, creator=cls.teacher_user_1)
+            for i in range(50))
+        Hometask.objects.bulk_create(
+            Hometask(title='Hometask {}'.format(i), lecture=cls.test_lecture, creator=cls.teacher_user_1)
+            for i in range(50))
+
+    def setUp(self):
+        self.factory = APIRequestFactory()
+
+    def test_course_detail_query_count(self):
+        view = SingleCourseView.as_view()
+        request = self.factory.get(reverse('detailed-course', kwargs={'pk': self.test_course.id}))
+        force_authenticate(request, user=self.teacher_user_1)
+        with self.assertNumQueries(6):
+            response = view(request, pk=self.test_course.id)
+        self.assertEqual(len(response.data['course_lectures']), 51)
+        self.assertEqual(len(response.data['student']), 50)
+
+    def test_lecture_detail_query_count(self):
+        view = LectureDetailView.as_view()
+        kwargs = {'course_pk': self.test_course.id, 'pk': self.test_lecture.id}
+        request = self.factory.get(reverse('detailed-course-lecture', kwargs=kwargs))
+        force_authenticate(request, user=self.teacher_user_1)
+        with self.assertNumQueries(4):
+            response = view(request, **kwargs)
+        self.assertEqual(len(response.data['hometask']), 50)
+
+
+ROUTE_BUDGETS = {
+    'register': (3, 3.0),
+    'users': (1, 1.0),
+    'users-import': (12, 3.0),
+    'login': (3, 3.0),
+    'login-async': (4, 3.0),
+    'logout': (2, 1.0),
+    'dashboard': (4, 1.0),
+    'grading-queue': (2, 1.0),
+    'course': (1, 1.0),
+    'detailed-course': (6, 1.0),
+    'course-gradebook': (2, 1.0),
+    'course-statistics': (4, 1.0),
+    'course-enrollment': (13, 1.0),
+    'course-lectures': (3, 1.0),
+    'detailed-course-lecture': (4, 1.0),
+    'lecture-presentation': (2, 1.0),
+    'presentation-uploads': (3, 1.0),
+    'detailed-presentation-upload': (1, 1.0),
+    'lecture-hometask': (4, 1.0),
+    'detailed-hometask': (5, 1.0),
+    'hometask-completed': (4, 1.0),
+    'detailed-hometask-completed': (3, 1.0),
+    'hometask-marks': (18, 1.0),
+    'marks': (4, 1.0),
+    'detailed-mark': (4, 1.0),
+    'comments': (4, 1.0),
+    'detailed-comment': (3, 1.0),
+}
+
+
+class TestRouteBudgets(ClassroomTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super(TestRouteBudgets, cls).setUpClass()
+        cls.teacher_user_1 = User.objects._create_user(**TEST_TEACHER_1)
+        cls.student_user_1 = User.objects._create_user(**TEST_STUDENT_1)
+        students = User.objects.bulk_create(
+            User(username='pupil{}'.format(i), email='pupil{}@student.ru'.format(i)) for i in range(2000))
+        cls.test_course = Course.objects.create(**TEST_COURSE, creator=cls.teacher_user_1)
+        cls.test_course.teacher.add(cls.teacher_user_1)
+        cls.test_course.student.add(cls.student_user_1, *students)
+        Course.objects.bulk_create(
+            Course(title='Course {}'.format(i), description='Course', creator=cls.teacher_user_1) for i in range(100))
+        cls.test_lecture = Lecture.objects.create(title='Lecture', course=cls.test_course, creator=cls.teacher_user_1)
+        Lecture.objects.bulk_create(
+            Lecture(title='Lecture {}'.format(i), course=cls.test_course, creator=cls.teacher_user_1)
+            for i in range(300))
+        cls.test_hometask = Hometask.objects.create(**TEST_HOMETASK, lecture=cls.test_lecture,
+                                                    creator=cls.teacher_user_1)
+        Hometask.objects.bulk_create(
+            Hometask(title='Hometask {}'.format(i), lecture=cls.test_lecture, creator=cls.teacher_user_1)
+            for i in range(100))
+        cls.test_completed = CompletedHomework.objects.create(hometask=cls.test_hometask, creator=cls.student_user_1,
+                                                              link='http://example.com/student1')
+        submissions = CompletedHomework.objects.bulk_create(
+            CompletedHomework(hometask=cls.test_hometask, creator=student, link='http://example.com/{}'.format(i))
+            for i, student in enumerate(students[:500]))
+        Mark.objects.bulk_create(
+            Mark(completed_homework=submission, creator=cls.teacher_user_1, mark=i % 10)
+            for i, submission in enumerate(submissions))
+        cls.test_mark = Mark.objects.create(completed_homework=cls.test_completed, creator=cls.teacher_user_1, mark=9)
+        Comment.objects.bulk_create(
+            Comment(mark=cls.test_mark, creator=cls.teacher_user_1, comment_text='Comment {}'.format(i))
+            for i in range(200))
+        cls.test_comment = Comment.objects.create(mark=cls.test_mark, creator=cls.student_user_1,
+                                                  comment_text='Thanks')
+        rebuild_statistics()
+
+    def assertWithinBudget(self, name, method='get', user=None, data=None, **kwargs):
+        max_queries, max_seconds = ROUTE_BUDGETS[name]
+        self.client.force_authenticate(user=user)
+        for cache in caches.all():
+            cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            response = getattr(self.client, method)(reverse(name, kwargs=kwargs), data=data, format='json')
+            if response.streaming:
+                response.streamed_content = b''.join(response.streaming_content)
+            elapsed = time.perf_counter() - started
+        self.assertLess(response.status_code, 300)
+        self.assertLessEqual(len(queries), max_queries, '\n'.join(query['sql'] for query in queries))
+        self.assertLessEqual(elapsed, max_seconds)
+        return response
+
+    def test_every_route_has_a_budget(self):
+        self.assertEqual(set(ROUTE_BUDGETS), {pattern.name for pattern in urlpatterns})
+
+    def test_user_routes(self):
+        self.assertWithinBudget('register', 'post', data=TEST_USER)
+        self.assertWithinBudget('users', user=self.teacher_user_1)
+        self.assertWithinBudget('users-import', 'post', user=self.teacher_user_1,
+                                data={'users': import_rows(5), 'course': self.test_course.id})
+        self.assertWithinBudget('login', 'post', data={'username': 'student1', 'password': 'student1'})
+        self.assertWithinBudget('login-async', 'post', data={'username': 'student1', 'password': 'student1'})
+        self.assertWithinBudget('logout', user=self.student_user_1)
+        response = self.assertWithinBudget('dashboard', user=self.student_user_1)
+        self.assertEqual(len(response.data['pending_hometasks']), 100)
+
+    def test_course_routes(self):
+        self.assertWithinBudget('course', user=self.student_user_1)
+        self.assertWithinBudget('detailed-course', user=self.student_user_1, pk=self.test_course.id)
+        self.assertWithinBudget('course-gradebook', user=self.teacher_user_1, pk=self.test_course.id)
+        self.assertWithinBudget('course-statistics', user=self.teacher_user_1, pk=self.test_course.id)
+        cohort = {'add': ['pupil{}'.format(i) for i in range(1000, 2000)] + [self.teacher_user_1.id],
+                  'remove': ['pupil{}'.format(i) for i in range(1000)]}
+        self.assertWithinBudget('course-enrollment', 'post', user=self.teacher_user_1, data=cohort,
+                                pk=self.test_course.id)
+        self.assertWithinBudget('course-lectures', user=self.student_user_1, course_pk=self.test_course.id)
+        self.assertWithinBudget('detailed-course-lecture', user=self.student_user_1,
+                                course_pk=self.test_course.id, pk=self.test_lecture.id)
+
+    def test_presentation_routes(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        with self.settings(MEDIA_ROOT=media_root):
+            lecture = Lecture.objects.get(id=self.test_lecture.id)
+            lecture.presentation.save('deck.pdf', ContentFile(b'0' * 1024 * 1024))
+            response = self.assertWithinBudget('lecture-presentation', user=self.student_user_1,
+                                               course_pk=self.test_course.id, pk=lecture.id)
+            self.assertEqual(len(response.streamed_content), 1024 * 1024)
+        response = self.assertWithinBudget('presentation-uploads', 'post', user=self.teacher_user_1,
+                                           data={'filename': 'deck.pdf', 'size': 200 * 1024 * 1024},
+                                           lecture_pk=self.test_lecture.id)
+        self.assertWithinBudget('detailed-presentation-upload', user=self.teacher_user_1, pk=response.data['id'])
+
+    def test_hometask_routes(self):
+        self.assertWithinBudget('lecture-hometask', user=self.student_user_1, lecture_pk=self.test_lecture.id)
+        self.assertWithinBudget('detailed-hometask', user=self.student_user_1,
+                                lecture_pk=self.test_lecture.id, pk=self.test_hometask.id)
+        self.assertWithinBudget('hometask-completed', user=self.teacher_user_1, hometasks_pk=self.test_hometask.id)
+        self.assertWithinBudget('detailed-hometask-completed', user=self.teacher_user_1,
+                                hometasks_pk=self.test_hometask.id, pk=self.test_completed.id)
+
+    def test_mark_routes(self):
+        grades = [{'completed_homework': submission_id, 'mark': 10, 'comment': 'Regraded'}
+                  for submission_id in CompletedHomework.objects.values_list('id', flat=True)[:400]]
+        self.assertWithinBudget('hometask-marks', 'post', user=self.teacher_user_1, data=grades,
+                                hometasks_pk=self.test_hometask.id)
+        self.assertWithinBudget('grading-queue', user=self.teacher_user_1)
+        self.assertWithinBudget('marks', user=self.student_user_1, pk=self.test_completed.id)
+        self.assertWithinBudget('detailed-mark', user=self.student_user_1, pk=self.test_mark.id)
+        self.assertWithinBudget('comments', user=self.student_user_1, mark_pk=self.test_mark.id)
+        self.assertWithinBudget('detailed-comment', user=self.student_user_1,
+                                mark_pk=self.test_mark.id, pk=self.test_comment.id)
+
+    def test_list_pages_follow_model_ordering(self):
+        self.client.force_authenticate(user=self.student_user_1)
+        url = reverse('course-lectures', kwargs={'course_pk': self.test_course.id})
+        lecture_ids = []
+        while url:
+            response = self.client.get(url, {'page_size': 100} if not lecture_ids else None)
+            lecture_ids.extend(lecture['id'] for lecture in response.data['results'])
+            url = response.data['next']
+        self.assertEqual(len(lecture_ids), 301)
+        self.assertEqual(lecture_ids, sorted(lecture_ids, reverse=True))
+
+
+class TestGradebook(ClassroomTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super(TestGradebook, cls).setUpClass()
+        cls.teacher_user_1 = User.objects._create_user(**TEST_TEACHER_1)
+        cls.student_user_1 = User.objects._create_user(**TEST_STUDENT_1)
+        cls.test_course = Course.objects.create(**TEST_COURSE, creator=cls.teacher_user_1)
+        cls.test_course.teacher.add(cls.teacher_user_1)
+        cls.test_course.student.add(cls.student_user_1)
+        lecture = Lecture.objects.create(title='Test Lecture', course=cls.test_course, creator=cls.teacher_user_1)
+        hometask = Hometask.objects.create(**TEST_HOMETASK, lecture=lecture, creator=cls.teacher_user_1)
+        completed = CompletedHomework.objects.create(hometask=hometask, creator=cls.student_user_1,
+                                                     link='http://example.com')
+        mark = Mark.objects.create(completed_homework=completed, creator=cls.teacher_user_1, mark=8)
+        Comment.objects.create(mark=mark, creator=cls.teacher_user_1, comment_text='Good')
+        Comment.objects.create(mark=mark, creator=cls.student_user_1, comment_text='Thanks')
+
+    def test_gradebook_csv(self):
+        self.client.force_authenticate(user=self.teacher_user_1)
+        response = self.client.get(reverse('course-gradebook', kwargs={'pk': self.test_course.id}))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0], 'submission,student,lecture,hometask,link,mark,comments')
+        self.assertTrue(lines[1].endswith('student1,Test Lecture,Test_hometask,http://example.com,8,2'))
+
+    def test_gradebook_ndjson(self):
+        self.client.force_authenticate(user=self.teacher_user_1)
+        response = self.client.get(reverse('course-gradebook', kwargs={'pk': self.test_course.id}),
+                                   {'export': 'ndjson'})
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]['mark'], 8)
+        self.assertEqual(rows[0]['comments'], 2)
+
+    def test_gradebook_forbidden_for_student(self):
+        self.client.force_authenticate(user=self.student_user_1)
+        response = self.client.get(reverse('course-gradebook', kwargs={'pk': self.test_course.id}))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class TestAsyncReadViews(ClassroomTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super(TestAsyncReadViews, cls).setUpClass()
+        cls.teacher_user_1 = User.objects._create_user(**TEST_TEACHER_1)
+        cls.student_user_1 = User.objects._create_user(**TEST_STUDENT_1)
+        cls.student_user_2 = User.objects._create_user(**TEST_STUDENT_2)
+        cls.test_course = Course.objects.create(**TEST_COURSE, creator=cls.teacher_user_1)
+        cls.test_course.teacher.add(cls.teacher_user_1)
+        cls.test_course.student.add(cls.student_user_1)
+        Lecture.objects.create(title='Test Lecture', course=cls.test_course, creator=cls.teacher_user_1)
+
+    def setUp(self):
+        self.factory = APIRequestFactory()
+
+    def call(self, view_class, user, path='/', **kwargs):
+        view = async_read_view(view_class)
+        request = self.factory.get(path)
+        force_authenticate(request, user=user)
+        return async_to_sync(view)(request, **kwargs)
+
+    def test_async_view_keeps_view_attributes(self):
+        view = async_read_view(SingleCourseView)
+        self.assertTrue(asyncio.iscoroutinefunction(view))
+        self.assertIs(view.cls, SingleCourseView)
+        self.assertTrue(view.csrf_exempt)
+        self.assertFalse(asyncio.iscoroutinefunction(read_view(SingleCourseView)))
+
+    def test_async_detail_and_list(self):
+        response = self.call(SingleCourseView, self.student_user_1, pk=self.test_course.id)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(json.loads(response.content)['title'], TEST_COURSE['title'])
+        response = self.call(LectureView, self.student_user_1, course_pk=self.test_course.id)
+        self.assertEqual(len(json.loads(response.content)['results']), 1)
+
+    def test_async_permission_checks(self):
+        response = self.call(LectureView, self.student_user_2, course_pk=self.test_course.id)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_async_gradebook_is_streamed_off_the_event_loop(self):
+        response = self.call(GradebookView, self.teacher_user_1, pk=self.test_course.id)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        messages = []
+
+        async def send(message):
+            messages.append(message)
+
+        async_to_sync(StreamingASGIHandler().send_response)(response, send)
+        self.assertEqual(messages[0]['status'], status.HTTP_200_OK)
+        self.assertEqual(b''.join(message.get('body', b'') for message in messages[1:]).decode().splitlines()[0],
+                         'submission,student,lecture,hometask,link,mark,comments')
+        self.assertFalse(messages[-1].get('more_body', False))
+
+    def test_streamed_responses_are_closed(self):
+        finished = []
+
+        def request_finished_received(**kwargs):
+            finished.append(kwargs)
+
+        async def send(message):
+            pass
+
+        request_finished.disconnect(close_old_connections)
+        self.addCleanup(request_finished.connect, close_old_connections)
+        request_finished.connect(request_finished_received)
+        self.addCleanup(request_finished.disconnect, request_finished_received)
+        stream = BytesIO(b'slides')
+        for response in (StreamingHttpResponse(iter([b'a', b'b'])), FileResponse(stream)):
+            async_to_sync(StreamingASGIHandler().send_response)(response, send)
+        self.assertEqual(len(finished), 2)
+        self.assertTrue(stream.closed)
+
+
+class TestPresentationUpload(ClassroomTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super(TestPresentationUpload, cls).setUpClass()
+        cls.teacher_user_1 = User.objects._create_user(**TEST_TEACHER_1)
+        cls.teacher_user_2 = User.objects._create_user(**TEST_TEACHER_2)
+        cls.student_user_1 = User.objects._create_user(**TEST_STUDENT_1)
+        cls.test_course = Course.objects.create(**TEST_COURSE, creator=cls.teacher_user_1)
+        cls.test_course.teacher.add(cls.teacher_user_1, cls.teacher_user_2)
+        cls.test_course.student.add(cls.student_user_1)
+        cls.test_lecture = Lecture.objects.create(title='Test Lecture', course=cls.test_course,
+                                                  creator=cls.teacher_user_1)
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        media_settings = self.settings(MEDIA_ROOT=media_root, PRESENTATION_CHUNK_MAX_SIZE=4)
+        media_settings.enable()
+        self.addCleanup(media_settings.disable)
+
+    def start_upload(self, user, size):
+        self.client.force_authenticate(user=user)
+        return self.client.post(reverse('presentation-uploads', kwargs={'lecture_pk': self.test_lecture.id}),
+                                {'filename': '../deck.pdf', 'size': size}, format='json')
+
+    def send_chunk(self, upload_id, data, start, size):
+        return self.client.put(reverse('detailed-presentation-upload', kwargs={'pk': upload_id}), data,
+                               content_type='application/octet-stream',
+                               HTTP_CONTENT_RANGE='bytes {}-{}/{}'.format(start, start + len(data) - 1, size))
+
+    def test_chunked_upload_is_resumable(self):
+        response = self.start_upload(self.teacher_user_1, 10)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual((response.data['filename'], response.data['offset']), ('deck.pdf', 0))
+        upload_id = response.data['id']
+        self.assertEqual(self.send_chunk(upload_id, b'0123', 0, 10).data['offset'], 4)
+        response = self.send_chunk(upload_id, b'89', 8, 10)
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(response.data['offset'], 4)
+        response = self.client.get(reverse('detailed-presentation-upload', kwargs={'pk': upload_id}))
+        self.assertEqual((response.data['offset'], response.data['complete']), (4, False))
+        self.assertEqual(self.send_chunk(upload_id, b'4567', 4, 10).data['offset'], 8)
+        response = self.send_chunk(upload_id, b'89', 8, 10)
+        self.assertTrue(response.data['complete'])
+        self.assertIn('/resources/presentation/', response.data['presentation'])
+        self.test_lecture.refresh_from_db()
+        with self.test_lecture.presentation.open('rb') as presentation:
+            self.assertEqual(presentation.read(), b'0123456789')
+        self.assertFalse(PresentationUpload.objects.exists())
+        self.assertFalse(os.listdir(os.path.join(settings.MEDIA_ROOT, 'uploads')))
+
+    def test_chunk_that_loses_a_race_is_discarded(self):
+        upload_id = self.start_upload(self.teacher_user_1, 10).data['id']
+
+        def receive_after_another_chunk(upload, stream, length):
+            PresentationUpload.objects.filter(id=upload_id).update(offset=4)
+            return receive_chunk(upload, stream, length)
+
+        with mock.patch('classroom.views.receive_chunk', receive_after_another_chunk):
+            response = self.send_chunk(upload_id, b'0123', 0, 10)
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(response.data['offset'], 4)
+        self.assertFalse(os.listdir(os.path.join(settings.MEDIA_ROOT, 'uploads')))
+
+    def test_chunk_validation(self):
+        upload_id = self.start_upload(self.teacher_user_1, 10).data['id']
+        response = self.send_chunk(upload_id, b'01234', 0, 10)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.send_chunk(upload_id, b'0123', 0, 12)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.start_upload(self.teacher_user_1, 0).status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_upload_permissions(self):
+        self.assertEqual(self.start_upload(self.student_user_1, 10).status_code, status.HTTP_403_FORBIDDEN)
+        upload_id = self.start_upload(self.teacher_user_1, 10).data['id']
+        self.client.force_authenticate(user=self.teacher_user_2)
+        self.assertEqual(self.send_chunk(upload_id, b'0123', 0, 10).status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_abort_upload_removes_part(self):
+        upload_id = self.start_upload(self.teacher_user_1, 10).data['id']
+        self.send_chunk(upload_id, b'0123', 0, 10)
+        upload = PresentationUpload.objects.get(id=upload_id)
+        self.assertTrue(os.path.exists(part_path(upload)))
+        response = self.client.delete(reverse('detailed-presentation-upload', kwargs={'pk': upload_id}))
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(os.path.exists(part_path(upload)))
+
+    def test_purge_unfinished_uploads(self):
+        upload_id = self.start_upload(self.teacher_user_1, 10).data['id']
+        self.send_chunk(upload_id, b'0123', 0, 10)
+        PresentationUpload.objects.filter(id=upload_id).update(created=timezone.now() - timedelta(days=2))
+        out = StringIO()
+        call_command('purge_uploads', stdout=out)
+        self.assertIn('Deleted 1 unfinished uploads.', out.getvalue())
+        self.assertFalse(os.listdir(os.path.join(settings.MEDIA_ROOT, 'uploads')))
+
+
+class TestPresentationDownload(ClassroomTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super(TestPresentationDownload, cls).setUpClass()
+        cls.teacher_user_1 = User.objects._create_user(**TEST_TEACHER_1)
+        cls.student_user_1 = User.objects._create_user(**TEST_STUDENT_1)
+        cls.student_user_2 = User.objects._create_user(**TEST_STUDENT_2)
+        cls.test_course = Course.objects.create(**TEST_COURSE, creator=cls.teacher_user_1)
+        cls.test_course.teacher.add(cls.teacher_user_1)
+        cls.test_course.student.add(cls.student_user_1)
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        media_settings = self.settings(MEDIA_ROOT=media_root)
+        media_settings.enable()
+        self.addCleanup(media_settings.disable)
+        self.lecture = Lecture.objects.create(title='Test Lecture', course=self.test_course,
+                                              creator=self.teacher_user_1)
+        self.lecture.presentation.save('deck.pdf', ContentFile(b'0123456789'))
+        self.url = reverse('lecture-presentation', kwargs={'course_pk': self.test_course.id, 'pk': self.lecture.id})
+        self.client.force_authenticate(user=self.student_user_1)
+
+    def test_download_and_revalidate(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(b''.join(response.streaming_content), b'0123456789')
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        self.assertEqual(response['Content-Disposition'], 'inline; filename="Test Lecture.pdf"')
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_range_requests(self):
+        response = self.client.get(self.url, HTTP_RANGE='bytes=2-5')
+        self.assertEqual(response.status_code, status.HTTP_206_PARTIAL_CONTENT)
+        self.assertEqual(b''.join(response.streaming_content), b'2345')
+        self.assertEqual(response['Content-Range'], 'bytes 2-5/10')
+        response = self.client.get(self.url, HTTP_RANGE='bytes=-3')
+        self.assertEqual(b''.join(response.streaming_content), b'789')
+        response = self.client.get(self.url, HTTP_RANGE='bytes=20-')
+        self.assertEqual(response.status_code, status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE)
+        self.assertEqual(response['Content-Range'], 'bytes */10')
+        response = self.client.get(self.url, HTTP_RANGE='bytes=2-5', HTTP_IF_RANGE='"stale"')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_download_hands_off_to_proxy(self):
+        with self.settings(PRESENTATION_SENDFILE='x-accel'):
+            response = self.client.get(self.url)
+        self.assertEqual(response['X-Accel-Redirect'], '/protected/' + self.lecture.presentation.name)
+        self.assertEqual(response.content, b'')
+        with self.settings(PRESENTATION_SENDFILE='x-sendfile'):
+            response = self.client.get(self.url)
+        self.assertEqual(response['X-Sendfile'], self.lecture.presentation.path)
+
+    def test_download_permissions(self):
+        self.client.force_authenticate(user=self.student_user_2)
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_403_FORBIDDEN)
+        self.client.force_authenticate(user=self.teacher_user_1)
+        Lecture.objects.filter(id=self.lecture.id).update(presentation='')
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_404_NOT_FOUND)
+
+
+class TestPresentationStorage(ClassroomTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super(TestPresentationStorage, cls).setUpClass()
+        cls.teacher_user_1 = User.objects._create_user(**TEST_TEACHER_1)
+        cls.teacher_user_2 = User.objects._create_user(**TEST_TEACHER_2)
+        cls.test_course = Course.objects.create(**TEST_COURSE, creator=cls.teacher_user_1)
+        cls.test_course.teacher.add(cls.teacher_user_1)
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        media_settings = self.settings(MEDIA_ROOT=self.media_root)
+        media_settings.enable()
+        self.addCleanup(media_settings.disable)
+
+    def create_lecture(self, title, content):
+        lecture = Lecture.objects.create(title=title, course=self.test_course, creator=self.teacher_user_1)
+        lecture.presentation.save('deck.PDF', ContentFile(content))
+        return lecture
+
+    def test_identical_decks_are_stored_once(self):
+        first = self.create_lecture('First', b'slides')
+        second = self.create_lecture('Second', b'slides')
+        digest = hashlib.sha256(b'slides').hexdigest()
+        self.assertEqual(first.presentation.name, 'presentation/{}/{}.pdf'.format(digest[:2], digest))
+        self.assertEqual(second.presentation.name, first.presentation.name)
+        blob = PresentationBlob.objects.get()
+        self.assertEqual((blob.digest, blob.size, blob.references), (digest, 6, 2))
+        self.assertEqual(len(os.listdir(os.path.dirname(first.presentation.path))), 1)
+
+    def test_orphaned_blobs_are_deleted(self):
+        first = self.create_lecture('First', b'slides')
+        second = self.create_lecture('Second', b'slides')
+        path = first.presentation.path
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+        self.assertEqual(PresentationBlob.objects.get().references, 1)
+        self.assertTrue(os.path.exists(path))
+        with self.captureOnCommitCallbacks(execute=True):
+            second.presentation.save('new.pdf', ContentFile(b'new slides'))
+        self.assertFalse(os.path.exists(path))
+        self.assertEqual(list(PresentationBlob.objects.values_list('name', flat=True)), [second.presentation.name])
+
+    def test_duplicate_upload_by_digest_is_instant(self):
+        source = self.create_lecture('First', b'slides')
+        target = Lecture.objects.create(title='Second', course=self.test_course, creator=self.teacher_user_1)
+        self.client.force_authenticate(user=self.teacher_user_1)
+        data = {'filename': 'deck.pdf', 'size': 6, 'sha256': hashlib.sha256(b'slides').hexdigest()}
+        response = self.client.post(reverse('presentation-uploads', kwargs={'lecture_pk': target.id}), data,
+                                    format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertTrue(response.data['complete'])
+        target.refresh_from_db()
+        self.assertEqual(target.presentation.name, source.presentation.name)
+        self.assertEqual(PresentationBlob.objects.get().references, 2)
+        self.assertFalse(PresentationUpload.objects.exists())
+
+    def test_digest_of_a_foreign_deck_is_not_reused(self):
+        self.create_lecture('First', b'slides')
+        course = Course.objects.create(title='Other course', description='Other', creator=self.teacher_user_2)
+        course.teacher.add(self.teacher_user_2)
+        target = Lecture.objects.create(title='Second', course=course, creator=self.teacher_user_2)
+        self.client.force_authenticate(user=self.teacher_user_2)
+        data = {'filename': 'deck.pdf', 'size': 6, 'sha256': hashlib.sha256(b'slides').hexdigest()}
+        response = self.client.post(reverse('presentation-uploads', kwargs={'lecture_pk': target.id}), data,
+                                    format='json')
+        self.assertFalse(response.data['complete'])
+
+    def test_garbage_collection_recounts_references(self):
+        lecture = self.create_lecture('First', b'slides')
+        Lecture.objects.filter(id=lecture.id).update(presentation='')
+        stray = os.path.join(self.media_root, 'presentation', 'stray.pdf')
+        with open(stray, 'wb') as stream:
+            stream.write(b'stray')
+        out = StringIO()
+        call_command('gc_presentations', grace_seconds=0, stdout=out)
+        self.assertIn('Recounted 1 blobs, dropped 1 orphans, removed 2 files.', out.getvalue())
+        self.assertFalse(PresentationBlob.objects.exists())
+        self.assertFalse(os.path.exists(stray))
+
+
+@skipUnless('replica' in settings.DATABASES, 'needs the separate replica database from app.test_settings')
+class TestReplicaRouting(ClassroomTestCase):
+    databases = {'default'} | {'replica'} & set(settings.DATABASES)
+
+    @classmethod
+    def setUpClass(cls):
+        super(TestReplicaRouting, cls).setUpClass()
+        cls.teacher_user_1 = User.objects._create_user(**TEST_TEACHER_1)
+        cls.student_user_1 = User.objects._create_user(**TEST_STUDENT_1)
+        cls.test_course = Course.objects.create(**TEST_COURSE, creator=cls.teacher_user_1)
+        cls.test_course.teacher.add(cls.teacher_user_1)
+        cls.test_course.student.add(cls.student_user_1)
+        for instance in (cls.teacher_user_1, cls.student_user_1, cls.test_course):
+            instance.save(using='replica', force_insert=True)
+        for through in (Course.teacher.through, Course.student.through):
+            through.objects.using('replica').bulk_create(through.objects.all())
+        Course.objects.using('replica').filter(id=cls.test_course.id).update(title='Replica title')
+        CourseStatistics.objects.using('replica').create(course_id=cls.test_course.id, students=100, teachers=1)
+
+    def setUp(self):
+        routing = self.settings(DATABASE_REPLICAS=['replica'])
+        routing.enable()
+        self.addCleanup(routing.disable)
+
+    def get(self, user, name):
+        key, _ = AuthToken.issue(user)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + key)
+        return self.client.get(reverse(name, kwargs={'pk': self.test_course.id}))
+
+    def test_reads_go_to_replica(self):
+        response = self.get(self.teacher_user_1, 'course-statistics')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['students'], 100)
+
+    def test_cache_fills_read_from_primary(self):
+        Course.student.through.objects.using('replica').filter(user_id=self.student_user_1.id).delete()
+        response = self.get(self.student_user_1, 'detailed-course')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['title'], TEST_COURSE['title'])
+        cached = self.get(self.student_user_1, 'detailed-course')
+        self.assertEqual(json.loads(cached.content)['title'], TEST_COURSE['title'])
+        self.assertEqual(self.get(self.teacher_user_1, 'course-statistics').data['students'], 100)
+
+    def test_writes_pin_client_to_primary(self):
+        key, _ = AuthToken.issue(self.teacher_user_1)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + key)
+        response = self.client.patch(reverse('detailed-course', kwargs={'pk': self.test_course.id}),
+                                     {'title': 'Primary title'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        statistics = reverse('course-statistics', kwargs={'pk': self.test_course.id})
+        self.assertEqual(self.client.get(statistics).data['students'], 1)
+        self.assertEqual(self.get(self.teacher_user_1, 'course-statistics').data['students'], 100)
+
+    def test_reads_after_write_use_primary(self):
+        router = ReplicaRouter()
+        token = current_route.set(Route('replica'))
+        self.addCleanup(current_route.reset, token)
+        self.assertEqual(router.db_for_read(Course), 'replica')
+        self.assertEqual(router.db_for_read(AuthToken), 'default')
+        with transaction.atomic():
+            self.assertEqual(router.db_for_read(Course), 'default')
+        self.assertEqual(router.db_for_write(Course), 'default')
+        self.assertEqual(router.db_for_read(Course), 'default')
+
+
+class TestEnrollment(ClassroomTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super(TestEnrollment, cls).setUpClass()
+        cls.teacher_user_1 = User.objects._create_user(**TEST_TEACHER_1)
+        cls.teacher_user_2 = User.objects._create_user(**TEST_TEACHER_2)
+        cls.student_user_1 = User.objects._create_user(**TEST_STUDENT_1)
+        cls.student_user_2 = User.objects._create_user(**TEST_STUDENT_2)
+        cls.test_course = Course.objects.create(**TEST_COURSE, creator=cls.teacher_user_1)
+        cls.test_course.teacher.add(cls.teacher_user_1)
+        cls.test_course.student.add(cls.student_user_1)
+
+    def enroll(self, user, data):
+        self.client.force_authenticate(user=user)
+        return self.client.post(reverse('course-enrollment', kwargs={'pk': self.test_course.id}), data, format='json')
+
+    def test_bulk_enrollment(self):
+        response = self.enroll(self.teacher_user_1, {'add': ['student2'], 'remove': [self.student_user_1.id]})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {'role': 'student', 'added': 1, 'removed': 1, 'unchanged': 0})
+        self.assertEqual(list(self.test_course.student.all()), [self.student_user_2])
+        response = self.enroll(self.teacher_user_1, {'role': 'teacher', 'add': ['teacher1', 'teacher2']})
+        self.assertEqual(response.data, {'role': 'teacher', 'added': 1, 'removed': 0, 'unchanged': 1})
+
+    def test_enrollment_with_unknown_users(self):
+        response = self.enroll(self.teacher_user_1, {'add': ['nobody', 100500]})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['unknown'], ['100500', 'nobody'])
+
+    def test_enrollment_forbidden_for_student(self):
+        response = self.enroll(self.student_user_1, {'add': ['student2']})
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+def import_rows(count, prefix='imported'):
+    return [{
+        'username': '{}{}'.format(prefix, i),
+        'password': '{}{}'.format(prefix, i),
+        'first_name': prefix,
+        'last_name': prefix,
+        'email': '{}{}@student.ru'.format(prefix, i),
+    } for i in range(count)]
+
+
+class TestUserImport(ClassroomTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super(TestUserImport, cls).setUpClass()
+        cls.teacher_user_1 = User.objects._create_user(**TEST_TEACHER_1)
+        cls.teacher_user_2 = User.objects._create_user(**TEST_TEACHER_2)
+        cls.student_user_1 = User.objects._create_user(**TEST_STUDENT_1)
+        cls.test_course = Course.objects.create(**TEST_COURSE, creator=cls.teacher_user_1)
+        cls.test_course.teacher.add(cls.teacher_user_1)
+
+    def post_import(self, user, data):
+        self.client.force_authenticate(user=user)
+        return self.client.post(reverse('users-import'), data, format='json')
+
+    def test_import_and_enroll(self):
+        response = self.post_import(self.teacher_user_1, {'users': import_rows(30), 'course': self.test_course.id})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data, {'created': 30, 'enrolled': 30})
+        self.assertEqual(self.test_course.student.count(), 30)
+        self.assertTrue(User.objects.get(username='imported7').check_password('imported7'))
+
+    def test_import_reports_errors_per_row(self):
+        rows = import_rows(3) + [dict(TEST_STUDENT_2, username='student1'), dict(TEST_STUDENT_2, email='imported0')]
+        rows[2] = dict(rows[1], email='other@student.ru')
+        response = self.post_import(self.teacher_user_1, {'users': rows})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual([error['row'] for error in response.data['errors']], [2, 3, 4])
+        self.assertIn('username', response.data['errors'][0]['errors'])
+        self.assertIn('username', response.data['errors'][1]['errors'])
+        self.assertIn('email', response.data['errors'][2]['errors'])
+        self.assertFalse(User.objects.filter(username='imported0').exists())
+
+    def test_import_rejects_more_rows_than_the_request_cap(self):
+        with self.settings(USER_IMPORT_MAX_ROWS=5):
+            response = self.post_import(self.teacher_user_1, {'users': import_rows(6)})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('users', response.data)
+        self.assertFalse(User.objects.filter(username='imported0').exists())
+
+    def test_import_forbidden_for_students_and_other_teachers(self):
+        response = self.post_import(self.student_user_1, {'users': import_rows(1)})
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        response = self.post_import(self.teacher_user_2, {'users': import_rows(1), 'course': self.test_course.id})
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_import_command(self):
+        out = StringIO()
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'users.csv')
+            with open(path, 'w', newline='') as stream:
+                writer = csv.DictWriter(stream, fieldnames=list(import_rows(1)[0]) + ['registration_role'])
+                writer.writeheader()
+                writer.writerows(dict(row, registration_role='T') for row in import_rows(12, 'csvuser'))
+            call_command('import_users', path, course=self.test_course.id, role='teacher', workers=2, stdout=out)
+        self.assertIn('Created 12 users, enrolled 12.', out.getvalue())
+        self.assertEqual(self.test_course.teacher.count(), 13)
+        self.assertTrue(User.objects.get(username='csvuser11').check_password('csvuser11'))
+
+
+class TestBulkMarks(ClassroomTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super(TestBulkMarks, cls).setUpClass()
+        cls.teacher_user_1 = User.objects._create_user(**TEST_TEACHER_1)
+        cls.student_user_1 = User.objects._create_user(**TEST_STUDENT_1)
+        cls.student_user_2 = User.objects._create_user(**TEST_STUDENT_2)
+        cls.test_course = Course.objects.create(**TEST_COURSE, creator=cls.teacher_user_1)
+        cls.test_course.teacher.add(cls.teacher_user_1)
+        cls.test_course.student.add(cls.student_user_1, cls.student_user_2)
+        lecture = Lecture.objects.create(title='Test Lecture', course=cls.test_course, creator=cls.teacher_user_1)
+        cls.test_hometask = Hometask.objects.create(**TEST_HOMETASK, lecture=lecture, creator=cls.teacher_user_1)
+        cls.completed_1 = CompletedHomework.objects.create(hometask=cls.test_hometask, creator=cls.student_user_1,
+                                                           link='http://example.com/1')
+        cls.completed_2 = CompletedHomework.objects.create(hometask=cls.test_hometask, creator=cls.student_user_2,
+                                                           link='http://example.com/2')
+        Mark.objects.create(completed_homework=cls.completed_2, creator=cls.teacher_user_1, mark=3)
+
+    def grade(self, user, data):
+        self.client.force_authenticate(user=user)
+        return self.client.post(reverse('hometask-marks', kwargs={'hometasks_pk': self.test_hometask.id}), data,
+                                format='json')
+
+    def test_bulk_marks(self):
+        response = self.grade(self.teacher_user_1, [
+            {'completed_homework': self.completed_1.id, 'mark': 9, 'comment': 'Well done'},
+            {'completed_homework': self.completed_2.id, 'mark': 7},
+        ])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([item['mark'] for item in response.data], [9, 7])
+        self.assertEqual(Mark.objects.get(completed_homework=self.completed_1).comments.get().comment_text,
+                         'Well done')
+        self.assertEqual(Mark.objects.get(completed_homework=self.completed_2).mark, 7)
+
+    def test_bulk_marks_report_errors_per_item(self):
+        response = self.grade(self.teacher_user_1, [
+            {'completed_homework': self.completed_1.id, 'mark': 9},
+            {'completed_homework': 100500, 'mark': 7},
+            {'completed_homework': self.completed_1.id, 'mark': 'A'},
+        ])
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data[0], {})
+        self.assertIn('mark', response.data[2])
+        self.assertFalse(Mark.objects.filter(completed_homework=self.completed_1).exists())
+        response = self.grade(self.teacher_user_1, [
+            {'completed_homework': self.completed_1.id, 'mark': 9},
+            {'completed_homework': 100500, 'mark': 7},
+        ])
+        self.assertEqual(response.data[0], {})
+        self.assertIn('completed_homework', response.data[1])
+
+    def test_bulk_marks_forbidden_for_student(self):
+        response = self.grade(self.student_user_1, [{'completed_homework': self.completed_1.id, 'mark': 10}])
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class TestTokenAuthentication(ClassroomTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super(TestTokenAuthentication, cls).setUpClass()
+        cls.student_user_1 = User.objects._create_user(**TEST_STUDENT_1)
+
+    def test_warm_token_costs_no_queries(self):
+        key, token = AuthToken.issue(self.student_user_1)
+        self.assertNotEqual(token.digest, key)
+        self.client.credentials(HTTP_AUTHORIZATION='Token {}'.format(key))
+        with self.assertNumQueries(2):
+            self.client.get(reverse('users'))
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('users'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_shared_cache_entries_keep_their_expiry(self):
+        key, token = AuthToken.issue(self.student_user_1)
+        with self.settings(TOKEN_CACHE='default'):
+            cache_user(token.digest, self.student_user_1, timezone.now() + timedelta(seconds=2))
+            token_cache.clear()
+            user = cached_user(token.digest)
+        self.assertEqual(user.pk, self.student_user_1.pk)
+        self.assertNotIn('password', user.__dict__)
+        expires, state = token_cache._entries[token.digest]
+        self.assertLessEqual(expires - time.monotonic(), 2)
+        self.assertNotIn('password', state)
+
+    def test_logout_invalidates_cached_token(self):
+        response = self.client.post(reverse('login'), {'username': 'student1', 'password': 'student1'})
+        self.client.credentials(HTTP_AUTHORIZATION='Token {}'.format(response.data['token']))
+        self.assertEqual(self.client.get(reverse('users')).status_code, status.HTTP_200_OK)
+        self.assertEqual(self.client.get(reverse('logout')).status_code, status.HTTP_200_OK)
+        self.assertEqual(self.client.get(reverse('users')).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_tokens_are_issued_per_device(self):
+        login = {'username': 'student1', 'password': 'student1'}
+        phone = self.client.post(reverse('login'), dict(login, device='phone')).data['token']
+        laptop = self.client.post(reverse('login'), dict(login, device='laptop')).data['token']
+        self.client.post(reverse('login'), dict(login, device='phone'))
+        self.assertEqual(AuthToken.objects.filter(user=self.student_user_1).count(), 2)
+        self.client.credentials(HTTP_AUTHORIZATION='Token {}'.format(phone))
+        self.assertEqual(self.client.get(reverse('users')).status_code, status.HTTP_401_UNAUTHORIZED)
+        self.client.credentials(HTTP_AUTHORIZATION='Token {}'.format(laptop))
+        self.assertEqual(self.client.get(reverse('users')).status_code, status.HTTP_200_OK)
+
+    def test_expired_token_is_rejected(self):
+        key, token = AuthToken.issue(self.student_user_1)
+        AuthToken.objects.filter(id=token.id).update(expires=timezone.now())
+        self.client.credentials(HTTP_AUTHORIZATION='Token {}'.format(key))
+        self.assertEqual(self.client.get(reverse('users')).status_code, status.HTTP_401_UNAUTHORIZED)
+        call_command('purge_tokens', stdout=StringIO())
+        self.assertFalse(AuthToken.objects.exists())
+
+    def test_async_login(self):
+        response = self.client.post(reverse('login-async'), {'username': 'student1', 'password': 'student1',
+                                                             'device': 'phone'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(AuthToken.objects.get(user=self.student_user_1).device, 'phone')
+        self.client.credentials(HTTP_AUTHORIZATION='Token {}'.format(response.json()['token']))
+        self.assertEqual(self.client.get(reverse('users')).status_code, status.HTTP_200_OK)
+
+    def test_async_login_with_wrong_password(self):
+        response = self.client.post(reverse('login-async'), {'username': 'student1', 'password': 'wrong'},
+                                    format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.post(reverse('login-async'), {'username': 'nobody', 'password': 'wrong'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_async_login_rejects_malformed_bodies(self):
+        for data in ([], 'student1', 1, {'username': ['student1'], 'password': 'student1'},
+                     {'username': 'student1', 'password': 12345}):
+            response = self.client.post(reverse('login-async'), data, format='json')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, data)
+
+
+class TestDashboard(ClassroomTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super(TestDashboard, cls).setUpClass()
+        cls.teacher_user_1 = User.objects._create_user(**TEST_TEACHER_1)
+        cls.student_user_1 = User.objects._create_user(**TEST_STUDENT_1)
+        cls.student_user_2 = User.objects._create_user(**TEST_STUDENT_2)
+        cls.test_course = Course.objects.create(**TEST_COURSE, creator=cls.teacher_user_1)
+        cls.test_course.teacher.add(cls.teacher_user_1)
+        cls.test_course.student.add(cls.student_user_1, cls.student_user_2)
+        cls.other_course = Course.objects.create(title='Other course', description='Other', creator=cls.teacher_user_1)
+        cls.other_course.student.add(cls.student_user_2)
+        cls.test_lecture = Lecture.objects.create(title='Test Lecture', course=cls.test_course,
+                                                  creator=cls.teacher_user_1)
+        cls.test_hometask = Hometask.objects.create(**TEST_HOMETASK, lecture=cls.test_lecture,
+                                                    creator=cls.teacher_user_1)
+        cls.pending_hometask = Hometask.objects.create(title='Pending', description='Pending', lecture=cls.test_lecture,
+                                                       creator=cls.teacher_user_1)
+        other_lecture = Lecture.objects.create(title='Other Lecture', course=cls.other_course,
+                                               creator=cls.teacher_user_1)
+        Hometask.objects.create(title='Other', description='Other', lecture=other_lecture, creator=cls.teacher_user_1)
+        cls.test_completed = CompletedHomework.objects.create(hometask=cls.test_hometask, creator=cls.student_user_1,
+                                                              link='http://example.com/student1')
+
+    def dashboard(self, user):
+        self.client.force_authenticate(user=user)
+        response = self.client.get(reverse('dashboard'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def test_dashboard_lists_courses_pending_hometasks_and_submissions(self):
+        data = self.dashboard(self.student_user_1)
+        self.assertEqual(data['courses'], [
+            {'id': self.test_course.id, 'title': 'Test_course', 'is_teacher': False, 'is_student': True},
+        ])
+        self.assertEqual([hometask['id'] for hometask in data['pending_hometasks']], [self.pending_hometask.id])
+        self.assertEqual(data['pending_hometasks'][0]['lecture_title'], 'Test Lecture')
+        self.assertEqual(data['submissions'], [{
+            'id': self.test_completed.id, 'hometask': self.test_hometask.id, 'hometask_title': 'Test_hometask',
+            'course': self.test_course.id, 'link': 'http://example.com/student1', 'mark': None,
+        }])
+
+    def test_teacher_dashboard_has_no_student_work(self):
+        data = self.dashboard(self.teacher_user_1)
+        self.assertEqual(data['courses'], [
+            {'id': self.test_course.id, 'title': 'Test_course', 'is_teacher': True, 'is_student': False},
+        ])
+        self.assertEqual(data['pending_hometasks'], [])
+        self.assertEqual(data['submissions'], [])
+
+    def test_query_count_does_not_grow_with_courses(self):
+        self.dashboard(self.student_user_2)
+        for cache in caches.all():
+            cache.clear()
+        self.client.force_authenticate(user=self.student_user_2)
+        with self.assertNumQueries(4):
+            data = self.client.get(reverse('dashboard')).data
+        self.assertEqual(len(data['courses']), 2)
+        self.assertEqual(len(data['pending_hometasks']), 3)
+        with self.assertNumQueries(0):
+            self.client.get(reverse('dashboard'))
+
+    def test_new_mark_invalidates_dashboard(self):
+        self.dashboard(self.student_user_1)
+        mark = Mark.objects.create(completed_homework=CompletedHomework.objects.get(pk=self.test_completed.pk),
+                                   creator=self.teacher_user_1, mark=7)
+        self.assertEqual(self.dashboard(self.student_user_1)['submissions'][0]['mark'], {'id': mark.id, 'mark': 7})
+        self.client.force_authenticate(user=self.teacher_user_1)
+        response = self.client.post(reverse('hometask-marks', kwargs={'hometasks_pk': self.test_hometask.id}),
+                                    data=[{'completed_homework': self.test_completed.id, 'mark': 9}], format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.dashboard(self.student_user_1)['submissions'][0]['mark'], {'id': mark.id, 'mark': 9})
+
+    def test_new_hometask_and_submission_invalidate_dashboard(self):
+        self.assertEqual(len(self.dashboard(self.student_user_1)['pending_hometasks']), 1)
+        Hometask.objects.create(title='New', description='New', lecture=self.test_lecture, creator=self.teacher_user_1)
+        self.assertEqual(len(self.dashboard(self.student_user_1)['pending_hometasks']), 2)
+        CompletedHomework.objects.create(hometask=self.pending_hometask, creator=self.student_user_1,
+                                         link='http://example.com/pending')
+        data = self.dashboard(self.student_user_1)
+        self.assertEqual(len(data['pending_hometasks']), 1)
+        self.assertEqual(len(data['submissions']), 2)
+
+    def test_hometask_signals_look_up_the_course_without_joins(self):
+        hometask = Hometask.objects.get(pk=self.pending_hometask.pk)
+        with CaptureQueriesContext(connection) as queries:
+            hometask.save()
+        lookups = [query['sql'] for query in queries.captured_queries if query['sql'].startswith('SELECT')]
+        self.assertEqual(len(lookups), 1)
+        self.assertNotIn('JOIN', lookups[0])
+        hometask = Hometask(title='New', description='New', lecture=self.test_lecture, creator=self.teacher_user_1)
+        with CaptureQueriesContext(connection) as queries:
+            hometask.save()
+        self.assertFalse([query for query in queries.captured_queries
+                          if query['sql'].startswith('SELECT') and 'classroom_lecture' in query['sql']])
+
+    def test_enrollment_invalidates_dashboard(self):
+        self.assertEqual(len(self.dashboard(self.student_user_1)['courses']), 1)
+        self.other_course.student.add(self.student_user_1)
+        self.assertEqual(len(self.dashboard(self.student_user_1)['courses']), 2)
+
+
+class TestGradingQueue(ClassroomTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super(TestGradingQueue, cls).setUpClass()
+        cls.teacher_user_1 = User.objects._create_user(**TEST_TEACHER_1)
+        cls.teacher_user_2 = User.objects._create_user(**TEST_TEACHER_2)
+        cls.student_user_1 = User.objects._create_user(**TEST_STUDENT_1)
+        cls.student_user_2 = User.objects._create_user(**TEST_STUDENT_2)
+        cls.test_course = Course.objects.create(**TEST_COURSE, creator=cls.teacher_user_1)
+        cls.test_course.teacher.add(cls.teacher_user_1)
+        cls.other_course = Course.objects.create(title='Other course', description='Other', creator=cls.teacher_user_2)
+        cls.other_course.teacher.add(cls.teacher_user_2)
+        lecture = Lecture.objects.create(title='Test Lecture', course=cls.test_course, creator=cls.teacher_user_1)
+        cls.test_hometask = Hometask.objects.create(**TEST_HOMETASK, lecture=lecture, creator=cls.teacher_user_1)
+        other_lecture = Lecture.objects.create(title='Other Lecture', course=cls.other_course,
+                                               creator=cls.teacher_user_2)
+        other_hometask = Hometask.objects.create(title='Other', description='Other', lecture=other_lecture,
+                                                 creator=cls.teacher_user_2)
+        cls.late = CompletedHomework.objects.create(hometask=cls.test_hometask, creator=cls.student_user_1,
+                                                    link='http://example.com/late')
+        cls.early = CompletedHomework.objects.create(hometask=cls.test_hometask, creator=cls.student_user_2,
+                                                     link='http://example.com/early')
+        CompletedHomework.objects.filter(pk=cls.early.pk).update(
+            submitted_at=cls.late.submitted_at - timedelta(hours=1))
+        CompletedHomework.objects.create(hometask=other_hometask, creator=cls.student_user_1,
+                                         link='http://example.com/other')
+
+    def queue(self, user, **params):
+        self.client.force_authenticate(user=user)
+        response = self.client.get(reverse('grading-queue'), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [submission['id'] for submission in response.data['results']]
+
+    def test_queue_lists_ungraded_submissions_of_taught_courses_oldest_first(self):
+        self.client.force_authenticate(user=self.teacher_user_1)
+        response = self.client.get(reverse('grading-queue'))
+        self.assertEqual([submission['id'] for submission in response.data['results']], [self.early.id, self.late.id])
+        self.assertEqual(response.data['results'][0]['hometask_title'], 'Test_hometask')
+        self.assertEqual(response.data['results'][0]['course'], self.test_course.id)
+
+    def test_queue_is_empty_for_students(self):
+        self.assertEqual(self.queue(self.student_user_1), [])
+
+    def test_queue_filters_by_course(self):
+        self.assertEqual(self.queue(self.teacher_user_1, course=self.test_course.id), [self.early.id, self.late.id])
+        self.assertEqual(self.queue(self.teacher_user_1, course=self.other_course.id), [])
+        self.client.force_authenticate(user=self.teacher_user_1)
+        response = self.client.get(reverse('grading-queue'), {'course': 'abc'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_graded_submissions_leave_the_queue(self):
+        self.client.force_authenticate(user=self.teacher_user_1)
+        response = self.client.post(reverse('marks', kwargs={'pk': self.early.id}), data={'mark': 8})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.queue(self.teacher_user_1), [self.late.id])
+        Mark.objects.get(completed_homework=self.early.id).delete()
+        self.assertEqual(self.queue(self.teacher_user_1), [self.early.id, self.late.id])
+
+    def test_migrated_submissions_page_without_skipping(self):
+        CompletedHomework.objects.update(submitted_at=self.late.submitted_at)
+        import_module('classroom.migrations.0006_grading_queue').spread_submission_times(apps, None)
+        self.client.force_authenticate(user=self.teacher_user_1)
+        response = self.client.get(reverse('grading-queue'), {'page_size': 1})
+        self.assertEqual([submission['id'] for submission in response.data['results']], [self.late.id])
+        Mark.objects.create(completed_homework=self.late, creator=self.teacher_user_1, mark=5)
+        response = self.client.get(response.data['next'])
+        self.assertEqual([submission['id'] for submission in response.data['results']], [self.early.id])
+
+    def test_bulk_marks_maintain_is_graded(self):
+        self.client.force_authenticate(user=self.teacher_user_1)
+        response = self.client.post(reverse('hometask-marks', kwargs={'hometasks_pk': self.test_hometask.id}),
+                                    data=[{'completed_homework': self.early.id, 'mark': 7},
+                                          {'completed_homework': self.late.id, 'mark': 9}], format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.queue(self.teacher_user_1), [])
+        self.assertEqual(CompletedHomework.objects.filter(hometask=self.test_hometask, is_graded=True).count(), 2)
+
+
+class TestCourseStatistics(ClassroomTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super(TestCourseStatistics, cls).setUpClass()
+        cls.teacher_user_1 = User.objects._create_user(**TEST_TEACHER_1)
+        cls.student_user_1 = User.objects._create_user(**TEST_STUDENT_1)
+        cls.student_user_2 = User.objects._create_user(**TEST_STUDENT_2)
+
+    def setUp(self):
+        self.test_course = Course.objects.create(**TEST_COURSE, creator=self.teacher_user_1)
+        self.test_course.teacher.add(self.teacher_user_1)
+        self.test_course.student.add(self.student_user_1, self.student_user_2)
+        self.test_lecture = Lecture.objects.create(title='Test Lecture', course=self.test_course,
+                                                   creator=self.teacher_user_1)
+        self.test_hometask = Hometask.objects.create(**TEST_HOMETASK, lecture=self.test_lecture,
+                                                     creator=self.teacher_user_1)
+        self.other_hometask = Hometask.objects.create(title='Other', description='Other', lecture=self.test_lecture,
+                                                      creator=self.teacher_user_1)
+        self.submission_1 = CompletedHomework.objects.create(hometask=self.test_hometask, creator=self.student_user_1)
+        self.submission_2 = CompletedHomework.objects.create(hometask=self.test_hometask, creator=self.student_user_2)
+        self.mark_1 = Mark.objects.create(completed_homework=self.submission_1, creator=self.teacher_user_1, mark=8)
+        self.mark_2 = Mark.objects.create(completed_homework=self.submission_2, creator=self.teacher_user_1, mark=6)
+
+    def assertMatchesRebuild(self):
+        incremental = course_statistics(self.test_course.id)
+        rebuild_statistics()
+        self.assertEqual(incremental, course_statistics(self.test_course.id))
+        return incremental
+
+    def test_statistics_endpoint(self):
+        self.client.force_authenticate(user=self.teacher_user_1)
+        response = self.client.get(reverse('course-statistics', kwargs={'pk': self.test_course.id}))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['students'], 2)
+        self.assertEqual(response.data['teachers'], 1)
+        self.assertEqual(response.data['lectures'], 1)
+        self.assertEqual(response.data['hometasks'], 2)
+        self.assertEqual(response.data['submissions'], 2)
+        self.assertEqual(response.data['average_mark'], 7)
+        self.assertEqual(response.data['mark_distribution'], {'6': 1, '8': 1})
+        hometask = response.data['hometask_statistics'][0]
+        self.assertEqual((hometask['id'], hometask['submission_rate'], hometask['marks']),
+                         (self.test_hometask.id, 1, 2))
+        self.assertEqual(response.data['hometask_statistics'][1]['submission_rate'], 0)
+
+    def test_statistics_forbidden_for_student(self):
+        self.client.force_authenticate(user=self.student_user_1)
+        response = self.client.get(reverse('course-statistics', kwargs={'pk': self.test_course.id}))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_reads_do_not_aggregate_submissions(self):
+        with self.assertNumQueries(3):
+            course_statistics(self.test_course.id)
+
+    def test_changes_are_applied_incrementally(self):
+        self.mark_1.mark = 10
+        self.mark_1.save()
+        self.mark_2.delete()
+        CompletedHomework.objects.create(hometask=self.other_hometask, creator=self.student_user_1)
+        self.test_course.student.remove(self.student_user_2)
+        Lecture.objects.create(title='Second Lecture', course=self.test_course, creator=self.teacher_user_1)
+        statistics = self.assertMatchesRebuild()
+        self.assertEqual(statistics['students'], 1)
+        self.assertEqual(statistics['lectures'], 2)
+        self.assertEqual(statistics['submissions'], 3)
+        self.assertEqual(statistics['mark_distribution'], {'10': 1})
+
+    def test_deletes_are_applied_incrementally(self):
+        self.submission_1.delete()
+        self.other_hometask.delete()
+        self.student_user_1.students.clear()
+        statistics = self.assertMatchesRebuild()
+        self.assertEqual((statistics['students'], statistics['hometasks'], statistics['marks']), (1, 1, 1))
+
+    def test_bulk_marks_update_statistics(self):
+        self.client.force_authenticate(user=self.teacher_user_1)
+        response = self.client.post(reverse('hometask-marks', kwargs={'hometasks_pk': self.test_hometask.id}),
+                                    data=[{'completed_homework': self.submission_1.id, 'mark': 5},
+                                          {'completed_homework': self.submission_2.id, 'mark': 5}], format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        statistics = self.assertMatchesRebuild()
+        self.assertEqual(statistics['mark_distribution'], {'5': 2})
+
+    def test_missing_rows_are_rebuilt(self):
+        CourseStatistics.objects.all().delete()
+        HometaskStatistics.objects.all().delete()
+        MarkDistribution.objects.all().delete()
+        CompletedHomework.objects.create(hometask=self.other_hometask, creator=self.student_user_1)
+        self.assertEqual(course_statistics(self.test_course.id)['submissions'], 3)
+
+    def test_rebuild_command(self):
+        CourseStatistics.objects.all().delete()
+        out = StringIO()
+        call_command('rebuild_statistics', course=[self.test_course.id], stdout=out)
+        self.assertIn('Rebuilt statistics of 1 courses and 2 hometasks.', out.getvalue())
+        self.assertEqual(course_statistics(self.test_course.id)['students'], 2)
+
+    def test_migration_fills_statistics(self):
+        expected = course_statistics(self.test_course.id)
+        CourseStatistics.objects.all().delete()
+        HometaskStatistics.objects.all().delete()
+        MarkDistribution.objects.all().delete()
+        import_module('classroom.migrations.0007_course_statistics').fill_statistics(apps, None)
+        with self.assertNumQueries(3):
+            self.assertEqual(course_statistics(self.test_course.id), expected)
+
+
+class TestResponseCache(ClassroomTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super(TestResponseCache, cls).setUpClass()
+        cls.teacher_user_1 = User.objects._create_user(**TEST_TEACHER_1)
+        cls.student_user_1 = User.objects._create_user(**TEST_STUDENT_1)
+        cls.student_user_2 = User.objects._create_user(**TEST_STUDENT_2)
+        cls.outsider = User.objects._create_user(**TEST_USER)
+        cls.test_course = Course.objects.create(**TEST_COURSE, creator=cls.teacher_user_1)
+        cls.test_course.teacher.add(cls.teacher_user_1)
+        cls.test_course.student.add(cls.student_user_1, cls.student_user_2)
+        cls.test_lecture = Lecture.objects.create(title='Test Lecture', course=cls.test_course,
+                                                  creator=cls.teacher_user_1)
+        cls.test_hometask = Hometask.objects.create(**TEST_HOMETASK, lecture=cls.test_lecture,
+                                                    creator=cls.teacher_user_1)
+
+    def get(self, user, name, **kwargs):
+        self.client.force_authenticate(user=user)
+        return self.client.get(reverse(name, kwargs=kwargs))
+
+    def test_repeated_reads_skip_the_database(self):
+        first = self.get(self.student_user_1, 'detailed-course', pk=self.test_course.id)
+        with self.assertNumQueries(0):
+            second = self.get(self.student_user_1, 'detailed-course', pk=self.test_course.id)
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(second['ETag'], first['ETag'])
+
+    def test_entries_are_shared_by_role(self):
+        self.get(self.student_user_1, 'course-lectures', course_pk=self.test_course.id)
+        with self.assertNumQueries(1):
+            response = self.get(self.student_user_2, 'course-lectures', course_pk=self.test_course.id)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        with self.assertNumQueries(3):
+            self.get(self.teacher_user_1, 'course-lectures', course_pk=self.test_course.id)
+
+    def test_non_members_are_not_served_from_cache(self):
+        self.get(self.student_user_1, 'detailed-course', pk=self.test_course.id)
+        response = self.get(self.outsider, 'detailed-course', pk=self.test_course.id)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_if_none_match_returns_not_modified(self):
+        etag = self.get(self.student_user_1, 'lecture-hometask', lecture_pk=self.test_lecture.id)['ETag']
+        for _ in range(2):
+            response = self.client.get(reverse('lecture-hometask', kwargs={'lecture_pk': self.test_lecture.id}),
+                                       HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+            self.assertEqual(response.content, b'')
+            self.assertEqual(response['ETag'], etag)
+            caches['default'].clear()
+
+    def test_writes_invalidate_cached_responses(self):
+        kwargs = {'lecture_pk': self.test_lecture.id, 'pk': self.test_hometask.id}
+        courses = self.get(self.student_user_1, 'course')
+        detail = self.get(self.student_user_1, 'detailed-course', pk=self.test_course.id)
+        lectures = self.get(self.student_user_1, 'course-lectures', course_pk=self.test_course.id)
+        hometask = self.get(self.student_user_1, 'detailed-hometask', **kwargs)
+        Course.objects.create(title='Second course', description='Second', creator=self.teacher_user_1)
+        self.assertNotEqual(self.get(self.student_user_1, 'course')['ETag'], courses['ETag'])
+        self.test_course.student.remove(self.student_user_2)
+        self.assertNotEqual(self.get(self.student_user_1, 'detailed-course', pk=self.test_course.id)['ETag'],
+                            detail['ETag'])
+        Lecture.objects.create(title='Second Lecture', course=self.test_course, creator=self.teacher_user_1)
+        response = self.get(self.student_user_1, 'course-lectures', course_pk=self.test_course.id)
+        self.assertEqual(len(response.data['results']), 2)
+        self.assertNotEqual(response['ETag'], lectures['ETag'])
+        CompletedHomework.objects.create(hometask=self.test_hometask, creator=self.student_user_1,
+                                         link='http://example.com')
+        response = self.get(self.student_user_1, 'detailed-hometask', **kwargs)
+        self.assertEqual(len(response.data['completed_homework']), 1)
+        self.assertNotEqual(response['ETag'], hometask['ETag'])
+
+
+class TestConditionalRequests(ClassroomTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super(TestConditionalRequests, cls).setUpClass()
+        cls.teacher_user_1 = User.objects._create_user(**TEST_TEACHER_1)
+        cls.student_user_1 = User.objects._create_user(**TEST_STUDENT_1)
+        cls.student_user_2 = User.objects._create_user(**TEST_STUDENT_2)
+        cls.test_course = Course.objects.create(**TEST_COURSE, creator=cls.teacher_user_1)
+        cls.test_course.teacher.add(cls.teacher_user_1)
+        cls.test_course.student.add(cls.student_user_1, cls.student_user_2)
+        cls.test_lecture = Lecture.objects.create(title='Test Lecture', course=cls.test_course,
+                                                  creator=cls.teacher_user_1)
+        cls.test_hometask = Hometask.objects.create(**TEST_HOMETASK, lecture=cls.test_lecture,
+                                                    creator=cls.teacher_user_1)
+        cls.test_completed = CompletedHomework.objects.create(hometask=cls.test_hometask, creator=cls.student_user_1,
+                                                              link='http://example.com')
+        cls.test_mark = Mark.objects.create(completed_homework=cls.test_completed, creator=cls.teacher_user_1, mark=4)
+        cls.test_comment = Comment.objects.create(mark=cls.test_mark, creator=cls.teacher_user_1,
+                                                  comment_text='Good job')
+
+    def get(self, name, user=None, **headers):
+        self.client.force_authenticate(user=user or self.student_user_1)
+        return self.client.get(reverse(name, kwargs=self.kwargs[name]), **headers)
+
+    @property
+    def kwargs(self):
+        return {
+            'detailed-course': {'pk': self.test_course.id},
+            'hometask-completed': {'hometasks_pk': self.test_hometask.id},
+            'marks': {'pk': self.test_completed.id},
+            'comments': {'mark_pk': self.test_mark.id},
+            'detailed-comment': {'mark_pk': self.test_mark.id, 'pk': self.test_comment.id},
+        }
+
+    def test_if_none_match_skips_rendering(self):
+        response = self.get('hometask-completed')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response['ETag'].startswith('W/'))
+        with CaptureQueriesContext(connection) as rendered:
+            self.get('hometask-completed')
+        with CaptureQueriesContext(connection) as revalidated:
+            cached = self.get('hometask-completed', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(cached.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(cached.content, b'')
+        self.assertEqual(cached['ETag'], response['ETag'])
+        self.assertLess(len(revalidated), len(rendered))
+
+    def test_if_modified_since_returns_not_modified(self):
+        response = self.get('marks')
+        cached = self.get('marks', HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(cached.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(cached['Last-Modified'], response['Last-Modified'])
+
+    def test_validators_depend_on_the_user(self):
+        etag = self.get('hometask-completed')['ETag']
+        response = self.get('hometask-completed', user=self.teacher_user_1, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_child_writes_move_parent_validators(self):
+        comments = self.get('comments')['ETag']
+        Comment.objects.create(mark=self.test_mark, creator=self.teacher_user_1, comment_text='Well done')
+        response = self.get('comments', HTTP_IF_NONE_MATCH=comments)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 2)
+        marks = self.get('marks')['ETag']
+        self.test_mark.mark = 5
+        self.test_mark.save()
+        self.assertEqual(self.get('marks', HTTP_IF_NONE_MATCH=marks).status_code, status.HTTP_200_OK)
+        completed = self.get('hometask-completed')['ETag']
+        CompletedHomework.objects.create(hometask=self.test_hometask, creator=self.teacher_user_1,
+                                         link='http://example.org')
+        self.assertEqual(self.get('hometask-completed', HTTP_IF_NONE_MATCH=completed).status_code,
+                         status.HTTP_200_OK)
+
+    def test_cached_responses_carry_last_modified(self):
+        response = self.get('detailed-course')
+        with self.assertNumQueries(0):
+            cached = self.get('detailed-course', HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(cached.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(cached['Last-Modified'], response['Last-Modified'])
+        self.assertEqual(cached['ETag'], response['ETag'])
+
+    def test_membership_changes_touch_the_course(self):
+        updated_at = Course.objects.get(pk=self.test_course.id).updated_at
+        self.test_course.student.add(self.teacher_user_1)
+        self.assertGreater(Course.objects.get(pk=self.test_course.id).updated_at, updated_at)
+
+    def test_grading_moves_the_submission_list_validators(self):
+        completed = self.get('hometask-completed', user=self.teacher_user_1)['ETag']
+        self.test_mark.delete()
+        response = self.get('hometask-completed', user=self.teacher_user_1, HTTP_IF_NONE_MATCH=completed)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(response.data['results'][0]['is_graded'])
+        self.client.force_authenticate(user=self.teacher_user_1)
+        self.client.post(reverse('hometask-marks', kwargs={'hometasks_pk': self.test_hometask.id}),
+                         [{'completed_homework': self.test_completed.id, 'mark': 5}], format='json')
+        response = self.get('hometask-completed', user=self.teacher_user_1, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.data['results'][0]['is_graded'])
+
+    def test_detail_validators_require_object_permissions(self):
+        last_modified = self.get('detailed-comment')['Last-Modified']
+        response = self.get('detailed-comment', user=self.student_user_2, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        completed = CompletedHomework.objects.create(hometask=self.test_hometask, creator=self.student_user_2,
+                                                     link='http://example.org')
+        other = Mark.objects.create(completed_homework=completed, creator=self.teacher_user_1, mark=3)
+        kwargs = {'mark_pk': other.id, 'pk': self.test_comment.id}
+        response = self.client.get(reverse('detailed-comment', kwargs=kwargs), HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,90 @@
+import os
+import re
+import shutil
+import tempfile
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+from rest_framework.exceptions import ValidationError
+
+CONTENT_RANGE = re.compile(r'^bytes (\d+)-(\d+)/(\d+)$')
+UPLOAD_DIR = 'uploads'
+READ_SIZE = 64 * 1024
+
+
+class UploadedPart(File):
+    def temporary_file_path(self):
+        return self.file.name
+
+
+def part_path(upload):
+    return os.path.join(settings.MEDIA_ROOT, UPLOAD_DIR, '{}.part'.format(upload.id))
+
+
+def parse_content_range(header, upload):
+    match = CONTENT_RANGE.match(header or '')
+    if match is None:
+        raise ValidationError({'content_range': 'Send chunks with a "Content-Range: bytes start-end/size" header.'})
+    start, end, size = (int(value) for value in match.groups())
+    if size != upload.size or start > end or end >= size:
+        raise ValidationError({'content_range': 'Range does not fit an upload of {} bytes.'.format(upload.size)})
+    if end - start + 1 > settings.PRESENTATION_CHUNK_MAX_SIZE:
+        raise ValidationError({'content_range': 'Chunks are limited to {} bytes.'.format(
+            settings.PRESENTATION_CHUNK_MAX_SIZE)})
+    return start, end
+
+
+def receive_chunk(upload, stream, length):
+    directory = os.path.dirname(part_path(upload))
+    os.makedirs(directory, exist_ok=True)
+    fd, path = tempfile.mkstemp(dir=directory, prefix='{}-'.format(upload.id), suffix='.chunk')
+    try:
+        with os.fdopen(fd, 'wb') as chunk:
+            remaining = length
+            while remaining:
+                data = stream.read(min(READ_SIZE, remaining))
+                if not data:
+                    raise ValidationError({'content_range': 'Chunk is shorter than its Content-Range.'})
+                chunk.write(data)
+                remaining -= len(data)
+    except BaseException:
+        os.remove(path)
+        raise
+    return path
+
+
+def write_chunk(upload, chunk_path, start, length):
+    path = part_path(upload)
+    with open(path, 'r+b' if os.path.exists(path) else 'wb') as part, open(chunk_path, 'rb') as chunk:
+        part.seek(start)
+        shutil.copyfileobj(chunk, part, READ_SIZE)
+        part.truncate(start + length)
+
+
+def store_part(upload):
+    lecture = upload.lecture
+    field = lecture.presentation.field
+    with open(part_path(upload), 'rb') as part:
+        return field.storage.save(field.generate_filename(lecture, upload.filename), UploadedPart(part),
+                                  max_length=field.max_length)
+
+
+def attach_presentation(upload, name):
+    lecture = upload.lecture
+    path = part_path(upload)
+    with transaction.atomic():
+        lecture.presentation = name
+        lecture.save(update_fields=['presentation', 'updated_at'])
+        upload.delete()
+    remove_part(path)
+
+
+def remove_part(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def discard_part(upload):
+    remove_part(part_path(upload))
@@ -1,24 +1,41 @@
-from django.urls import path
-from .views import UserRegistrationView, UserView, LoginView, LogoutView, CourseView, SingleCourseView, LectureView, \
-    LectureDetailView, HometaskView, HometaskDetailView, CompletedHomeworkView, CompletedHomeworkDetailView, MarkView, \
-    MarkDetailView, CommentView, CommentDetailView
-
-urlpatterns = [
-    path('register', UserRegistrationView.as_view(), name='register'),
-    path('users', UserView.as_view(), name='users'),
-    path('login', LoginView.as_view(), name='login'),
-    path('logout', LogoutView.as_view(), name='logout'),
-    path('course', CourseView.as_view(), name='course'),
-    path('course/<int:pk>', SingleCourseView.as_view(), name='detailed-course'),
-    path('course/<int:course_pk>/lectures', LectureView.as_view(), name='course-lectures'),
-    path('course/<int:course_pk>/lectures/<int:pk>', LectureDetailView.as_view(), name='detailed-course-lecture'),
-    path('lectures/<int:lecture_pk>/hometasks', HometaskView.as_view(), name='lecture-hometask'),
-    path('lectures/<int:lecture_pk>/hometasks/<int:pk>', HometaskDetailView.as_view(), name='detailed-hometask'),
-    path('hometasks/<int:hometasks_pk>/completed', CompletedHomeworkView.as_view(), name='hometask-completed'),
-    path('hometasks/<int:hometasks_pk>/completed/<int:pk>', CompletedHomeworkDetailView.as_view(),
-         name='detailed-hometask-completed'),
-    path('completed/<int:pk>/mark', MarkView.as_view(), name='marks'),
-    path('completed/mark/<int:pk>', MarkDetailView.as_view(), name='detailed-mark'),
-    path('completed/mark/<int:mark_pk>/comments', CommentView.as_view(), name='comments'),
-    path('completed/mark/<int:mark_pk>/comments/<int:pk>', CommentDetailView.as_view(), name='detailed-comment'),
-]
+from django.urls import path
+from . import async_views
+from .async_views import read_view
+from .views import UserRegistrationView, UserView, UserImportView, LoginView, LogoutView, DashboardView, CourseView, \
+    SingleCourseView, GradebookView, CourseStatisticsView, EnrollmentView, LectureView, LectureDetailView, \
+    LecturePresentationView, PresentationUploadView, PresentationUploadDetailView, HometaskView, HometaskDetailView, \
+    CompletedHomeworkView, CompletedHomeworkDetailView, GradingQueueView, BulkMarkView, MarkView, MarkDetailView, \
+    CommentView, CommentDetailView
+
+urlpatterns = [
+    path('register', UserRegistrationView.as_view(), name='register'),
+    path('users', UserView.as_view(), name='users'),
+    path('users/import', UserImportView.as_view(), name='users-import'),
+    path('login', LoginView.as_view(), name='login'),
+    path('login/async', async_views.login_view, name='login-async'),
+    path('logout', LogoutView.as_view(), name='logout'),
+    path('dashboard', read_view(DashboardView), name='dashboard'),
+    path('grading/queue', read_view(GradingQueueView), name='grading-queue'),
+    path('course', read_view(CourseView), name='course'),
+    path('course/<int:pk>', read_view(SingleCourseView), name='detailed-course'),
+    path('course/<int:pk>/gradebook', read_view(GradebookView), name='course-gradebook'),
+    path('course/<int:pk>/statistics', read_view(CourseStatisticsView), name='course-statistics'),
+    path('course/<int:pk>/enrollment', EnrollmentView.as_view(), name='course-enrollment'),
+    path('course/<int:course_pk>/lectures', read_view(LectureView), name='course-lectures'),
+    path('course/<int:course_pk>/lectures/<int:pk>', read_view(LectureDetailView), name='detailed-course-lecture'),
+    path('course/<int:course_pk>/lectures/<int:pk>/presentation', LecturePresentationView.as_view(),
+         name='lecture-presentation'),
+    path('lectures/<int:lecture_pk>/presentation/uploads', PresentationUploadView.as_view(),
+         name='presentation-uploads'),
+    path('presentation/uploads/<int:pk>', PresentationUploadDetailView.as_view(), name='detailed-presentation-upload'),
+    path('lectures/<int:lecture_pk>/hometasks', read_view(HometaskView), name='lecture-hometask'),
+    path('lectures/<int:lecture_pk>/hometasks/<int:pk>', read_view(HometaskDetailView), name='detailed-hometask'),
+    path('hometasks/<int:hometasks_pk>/completed', read_view(CompletedHomeworkView), name='hometask-completed'),
+    path('hometasks/<int:hometasks_pk>/completed/<int:pk>', read_view(CompletedHomeworkDetailView),
+         name='detailed-hometask-completed'),
+    path('hometasks/<int:hometasks_pk>/marks', BulkMarkView.as_view(), name='hometask-marks'),
+    path('completed/<int:pk>/mark', read_view(MarkView), name='marks'),
+    path('completed/mark/<int:pk>', read_view(MarkDetailView), name='detailed-mark'),
+    path('completed/mark/<int:mark_pk>/comments', read_view(CommentView), name='comments'),
+    path('completed/mark/<int:mark_pk>/comments/<int:pk>', read_view(CommentDetailView), name='detailed-comment'),
+]
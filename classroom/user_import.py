@@ -0,0 +1,79 @@
+import csv
+import json
+from concurrent.futures import ProcessPoolExecutor
+import django
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from .serializers import UserImportSerializer
+
+User = get_user_model()
+
+INLINE_HASHING_LIMIT = 8
+
+
+class UserImportError(Exception):
+    def __init__(self, errors):
+        super().__init__('{} rows are invalid'.format(len(errors)))
+        self.errors = errors
+
+
+def read_users(stream, file_format):
+    if file_format == 'json':
+        return json.load(stream)
+    return list(csv.DictReader(stream))
+
+
+def find_row_errors(rows, batch_size):
+    serializer = UserImportSerializer(data=rows, many=True)
+    errors = {}
+    if not serializer.is_valid():
+        errors = {row: row_errors for row, row_errors in enumerate(serializer.errors) if row_errors}
+    seen = {'username': {}, 'email': {}}
+    for row, data in enumerate(rows):
+        if row in errors:
+            continue
+        for field, values in seen.items():
+            value = str(data[field])
+            if value in values:
+                errors.setdefault(row, {})[field] = ['Duplicated in the import.']
+            values.setdefault(value, row)
+    for field, values in seen.items():
+        pending = list(values)
+        for start in range(0, len(pending), batch_size):
+            batch = pending[start:start + batch_size]
+            for value in User.objects.filter(**{field + '__in': batch}).values_list(field, flat=True):
+                errors.setdefault(values[value], {})[field] = ['{} already exists.'.format(field.capitalize())]
+    return serializer.validated_data if not errors else None, errors
+
+
+def _setup_worker():
+    django.setup()
+
+
+def hash_passwords(passwords, workers, pool=None):
+    if pool is not None:
+        return list(pool.executor.map(make_password, passwords))
+    if workers <= 1 or len(passwords) <= INLINE_HASHING_LIMIT:
+        return [make_password(password) for password in passwords]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_setup_worker) as pool:
+        return list(pool.map(make_password, passwords, chunksize=max(1, len(passwords) // (workers * 4))))
+
+
+def import_users(rows, course=None, role='student', workers=1, batch_size=1000, pool=None):
+    validated, errors = find_row_errors(rows, batch_size)
+    if errors:
+        raise UserImportError([{'row': row, 'errors': errors[row]} for row in sorted(errors)])
+    passwords = hash_passwords([data['password'] for data in validated], workers, pool)
+    users = [
+        User(username=data['username'], email=data['email'], password=password,
+             first_name=data['first_name'], last_name=data['last_name'],
+             registration_role=data.get('registration_role', 'S'))
+        for data, password in zip(validated, passwords)
+    ]
+    with transaction.atomic():
+        User.objects.bulk_create(users, batch_size=batch_size)
+        if course is not None:
+            user_ids = User.objects.filter(username__in=[user.username for user in users]).values_list('id', flat=True)
+            getattr(course, role).add(*user_ids)
+    return {'created': len(users), 'enrolled': len(users) if course is not None else 0}
@@ -1,190 +1,414 @@
-from django.contrib.auth import get_user_model
-from rest_framework import status, generics
-from rest_framework.authtoken.models import Token
-from rest_framework.authtoken.views import ObtainAuthToken
-from rest_framework.generics import get_object_or_404
-from rest_framework.parsers import FileUploadParser
-from rest_framework.permissions import IsAuthenticated, AllowAny
-from rest_framework.response import Response
-from rest_framework.views import APIView
-from .models import Course, Lecture, Hometask, CompletedHomework, Mark, Comment
-from .permissions import (IsTeacherOrReadOnly, IsCourseTeacherOrIsEnrolledReadOnly, IsAbleToAddLecturesOrReadOnly,
-                          IsAbleToAddHomeworkOrReadOnly, IsAbleToUploadSolutionOrReadOnly,
-                          IsAbleToEvaluateOrEvaluatedReadOnly, IsAbleToCommentOrOwnerReadOnly)
-from .serializers import (UserRegisterSerializer, UserSerializer, CourseSerializer, CourseDetailSerializer,
-                          LectureSerializer, LectureDetailSerializer, HometaskSerializer, HometaskDetailSerializer,
-                          CompletedHomeworkSerializer, CompletedHomeworkDetailSerializer, MarkSerializer,
-                          MarkDetailSerializer, CommentSerializer, CommentDetailSerializer)
-
-
-User = get_user_model()
-
-
-class UserRegistrationView(generics.CreateAPIView):
-    permission_classes = (AllowAny,)
-    serializer_class = UserRegisterSerializer
-
-
-class UserView(generics.ListAPIView):
-    permission_classes = (IsAuthenticated,)
-    serializer_class = UserSerializer
-    queryset = User.objects.all()
-
-
-class LoginView(ObtainAuthToken):
-    permission_classes = (AllowAny,)
-
-    def post(self, request, *args, **kwargs):
-        serializer = self.serializer_class(data=request.data, context={'request': request})
-        serializer.is_valid(raise_exception=True)
-        username = serializer.validated_data['username']
-        user = User.objects.get(username=username)
-        token, created = Token.objects.get_or_create(user=user)
-        return Response(
-            data={'token': token.key, 'user_id': user.pk, 'username': user.username},
-            status=status.HTTP_200_OK,
-        )
-
-
-class LogoutView(APIView):
-    permission_classes = (IsAuthenticated,)
-
-    def get(self, request):
-        request.user.auth_token.delete()
-        return Response(status=status.HTTP_200_OK)
-
-
-class CourseView(generics.ListCreateAPIView):
-    queryset = Course.objects.all()
-    serializer_class = CourseSerializer
-    permission_classes = (IsAuthenticated, IsTeacherOrReadOnly,)
-
-    def perform_create(self, serializer):
-        creator = get_object_or_404(User, id=self.request.user.id)
-        return serializer.save(creator=creator, teacher=(creator,))
-
-
-class SingleCourseView(generics.RetrieveUpdateDestroyAPIView):
-    serializer_class = CourseDetailSerializer
-    permission_classes = (IsAuthenticated, IsCourseTeacherOrIsEnrolledReadOnly,)
-
-    def get_queryset(self):
-        queryset = Course.objects.filter(id=self.kwargs['pk'])
-        return queryset
-
-
-class LectureView(generics.ListCreateAPIView):
-    parser_class = (FileUploadParser,)
-    serializer_class = LectureSerializer
-    permission_classes = (IsAuthenticated, IsAbleToAddLecturesOrReadOnly,)
-
-    def get_queryset(self):
-        queryset = Lecture.objects.filter(course=self.kwargs['course_pk'])
-        return queryset
-
-    def perform_create(self, serializer):
-        course = Course.objects.get(id=self.kwargs['course_pk'])
-        return serializer.save(course=course)
-
-
-class LectureDetailView(generics.RetrieveUpdateDestroyAPIView):
-    parser_class = (FileUploadParser,)
-    serializer_class = LectureDetailSerializer
-    permission_classes = (IsAuthenticated, IsAbleToAddLecturesOrReadOnly,)
-
-    def get_queryset(self):
-        queryset = Lecture.objects.filter(course=self.kwargs['course_pk'])
-        return queryset
-
-
-class HometaskView(generics.ListCreateAPIView):
-    serializer_class = HometaskSerializer
-    permission_classes = (IsAuthenticated, IsAbleToAddHomeworkOrReadOnly,)
-
-    def get_queryset(self):
-        queryset = Hometask.objects.filter(lecture=self.kwargs['lecture_pk'])
-        return queryset
-
-    def perform_create(self, serializer):
-        lecture = Lecture.objects.get(id=self.kwargs['lecture_pk'])
-        return serializer.save(lecture=lecture)
-
-
-class HometaskDetailView(generics.RetrieveUpdateDestroyAPIView):
-    serializer_class = HometaskDetailSerializer
-    permission_classes = (IsAuthenticated, IsAbleToAddHomeworkOrReadOnly,)
-
-    def get_queryset(self):
-        queryset = Hometask.objects.filter(lecture=self.kwargs['lecture_pk'])
-        return queryset
-
-
-class CompletedHomeworkView(generics.ListCreateAPIView):
-    serializer_class = CompletedHomeworkSerializer
-    permission_classes = (IsAuthenticated, IsAbleToUploadSolutionOrReadOnly,)
-
-    def get_queryset(self):
-        user = self.request.user
-        parent_course = Course.objects.get(course_lectures__hometask=self.kwargs['hometasks_pk'])
-        if user in parent_course.teacher.all():
-            queryset = CompletedHomework.objects.filter(hometask=self.kwargs['hometasks_pk'])
-        elif user in parent_course.student.all():
-            queryset = CompletedHomework.objects.filter(hometask=self.kwargs['hometasks_pk']).filter(creator=user)
-        return queryset
-
-    def perform_create(self, serializer):
-        hometask = Hometask.objects.get(id=self.kwargs['hometasks_pk'])
-        return serializer.save(hometask=hometask)
-
-
-class CompletedHomeworkDetailView(generics.RetrieveUpdateDestroyAPIView):
-    serializer_class = CompletedHomeworkDetailSerializer
-    permission_classes = (IsAuthenticated, IsAbleToUploadSolutionOrReadOnly,)
-
-    def get_queryset(self):
-        queryset = CompletedHomework.objects.filter(hometask=self.kwargs['hometasks_pk'])
-        return queryset
-
-
-class MarkView(generics.ListCreateAPIView):
-    serializer_class = MarkSerializer
-    permission_classes = (IsAuthenticated, IsAbleToEvaluateOrEvaluatedReadOnly,)
-
-    def get_queryset(self):
-        queryset = Mark.objects.filter(completed_homework=self.kwargs['pk'])
-        return queryset
-
-    def perform_create(self, serializer):
-        completed_homework = CompletedHomework.objects.get(id=self.kwargs['pk'])
-        return serializer.save(completed_homework=completed_homework)
-
-
-class MarkDetailView(generics.RetrieveUpdateAPIView):
-    serializer_class = MarkDetailSerializer
-    permission_classes = (IsAuthenticated, IsAbleToEvaluateOrEvaluatedReadOnly)
-
-    def get_queryset(self):
-        queryset = Mark.objects.filter(id=self.kwargs['pk'])
-        return queryset
-
-
-class CommentView(generics.ListCreateAPIView):
-    serializer_class = CommentSerializer
-    permission_classes = (IsAuthenticated, IsAbleToCommentOrOwnerReadOnly,)
-
-    def get_queryset(self):
-        queryset = Comment.objects.filter(mark=self.kwargs['mark_pk'])
-        return queryset
-
-    def perform_create(self, serializer):
-        mark = Mark.objects.get(id=self.kwargs['mark_pk'])
-        return serializer.save(mark=mark)
-
-
-class CommentDetailView(generics.RetrieveAPIView):
-    serializer_class = CommentDetailSerializer
-    permission_classes = (IsAuthenticated, IsAbleToCommentOrOwnerReadOnly,)
-
-    def get_queryset(self):
-        queryset = Comment.objects.filter(id=self.kwargs['pk'])
-        return queryset
+import os
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, transaction
+from django.http import StreamingHttpResponse
+from rest_framework import status, generics
+from rest_framework.exceptions import NotFound, PermissionDenied, ValidationError
+from rest_framework.generics import get_object_or_404
+from rest_framework.parsers import JSONParser, FormParser, MultiPartParser
+from rest_framework.permissions import IsAuthenticated, AllowAny
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from .blobs import find_reusable_blob, attach_blob
+from .conditional import ConditionalGetMixin, ConditionalObjectMixin, latest_update
+from .course_statistics import course_statistics
+from .dashboard import get_dashboard
+from .downloads import serve_file
+from .gradebook import GRADEBOOK_FORMATS, gradebook_rows
+from .hashing import password_pool
+from .membership import get_course_role, get_course_roles, get_ancestry
+from .models import AuthToken, Course, Lecture, PresentationUpload, Hometask, CompletedHomework, Mark, Comment
+from .uploads import (parse_content_range, receive_chunk, write_chunk, store_part, attach_presentation,
+                      discard_part)
+from .user_import import import_users, UserImportError
+from .response_cache import CachedResponseMixin, HOMETASK_GENERATION_KEY
+from .permissions import (IsTeacherOrReadOnly, IsCourseTeacherOrIsEnrolledReadOnly, IsCourseTeacher,
+                          IsAbleToAddLecturesOrReadOnly,
+                          IsAbleToAddHomeworkOrReadOnly, IsAbleToUploadSolutionOrReadOnly, IsAbleToGradeHometask,
+                          IsAbleToEvaluateOrEvaluatedReadOnly, IsAbleToCommentOrOwnerReadOnly,
+                          IsAbleToUploadPresentation)
+from .serializers import (UserRegisterSerializer, UserSerializer, UserImportRequestSerializer, LoginSerializer,
+                          CourseSerializer, CourseDetailSerializer, EnrollmentSerializer, LectureSerializer,
+                          LectureDetailSerializer, PresentationUploadSerializer,
+                          HometaskSerializer, HometaskDetailSerializer, CompletedHomeworkSerializer,
+                          CompletedHomeworkDetailSerializer, GradingQueueSerializer, MarkSerializer,
+                          MarkDetailSerializer, BulkMarkSerializer,
+                          CommentSerializer, CommentDetailSerializer)
+
+
+User = get_user_model()
+
+
+class UserRegistrationView(generics.CreateAPIView):
+    permission_classes = (AllowAny,)
+    serializer_class = UserRegisterSerializer
+
+
+class UserView(generics.ListAPIView):
+    permission_classes = (IsAuthenticated,)
+    serializer_class = UserSerializer
+    queryset = User.objects.all()
+
+
+class UserImportView(generics.GenericAPIView):
+    serializer_class = UserImportRequestSerializer
+    permission_classes = (IsAuthenticated, IsTeacherOrReadOnly,)
+
+    def post(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        course = serializer.validated_data.get('course')
+        if course is not None and not get_course_role(request, course.id).is_teacher:
+            raise PermissionDenied('Only teachers of the course can enroll users into it.')
+        try:
+            summary = import_users(serializer.validated_data['users'], course, serializer.validated_data['role'],
+                                   pool=password_pool)
+        except UserImportError as error:
+            return Response(data={'errors': error.errors}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(data=summary, status=status.HTTP_201_CREATED)
+
+
+class LoginView(generics.GenericAPIView):
+    permission_classes = (AllowAny,)
+    serializer_class = LoginSerializer
+
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        user = serializer.validated_data['user']
+        device = serializer.validated_data['device']
+        key, token = AuthToken.login(user, device)
+        return Response(
+            data={'token': key, 'user_id': user.pk, 'username': user.username, 'expires': token.expires},
+            status=status.HTTP_200_OK,
+        )
+
+
+class LogoutView(APIView):
+    permission_classes = (IsAuthenticated,)
+
+    def get(self, request):
+        AuthToken.objects.filter(digest=request.auth).delete()
+        return Response(status=status.HTTP_200_OK)
+
+
+class CourseView(CachedResponseMixin, generics.ListCreateAPIView):
+    queryset = Course.objects.all()
+    serializer_class = CourseSerializer
+    permission_classes = (IsAuthenticated, IsTeacherOrReadOnly,)
+    course_scoped = False
+
+    def perform_create(self, serializer):
+        creator = get_object_or_404(User, id=self.request.user.id)
+        return serializer.save(creator=creator, teacher=(creator,))
+
+
+class SingleCourseView(CachedResponseMixin, generics.RetrieveUpdateDestroyAPIView):
+    serializer_class = CourseDetailSerializer
+    permission_classes = (IsAuthenticated, IsCourseTeacherOrIsEnrolledReadOnly,)
+
+    def get_cache_course_id(self):
+        return self.kwargs['pk']
+
+    def get_last_modified(self):
+        return latest_update(Course.objects.filter(pk=self.kwargs['pk']), 'updated_at')
+
+    def get_queryset(self):
+        queryset = Course.objects.filter(id=self.kwargs['pk'])
+        return self.serializer_class.setup_eager_loading(queryset)
+
+
+class GradebookView(APIView):
+    permission_classes = (IsAuthenticated, IsCourseTeacher,)
+
+    def get(self, request, pk):
+        export = request.query_params.get('export', 'csv')
+        if export not in GRADEBOOK_FORMATS:
+            raise ValidationError({'export': 'Choose one of: {}.'.format(', '.join(GRADEBOOK_FORMATS))})
+        stream, content_type = GRADEBOOK_FORMATS[export]
+        response = StreamingHttpResponse(stream(gradebook_rows(pk)), content_type=content_type)
+        response['Content-Disposition'] = 'attachment; filename="gradebook-{}.{}"'.format(pk, export)
+        return response
+
+
+class DashboardView(APIView):
+    permission_classes = (IsAuthenticated,)
+
+    def get(self, request):
+        return Response(data=get_dashboard(request.user.id), status=status.HTTP_200_OK)
+
+
+class CourseStatisticsView(APIView):
+    permission_classes = (IsAuthenticated, IsCourseTeacher,)
+
+    def get(self, request, pk):
+        return Response(data=course_statistics(pk), status=status.HTTP_200_OK)
+
+
+class EnrollmentView(generics.GenericAPIView):
+    serializer_class = EnrollmentSerializer
+    permission_classes = (IsAuthenticated, IsCourseTeacher,)
+
+    def post(self, request, pk):
+        course = get_object_or_404(Course, id=pk)
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return Response(data=serializer.apply(course), status=status.HTTP_200_OK)
+
+
+class LectureView(CachedResponseMixin, generics.ListCreateAPIView):
+    parser_classes = (JSONParser, FormParser, MultiPartParser,)
+    serializer_class = LectureSerializer
+    permission_classes = (IsAuthenticated, IsAbleToAddLecturesOrReadOnly,)
+
+    def get_cache_course_id(self):
+        return self.kwargs['course_pk']
+
+    def get_last_modified(self):
+        return latest_update(Course.objects.filter(pk=self.kwargs['course_pk']), 'updated_at')
+
+    def get_queryset(self):
+        queryset = Lecture.objects.filter(course=self.kwargs['course_pk'])
+        return queryset
+
+    def perform_create(self, serializer):
+        course = Course.objects.get(id=self.kwargs['course_pk'])
+        return serializer.save(course=course)
+
+
+class LectureDetailView(CachedResponseMixin, generics.RetrieveUpdateDestroyAPIView):
+    parser_classes = (JSONParser, FormParser, MultiPartParser,)
+    serializer_class = LectureDetailSerializer
+    permission_classes = (IsAuthenticated, IsAbleToAddLecturesOrReadOnly,)
+
+    def get_cache_course_id(self):
+        return self.kwargs['course_pk']
+
+    def get_last_modified(self):
+        return latest_update(Lecture.objects.filter(pk=self.kwargs['pk'], course=self.kwargs['course_pk']),
+                             'updated_at', 'course__updated_at')
+
+    def get_queryset(self):
+        queryset = Lecture.objects.filter(course=self.kwargs['course_pk'])
+        return self.serializer_class.setup_eager_loading(queryset)
+
+
+class LecturePresentationView(APIView):
+    permission_classes = (IsAuthenticated, IsAbleToAddLecturesOrReadOnly,)
+
+    def get(self, request, course_pk, pk):
+        lecture = get_object_or_404(Lecture.objects.only('id', 'title', 'course_id', 'presentation'),
+                                    course=course_pk, pk=pk)
+        if not lecture.presentation:
+            raise NotFound('Lecture has no presentation.')
+        filename = lecture.title.replace('/', '_') + os.path.splitext(lecture.presentation.name)[1]
+        return serve_file(request, lecture.presentation, filename)
+
+
+class PresentationUploadView(generics.CreateAPIView):
+    serializer_class = PresentationUploadSerializer
+    permission_classes = (IsAuthenticated, IsAbleToUploadPresentation,)
+
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        digest = serializer.validated_data.pop('sha256', None)
+        blob = find_reusable_blob(request.user, digest, serializer.validated_data['size']) if digest else None
+        if blob is None:
+            serializer.save(lecture_id=self.kwargs['lecture_pk'], creator=request.user)
+            return Response(data=serializer.data, status=status.HTTP_201_CREATED)
+        lecture = attach_blob(self.kwargs['lecture_pk'], blob)
+        data = dict(serializer.data, id=None, lecture=lecture.id, offset=blob.size, complete=True)
+        data['presentation'] = request.build_absolute_uri(lecture.presentation.url)
+        return Response(data=data, status=status.HTTP_201_CREATED)
+
+
+class PresentationUploadDetailView(generics.RetrieveDestroyAPIView):
+    serializer_class = PresentationUploadSerializer
+    permission_classes = (IsAuthenticated, IsAbleToUploadPresentation,)
+    queryset = PresentationUpload.objects.all()
+
+    def put(self, request, pk):
+        upload = get_object_or_404(PresentationUpload.objects.select_related('lecture'), pk=pk)
+        self.check_object_permissions(request, upload)
+        start, end = parse_content_range(request.META.get('HTTP_CONTENT_RANGE'), upload)
+        if start != upload.offset:
+            return Response(data=self.get_serializer(upload).data, status=status.HTTP_409_CONFLICT)
+        chunk_path = receive_chunk(upload, request.stream, end - start + 1)
+        try:
+            with transaction.atomic():
+                if not PresentationUpload.objects.filter(pk=upload.pk, offset=start).update(offset=end + 1):
+                    upload = get_object_or_404(PresentationUpload.objects.select_related('lecture'), pk=pk)
+                    return Response(data=self.get_serializer(upload).data, status=status.HTTP_409_CONFLICT)
+                write_chunk(upload, chunk_path, start, end - start + 1)
+        finally:
+            os.remove(chunk_path)
+        upload.offset = end + 1
+        data = self.get_serializer(upload).data
+        if upload.complete:
+            try:
+                name = store_part(upload)
+            except BaseException:
+                PresentationUpload.objects.filter(pk=upload.pk, offset=end + 1).update(offset=start)
+                raise
+            attach_presentation(upload, name)
+            data['presentation'] = request.build_absolute_uri(upload.lecture.presentation.url)
+        return Response(data=data)
+
+    def perform_destroy(self, instance):
+        discard_part(instance)
+        instance.delete()
+
+
+class HometaskView(CachedResponseMixin, generics.ListCreateAPIView):
+    serializer_class = HometaskSerializer
+    permission_classes = (IsAuthenticated, IsAbleToAddHomeworkOrReadOnly,)
+
+    def get_cache_course_id(self):
+        return get_ancestry(self.request, Lecture, self.kwargs['lecture_pk']).course_id
+
+    def get_last_modified(self):
+        return latest_update(Lecture.objects.filter(pk=self.kwargs['lecture_pk']), 'updated_at')
+
+    def get_queryset(self):
+        queryset = Hometask.objects.filter(lecture=self.kwargs['lecture_pk'])
+        return queryset
+
+    def perform_create(self, serializer):
+        lecture = Lecture.objects.get(id=self.kwargs['lecture_pk'])
+        return serializer.save(lecture=lecture)
+
+
+class HometaskDetailView(CachedResponseMixin, generics.RetrieveUpdateDestroyAPIView):
+    serializer_class = HometaskDetailSerializer
+    permission_classes = (IsAuthenticated, IsAbleToAddHomeworkOrReadOnly,)
+
+    def get_cache_course_id(self):
+        return get_ancestry(self.request, Lecture, self.kwargs['lecture_pk']).course_id
+
+    def get_last_modified(self):
+        return latest_update(Hometask.objects.filter(pk=self.kwargs['pk'], lecture=self.kwargs['lecture_pk']),
+                             'updated_at')
+
+    def get_cache_generation_keys(self, course_id):
+        return super().get_cache_generation_keys(course_id) + [HOMETASK_GENERATION_KEY.format(self.kwargs['pk'])]
+
+    def get_queryset(self):
+        queryset = Hometask.objects.filter(lecture=self.kwargs['lecture_pk'])
+        return self.serializer_class.setup_eager_loading(queryset)
+
+
+class CompletedHomeworkView(ConditionalGetMixin, generics.ListCreateAPIView):
+    serializer_class = CompletedHomeworkSerializer
+    permission_classes = (IsAuthenticated, IsAbleToUploadSolutionOrReadOnly,)
+
+    def get_last_modified(self):
+        return latest_update(Hometask.objects.filter(pk=self.kwargs['hometasks_pk']), 'updated_at')
+
+    def get_queryset(self):
+        queryset = CompletedHomework.objects.filter(hometask=self.kwargs['hometasks_pk'])
+        if not get_ancestry(self.request, Hometask, self.kwargs['hometasks_pk']).role.is_teacher:
+            queryset = queryset.filter(creator=self.request.user)
+        return queryset
+
+    def perform_create(self, serializer):
+        hometask = Hometask.objects.get(id=self.kwargs['hometasks_pk'])
+        try:
+            with transaction.atomic():
+                return serializer.save(hometask=hometask)
+        except IntegrityError:
+            raise ValidationError({'non_field_errors': ['This hometask is already submitted.']})
+
+
+class CompletedHomeworkDetailView(ConditionalObjectMixin, generics.RetrieveUpdateDestroyAPIView):
+    serializer_class = CompletedHomeworkDetailSerializer
+    permission_classes = (IsAuthenticated, IsAbleToUploadSolutionOrReadOnly,)
+
+    def get_queryset(self):
+        queryset = CompletedHomework.objects.filter(hometask=self.kwargs['hometasks_pk'])
+        return self.serializer_class.setup_eager_loading(queryset)
+
+
+class GradingQueueView(generics.ListAPIView):
+    serializer_class = GradingQueueSerializer
+    permission_classes = (IsAuthenticated,)
+
+    def get_queryset(self):
+        teaching = [course_id for course_id, (is_teacher, is_student) in get_course_roles(self.request.user.id).items()
+                    if is_teacher]
+        course = self.request.query_params.get('course')
+        if course is not None:
+            if not course.isdigit():
+                raise ValidationError({'course': 'A valid integer is required.'})
+            teaching = [course_id for course_id in teaching if course_id == int(course)]
+        queryset = CompletedHomework.objects.filter(is_graded=False, hometask__lecture__course__in=teaching).order_by(
+            'submitted_at', 'id')
+        return self.serializer_class.setup_eager_loading(queryset)
+
+
+class BulkMarkView(generics.GenericAPIView):
+    serializer_class = BulkMarkSerializer
+    permission_classes = (IsAuthenticated, IsAbleToGradeHometask,)
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['hometask'] = self.kwargs['hometasks_pk']
+        context['course'] = get_ancestry(self.request, Hometask, self.kwargs['hometasks_pk']).course_id
+        return context
+
+    def post(self, request, hometasks_pk):
+        serializer = self.get_serializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        return Response(data=serializer.data, status=status.HTTP_200_OK)
+
+
+class MarkView(ConditionalGetMixin, generics.ListCreateAPIView):
+    serializer_class = MarkSerializer
+    permission_classes = (IsAuthenticated, IsAbleToEvaluateOrEvaluatedReadOnly,)
+
+    def get_last_modified(self):
+        return latest_update(CompletedHomework.objects.filter(pk=self.kwargs['pk']), 'updated_at')
+
+    def get_queryset(self):
+        queryset = Mark.objects.filter(completed_homework=self.kwargs['pk'])
+        return self.serializer_class.setup_eager_loading(queryset)
+
+    def perform_create(self, serializer):
+        completed_homework = CompletedHomework.objects.get(id=self.kwargs['pk'])
+        return serializer.save(completed_homework=completed_homework)
+
+
+class MarkDetailView(ConditionalObjectMixin, generics.RetrieveUpdateAPIView):
+    pk_model = Mark
+    serializer_class = MarkDetailSerializer
+    permission_classes = (IsAuthenticated, IsAbleToEvaluateOrEvaluatedReadOnly)
+
+    def get_queryset(self):
+        queryset = Mark.objects.filter(id=self.kwargs['pk'])
+        return self.serializer_class.setup_eager_loading(queryset)
+
+
+class CommentView(ConditionalGetMixin, generics.ListCreateAPIView):
+    serializer_class = CommentSerializer
+    permission_classes = (IsAuthenticated, IsAbleToCommentOrOwnerReadOnly,)
+
+    def get_last_modified(self):
+        return latest_update(Mark.objects.filter(pk=self.kwargs['mark_pk']), 'updated_at')
+
+    def get_queryset(self):
+        queryset = Comment.objects.filter(mark=self.kwargs['mark_pk'])
+        return queryset
+
+    def perform_create(self, serializer):
+        mark = Mark.objects.get(id=self.kwargs['mark_pk'])
+        return serializer.save(mark=mark)
+
+
+class CommentDetailView(ConditionalObjectMixin, generics.RetrieveAPIView):
+    serializer_class = CommentDetailSerializer
+    permission_classes = (IsAuthenticated, IsAbleToCommentOrOwnerReadOnly,)
+
+    def get_queryset(self):
+        queryset = Comment.objects.filter(mark=self.kwargs['mark_pk'])
+        return self.serializer_class.setup_eager_loading(queryset)